@@ -0,0 +1,59 @@
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from typing import Set
+from langchain.agents import AgentExecutor
+
+class _PendingAction:
+    """Placeholder for an action whose tool call is deferred to the end of the step"""
+    def __init__(self, agent_action):
+        self.agent_action = agent_action
+
+class ConcurrentAgentExecutor(AgentExecutor):
+    """
+    AgentExecutor that runs the tool calls of one step together
+    
+    When the model asks for several tools in one reply, consecutive read-only
+    calls run concurrently on a thread pool; a mutating call waits for the
+    reads before it, runs alone, and the reads after it see its result. The
+    observations are returned in the order the calls were made.
+    """
+    read_only_tools: Set[str] = set()
+    max_tool_workers: int = 4
+    
+    def _perform_agent_action(self, name_to_tool_map, color_mapping, agent_action, run_manager=None):
+        # Called by AgentExecutor._iter_next_step once per action; collect instead of running
+        return _PendingAction(agent_action)
+    
+    def _iter_next_step(self, name_to_tool_map, color_mapping, inputs, intermediate_steps, run_manager=None):
+        pending = []
+        for item in super()._iter_next_step(name_to_tool_map, color_mapping, inputs, intermediate_steps, run_manager):
+            if isinstance(item, _PendingAction):
+                pending.append(item.agent_action)
+            else:
+                yield item
+        if pending:
+            yield from self._run_tool_calls(name_to_tool_map, color_mapping, pending, run_manager)
+    
+    def _run_tool_calls(self, name_to_tool_map, color_mapping, actions, run_manager):
+        def perform(agent_action):
+            return AgentExecutor._perform_agent_action(self, name_to_tool_map, color_mapping, agent_action, run_manager)
+        
+        if len(actions) == 1:
+            return [perform(actions[0])]
+        
+        steps = [None] * len(actions)
+        with ThreadPoolExecutor(max_workers=self.max_tool_workers, thread_name_prefix="tool-call") as pool:
+            reads = []
+            for index, agent_action in enumerate(actions):
+                if agent_action.tool in self.read_only_tools:
+                    # Copy the context so trace spans keep their parent across threads
+                    context = contextvars.copy_context()
+                    reads.append((index, pool.submit(context.run, perform, agent_action)))
+                    continue
+                for read_index, future in reads:
+                    steps[read_index] = future.result()
+                reads = []
+                steps[index] = perform(agent_action)
+            for read_index, future in reads:
+                steps[read_index] = future.result()
+        return steps
@@ -0,0 +1,281 @@
+import os
+import time
+import uuid
+import asyncio
+import threading
+import importlib.util
+import pathlib
+from concurrent.futures import ThreadPoolExecutor
+from langchain_core.callbacks import BaseCallbackHandler
+from utils.commit_queue import flush_commit_queue, flush_summary
+from utils.output_budget import count_tokens, tool_budget, shape_head_tail
+from utils.profiler import TurnProfiler
+from utils.session_recorder import SessionRecorder
+
+# Dynamic import for config and the agent tools
+current_dir = pathlib.Path(__file__).parent
+
+config_path = current_dir.parent / "config.py"
+config_spec = importlib.util.spec_from_file_location("config", config_path)
+config = importlib.util.module_from_spec(config_spec)
+config_spec.loader.exec_module(config)
+
+tools_path = current_dir / "tools.py"
+tools_spec = importlib.util.spec_from_file_location("tools", tools_path)
+tools = importlib.util.module_from_spec(tools_spec)
+tools_spec.loader.exec_module(tools)
+
+GITHUB_TOKEN = config.GITHUB_TOKEN
+OPENAI_API_KEY = config.OPENAI_API_KEY
+AGENT_SERVICE_WORKERS = config.AGENT_SERVICE_WORKERS
+SESSION_RECORD_DIR = config.SESSION_RECORD_DIR
+
+start_agent_build = tools.start_agent_build
+switch_branch = tools.switch_branch
+sync_checkout = tools.sync_checkout
+
+class EventStreamHandler(BaseCallbackHandler):
+    """
+    Turns LLM tokens and tool events into plain dicts passed to `emit`
+    
+    Callbacks fire on the run's worker threads; `emit` must be thread-safe.
+    """
+    def __init__(self, emit):
+        self.emit = emit
+        self.tool_names = {}
+    
+    def on_llm_new_token(self, token, **kwargs):
+        self.emit({"type": "token", "text": token})
+    
+    def on_llm_end(self, response, **kwargs):
+        self.emit({"type": "llm_end"})
+    
+    def on_tool_start(self, serialized, input_str, run_id=None, **kwargs):
+        name = (serialized or {}).get("name", "tool")
+        self.tool_names[run_id] = name
+        self.emit({"type": "tool_start", "run_id": str(run_id), "name": name})
+    
+    def on_tool_end(self, output, run_id=None, **kwargs):
+        name = self.tool_names.pop(run_id, "tool")
+        self.emit({"type": "tool_end", "run_id": str(run_id), "name": name, "output": str(output)})
+    
+    def on_tool_error(self, error, run_id=None, **kwargs):
+        name = self.tool_names.pop(run_id, "tool")
+        self.emit({"type": "tool_error", "run_id": str(run_id), "name": name, "error": str(error)})
+
+class AgentService:
+    """
+    Hosts agents for many chat sessions in one process
+    
+    Agents come from the shared agent pool, so sessions on the same repository
+    and branch share one agent, its tool result cache and its checkout; LLM
+    responses, repository mirrors, ref snapshots and repository maps are
+    shared through their process-wide caches. Runs go to a bounded worker
+    pool, and runs on the same checkout are serialized since the agent edits
+    the work tree.
+    
+    run() is an async generator of events and must be iterated on the
+    service's event loop; everything else is thread-safe.
+    """
+    def __init__(self, max_workers=AGENT_SERVICE_WORKERS):
+        self.max_workers = max_workers
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="agent-run")
+        self.sessions = {}
+        self.lock = threading.Lock()
+        self.checkout_locks = {}
+        self.active_runs = 0
+        self.queued_runs = 0
+    
+    def create_session(self, repo_path, github_repo, github_user, branch="main"):
+        """
+        Start a session, building (or reusing) the agent for its repository in the background
+        
+        Args:
+            repo_path (str): Local checkout path
+            github_repo (str): GitHub repository (username/repository)
+            github_user (str): GitHub username
+            branch (str): Branch to work on
+        
+        Returns:
+            dict: The session description (see describe)
+        """
+        session_id = uuid.uuid4().hex
+        session = {
+            "id": session_id,
+            "repo_path": repo_path,
+            "github_repo": github_repo,
+            "github_user": github_user,
+            "branch": branch,
+            "agent_future": start_agent_build(repo_path, GITHUB_TOKEN, github_repo, github_user, OPENAI_API_KEY,
+                                              branch, checkout=False),
+            "messages": [],
+            "last_profile": None,
+            "recorder": None,
+            "running": False,
+            "created_at": time.time(),
+        }
+        if SESSION_RECORD_DIR:
+            started = time.strftime("%Y%m%d-%H%M%S")
+            session["recorder"] = SessionRecorder(
+                repo_path, mode=tools.AGENT_MODE,
+                path=os.path.join(SESSION_RECORD_DIR, f"session-{started}-{session_id[:8]}.json")
+            )
+        with self.lock:
+            self.sessions[session_id] = session
+        return self.describe(session_id)
+    
+    def close_session(self, session_id):
+        """Forget a session; its pooled agent stays available to other sessions"""
+        with self.lock:
+            return self.sessions.pop(session_id, None) is not None
+    
+    def describe(self, session_id):
+        """
+        Public state of a session
+        
+        Returns:
+            dict: id, repository settings, agent ("building", "ready" or
+                "failed"), status or error message, running flag and messages
+        """
+        session = self.sessions[session_id]
+        future = session["agent_future"]
+        if not future.done():
+            agent, status = "building", "Setting up the developer assistant in the background..."
+        elif future.exception() is not None:
+            agent, status = "failed", f"Error setting up the assistant: {str(future.exception())}"
+        else:
+            agent, status = "ready", future.result()["status"]
+        return {
+            "id": session_id,
+            "repo_path": session["repo_path"],
+            "github_repo": session["github_repo"],
+            "github_user": session["github_user"],
+            "branch": session["branch"],
+            "agent": agent,
+            "status": status,
+            "running": session["running"],
+            "messages": list(session["messages"]),
+            "last_profile": session["last_profile"],
+        }
+    
+    def stats(self):
+        """Worker pool usage and session count"""
+        return {
+            "sessions": len(self.sessions),
+            "workers": self.max_workers,
+            "active_runs": self.active_runs,
+            "queued_runs": self.queued_runs,
+        }
+    
+    def _run_turn(self, session, prompt, emit):
+        """Run one agent turn on a worker thread and return the final event"""
+        profiler = TurnProfiler()
+        callbacks = [EventStreamHandler(emit), profiler]
+        if session["recorder"] is not None:
+            callbacks.append(session["recorder"])
+        try:
+            future = session["agent_future"]
+            if future.done() and future.exception() is not None:
+                # A failed build is retried, as the app does on its next interaction
+                future = session["agent_future"] = start_agent_build(
+                    session["repo_path"], GITHUB_TOKEN, session["github_repo"],
+                    session["github_user"], OPENAI_API_KEY, session["branch"], checkout=False
+                )
+            agent = future.result()["agent"]
+            
+            # Sessions on other branches share this checkout; runs hold its lock
+            checkout_status = switch_branch(session["repo_path"], session["branch"])
+            if not checkout_status.startswith(("Already on", "Switched")):
+                raise RuntimeError(checkout_status)
+            # Fast-forward and schedule the next fetch while this run holds the checkout
+            sync_checkout(session["repo_path"], GITHUB_TOKEN, session["github_repo"], session["github_user"])
+            
+            # Keep the prompt within its share of the context window
+            prompt_budget = tool_budget("prompt")
+            if count_tokens(prompt) > prompt_budget:
+                response = agent.run(shape_head_tail(prompt, prompt_budget), callbacks=callbacks)
+                response = "Note: Your input was truncated due to size limitations.\n\n" + response
+            else:
+                response = agent.run(prompt, callbacks=callbacks)
+            
+            # One commit and one background push for everything queued this turn
+            response += flush_summary(flush_commit_queue(session["repo_path"]))
+            event = {"type": "final", "output": response}
+        except Exception as e:
+            event = {"type": "error", "error": f"Error: {str(e)}"}
+        
+        event["profile"] = profiler.finish()
+        session["last_profile"] = event["profile"]
+        session["messages"].append({"role": "user", "content": prompt})
+        session["messages"].append({"role": "assistant", "content": event.get("output", event.get("error"))})
+        if session["recorder"] is not None:
+            session["recorder"].save()
+        return event
+    
+    async def run(self, session_id, prompt):
+        """
+        Run one agent turn for a session, yielding events as they happen
+        
+        Events are dicts with a "type": "queued" while waiting for the
+        checkout or a worker, "token", "llm_end", "tool_start", "tool_end" and
+        "tool_error" during the run, then "final" (output) or "error", both
+        with the turn's profile.
+        
+        Args:
+            session_id (str): Session to run in
+            prompt (str): User message
+        
+        Yields:
+            dict: Events
+        """
+        session = self.sessions[session_id]
+        loop = asyncio.get_running_loop()
+        events = asyncio.Queue()
+        
+        def emit(event):
+            loop.call_soon_threadsafe(events.put_nowait, event)
+        
+        checkout_lock = self.checkout_locks.setdefault(os.path.abspath(session["repo_path"]), asyncio.Lock())
+        self.queued_runs += 1
+        try:
+            if checkout_lock.locked():
+                yield {"type": "queued", "reason": "Another session is working on this checkout"}
+            await checkout_lock.acquire()
+        finally:
+            self.queued_runs -= 1
+        
+        def run_turn():
+            with self.lock:
+                self.active_runs += 1
+            session["running"] = True
+            try:
+                return self._run_turn(session, prompt, emit)
+            finally:
+                session["running"] = False
+                with self.lock:
+                    self.active_runs -= 1
+        
+        future = None
+        try:
+            if self.active_runs >= self.max_workers:
+                yield {"type": "queued", "reason": "All agent workers are busy"}
+            future = loop.run_in_executor(self.executor, run_turn)
+        finally:
+            if future is None:
+                # The client went away before the run started
+                checkout_lock.release()
+            else:
+                # Released when the run ends, even if the client has gone away by then
+                future.add_done_callback(lambda _: checkout_lock.release())
+        
+        while True:
+            next_event = asyncio.ensure_future(events.get())
+            done, _ = await asyncio.wait({next_event, future}, return_when=asyncio.FIRST_COMPLETED)
+            if next_event in done:
+                yield next_event.result()
+                continue
+            next_event.cancel()
+            break
+        while not events.empty():
+            yield events.get_nowait()
+        yield await future
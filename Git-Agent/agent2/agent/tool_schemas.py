@@ -0,0 +1,87 @@
+from typing import Optional
+from langchain_core.pydantic_v1 import BaseModel, Field
+
+# Argument models for the structured (tool-calling) agent mode, keyed by tool name.
+# Field names match the keys the wrappers in utils/wrappers.py read.
+
+class ModifyCodeArgs(BaseModel):
+    file_path: str = Field(description="Path of the file relative to the repository root")
+    new_content: str = Field(description="Complete new content of the file")
+
+class FilePathArgs(BaseModel):
+    file_path: str = Field(description="Path of the file relative to the repository root")
+
+class ListFilesArgs(BaseModel):
+    directory_path: Optional[str] = Field(None, description="Directory to list, defaults to the repository root")
+
+class ReadFileArgs(BaseModel):
+    file_path: str = Field(description="Path of the file relative to the repository root")
+    offset: Optional[int] = Field(None, description="First line to read (1-based), for reading large files in pages")
+    limit: Optional[int] = Field(None, description="Number of lines to read")
+
+class ReadFileAtRevisionArgs(BaseModel):
+    file_path: str = Field(description="Path of the file relative to the repository root")
+    revision: str = Field(description="Branch, tag or commit; comma-separate several to compare them")
+
+class CommitAndPushArgs(BaseModel):
+    file_path: str = Field(description="Path of the file to commit")
+    commit_message: Optional[str] = Field(None, description="Commit message")
+
+class CreateBranchArgs(BaseModel):
+    branch_name: str = Field(description="Name of the new branch")
+
+class NoArgs(BaseModel):
+    pass
+
+class GenerateDiffArgs(BaseModel):
+    file_path: Optional[str] = Field(None, description="Limit the diff to this file")
+
+class StashChangesArgs(BaseModel):
+    pop: bool = Field(False, description="Pop the latest stash instead of stashing")
+    message: Optional[str] = Field(None, description="Stash message")
+
+class CreatePullRequestArgs(BaseModel):
+    branch: str = Field(description="Branch to open the pull request from")
+    title: Optional[str] = Field(None, description="Pull request title")
+    description: Optional[str] = Field(None, description="Pull request description")
+
+class ExpandSparseCheckoutArgs(BaseModel):
+    directories: str = Field(description="Comma-separated directories to add to the checkout")
+
+class RunCommandArgs(BaseModel):
+    command: str = Field(description="Shell command to run in the repository")
+    timeout: Optional[int] = Field(None, description="Timeout in seconds (default 60)")
+
+class SearchCodeArgs(BaseModel):
+    query: str = Field(description="Text to search for")
+    file_pattern: Optional[str] = Field(None, description="Glob of files to search, e.g. *.py")
+
+class RunTestsArgs(BaseModel):
+    test_path: Optional[str] = Field(None, description="Tests to run, defaults to all tests")
+
+class InstallDependenciesArgs(BaseModel):
+    requirements_file: Optional[str] = Field(None, description="Requirements file, defaults to requirements.txt")
+
+class LintCodeArgs(BaseModel):
+    path: Optional[str] = Field(None, description="Path to lint, defaults to the whole repository")
+
+TOOL_SCHEMAS = {
+    "ModifyCode": ModifyCodeArgs,
+    "DeleteFile": FilePathArgs,
+    "ListFiles": ListFilesArgs,
+    "ReadFile": ReadFileArgs,
+    "ReadFileAtRevision": ReadFileAtRevisionArgs,
+    "CommitAndPush": CommitAndPushArgs,
+    "CreateBranch": CreateBranchArgs,
+    "GetRepoStatus": NoArgs,
+    "GenerateDiff": GenerateDiffArgs,
+    "StashChanges": StashChangesArgs,
+    "CreatePullRequest": CreatePullRequestArgs,
+    "ExpandSparseCheckout": ExpandSparseCheckoutArgs,
+    "RunCommand": RunCommandArgs,
+    "SearchCode": SearchCodeArgs,
+    "RunTests": RunTestsArgs,
+    "InstallDependencies": InstallDependenciesArgs,
+    "AnalyzeCode": FilePathArgs,
+    "LintCode": LintCodeArgs,
+}
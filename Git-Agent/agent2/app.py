@@ -1,55 +1,95 @@
 import os
+import time
 import streamlit as st
 import importlib.util
 import pathlib
+from utils.commit_queue import flush_commit_queue, flush_summary
+from utils.output_budget import count_tokens, tool_budget, shape_head_tail
+from utils.profiler import TurnProfiler
+from utils.session_recorder import SessionRecorder
+from utils.backend_client import BackendClient, BackendError, dispatch_event
 
 # Dynamic imports for all modules
 current_dir = pathlib.Path(__file__).parent
 
+@st.cache_resource(show_spinner=False)
+def exec_module_file(name, path, mtime):
+    """Execute a module file; cached per process, so reruns reuse the module"""
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def source_mtime():
+    """Newest modification time of the app's own source files"""
+    return max(os.path.getmtime(path)
+               for directory in (current_dir, current_dir / "utils", current_dir / "agent", current_dir / "components")
+               for path in directory.glob("*.py"))
+
+def load_module(name, path):
+    """
+    Import a module from its file once instead of on every script run
+    
+    Streamlit executes this script again on each interaction. The modules
+    (with their config and tool builders) are kept until one of the app's
+    source files changes. Modules such as agent/tools.py execute config,
+    git_operations and the wrappers from their files themselves, so an edit to
+    any of those reloads them too. The shared-state modules imported as
+    ``utils.*`` (pools, queues, caches) stay loaded for the process.
+    
+    Args:
+        name (str): Module name
+        path (pathlib.Path): Path of the module file
+    
+    Returns:
+        module: The loaded module
+    """
+    return exec_module_file(name, str(path), SOURCE_MTIME)
+
+# Checked once per script run, for all the modules below
+SOURCE_MTIME = source_mtime()
+
 # Import config
-config_path = current_dir / "config.py"
-spec = importlib.util.spec_from_file_location("config", config_path)
-config = importlib.util.module_from_spec(spec)
-spec.loader.exec_module(config)
+config = load_module("config", current_dir / "config.py")
 
 GITHUB_TOKEN = config.GITHUB_TOKEN
 GITHUB_REPO = config.GITHUB_REPO
 GITHUB_USER = config.GITHUB_USER
 REPO_PATH = config.REPO_PATH
 OPENAI_API_KEY = config.OPENAI_API_KEY
+SESSION_RECORD_DIR = config.SESSION_RECORD_DIR
+BACKEND_URL = config.BACKEND_URL
+BACKEND_TOKEN = config.BACKEND_TOKEN
+FILE_TREE_REFRESH_SECONDS = config.FILE_TREE_REFRESH_SECONDS
 
 # Import utils module
 utils_dir = current_dir / "utils"
-file_ops_path = utils_dir / "file_operations.py"
-file_ops_spec = importlib.util.spec_from_file_location("file_operations", file_ops_path)
-file_operations = importlib.util.module_from_spec(file_ops_spec)
-file_ops_spec.loader.exec_module(file_operations)
+file_operations = load_module("file_operations", utils_dir / "file_operations.py")
 
 list_files = file_operations.list_files
 
 # Import components
 components_dir = current_dir / "components"
-sidebar_path = components_dir / "sidebar.py"
-sidebar_spec = importlib.util.spec_from_file_location("sidebar", sidebar_path)
-sidebar = importlib.util.module_from_spec(sidebar_spec)
-sidebar_spec.loader.exec_module(sidebar)
-
-file_explorer_path = components_dir / "file_explorer.py"
-file_explorer_spec = importlib.util.spec_from_file_location("file_explorer", file_explorer_path)
-file_explorer = importlib.util.module_from_spec(file_explorer_spec)
-file_explorer_spec.loader.exec_module(file_explorer)
+sidebar = load_module("sidebar", components_dir / "sidebar.py")
+file_explorer = load_module("file_explorer", components_dir / "file_explorer.py")
+chat_stream = load_module("chat_stream", components_dir / "chat_stream.py")
+profile_panel = load_module("profile_panel", components_dir / "profile_panel.py")
 
 render_sidebar = sidebar.render_sidebar
+render_repo_status = sidebar.render_repo_status
 render_file_tree = file_explorer.render_file_tree
+StreamlitChatCallbackHandler = chat_stream.StreamlitChatCallbackHandler
+render_turn_profile = profile_panel.render_turn_profile
 
 # Import agent tools
 agent_dir = current_dir / "agent"
-tools_path = agent_dir / "tools.py"
-tools_spec = importlib.util.spec_from_file_location("tools", tools_path)
-tools = importlib.util.module_from_spec(tools_spec)
-tools_spec.loader.exec_module(tools)
+tools = load_module("tools", agent_dir / "tools.py")
+
+start_agent_build = tools.start_agent_build
+sync_checkout = tools.sync_checkout
 
-initialize_agent_tools = tools.initialize_agent_tools
+# Fragments re-run on their own, without the rest of the script (st.fragment in newer Streamlit)
+fragment = getattr(st, "fragment", None) or st.experimental_fragment
 
 # Set page configuration
 st.set_page_config(
@@ -67,6 +107,173 @@ def update_configuration(new_repo_path, new_github_repo, new_github_user, branch
     st.session_state.initialized = False  # Reinitialize the agent
     st.rerun()
 
+def get_session_recorder(repo_path):
+    """The recorder for this session and repository, when session recording is on"""
+    if not SESSION_RECORD_DIR:
+        return None
+    recorder = st.session_state.get("recorder")
+    if recorder is None or recorder.repo_path != repo_path:
+        started = time.strftime("%Y%m%d-%H%M%S")
+        recorder = SessionRecorder(
+            repo_path,
+            mode=tools.AGENT_MODE,
+            path=os.path.join(SESSION_RECORD_DIR, f"session-{started}-{id(st.session_state):x}.json")
+        )
+        st.session_state.recorder = recorder
+    return recorder
+
+def run_locally(agent_future, prompt, stream_handler):
+    """Run one turn in this script run, on the session's pooled agent"""
+    # Wait for the background build if it is still running
+    with st.spinner("Setting up the developer assistant..."):
+        prepared = agent_future.result()
+    st.session_state.agent = prepared["agent"]
+    st.session_state.tool_cache = prepared["tool_cache"]
+    
+    # Between turns nothing else works in the checkout: apply the last
+    # background fetch and schedule the next one if it has gone stale
+    sync_checkout(st.session_state.repo_path, GITHUB_TOKEN,
+                  st.session_state.github_repo, st.session_state.github_user)
+    
+    profiler = TurnProfiler()
+    callbacks = [stream_handler, profiler]
+    recorder = get_session_recorder(st.session_state.repo_path)
+    if recorder is not None:
+        callbacks.append(recorder)
+    
+    try:
+        # Keep the prompt within its share of the context window
+        prompt_budget = tool_budget("prompt")
+        if count_tokens(prompt) > prompt_budget:
+            prompt_truncated = shape_head_tail(prompt, prompt_budget)
+            response = st.session_state.agent.run(prompt_truncated, callbacks=callbacks)
+            response = "Note: Your input was truncated due to size limitations.\n\n" + response
+        else:
+            response = st.session_state.agent.run(prompt, callbacks=callbacks)
+        
+        # One commit and one background push for everything queued this turn
+        response += flush_summary(flush_commit_queue(st.session_state.repo_path))
+    finally:
+        st.session_state.last_profile = profiler.finish()
+        if recorder is not None:
+            recorder.save()
+    return response
+
+def run_on_backend(backend, prompt, stream_handler):
+    """Run one turn on the agent backend, streaming its events into the chat"""
+    final = None
+    for event in backend.stream_run(st.session_state.backend_session, prompt):
+        if event.get("type") == "queued":
+            stream_handler.container.markdown(f"Waiting: {event['reason']}...")
+        final = dispatch_event(event, stream_handler) or final
+    
+    if final is None:
+        raise BackendError("The backend closed the run without a result")
+    st.session_state.last_profile = final.get("profile")
+    if final["type"] == "error":
+        raise BackendError(final["error"].removeprefix("Error: "))
+    return final["output"]
+
+def start_session_agent(backend):
+    """Build the session's agent in the background (or open a backend session), once per configuration"""
+    if st.session_state.initialized:
+        return
+    # A recently used (repo, branch) is ready at once
+    if backend is not None:
+        st.session_state.backend_session = backend.create_session(
+            st.session_state.repo_path,
+            st.session_state.github_repo,
+            st.session_state.github_user,
+            st.session_state.branch
+        )["id"]
+    else:
+        st.session_state.agent_future = start_agent_build(
+            st.session_state.repo_path,
+            GITHUB_TOKEN,
+            st.session_state.github_repo,
+            st.session_state.github_user,
+            OPENAI_API_KEY,
+            st.session_state.branch
+        )
+    st.session_state.initialized = True
+
+@fragment(run_every=FILE_TREE_REFRESH_SECONDS or None)
+def repository_panel(repo_path):
+    """
+    Fetch status, tool cache and file explorer; refreshes on its own timer,
+    looking only at the paths changed since the last refresh
+    """
+    container = st.container()
+    render_repo_status(repo_path, container)
+    render_file_tree(repo_path, container)
+
+@fragment
+def chat_panel(backend):
+    """
+    Agent status, last turn profile and the chat; a reply re-runs only this
+    fragment, not the sidebar or the rest of the page
+    """
+    # A failed build is retried on the next interaction
+    start_session_agent(backend)
+    if backend is not None:
+        agent_future = None
+        session = backend.get_session(st.session_state.backend_session)
+        if session["agent"] == "failed":
+            st.error(session["status"])
+        else:
+            st.caption(session["status"])
+    else:
+        agent_future = st.session_state.agent_future
+        if not agent_future.done():
+            st.caption("Setting up the developer assistant in the background...")
+        elif agent_future.exception() is not None:
+            st.error(f"Error setting up the assistant: {str(agent_future.exception())}")
+            st.session_state.initialized = False  # Retry on the next interaction
+        else:
+            st.caption(agent_future.result()["status"])
+            st.session_state.tool_cache = agent_future.result()["tool_cache"]
+    
+    # Where the time of the last turn went
+    profile_container = st.empty()
+    render_turn_profile(st.session_state.get("last_profile"), profile_container.container())
+    
+    # Display chat messages
+    for message in st.session_state.messages:
+        with st.chat_message(message["role"]):
+            st.markdown(message["content"])
+    
+    # Chat input
+    if prompt := st.chat_input("Ask me to help with your code..."):
+        # Add user message to chat history
+        st.session_state.messages.append({"role": "user", "content": prompt})
+        
+        # Display user message
+        with st.chat_message("user"):
+            st.markdown(prompt)
+        
+        # Generate assistant response
+        with st.chat_message("assistant"):
+            response_container = st.empty()
+            try:
+                # Tokens and tool events appear in the response container as they happen
+                stream_handler = StreamlitChatCallbackHandler(response_container)
+                response_container.markdown("Thinking...")
+                if backend is not None:
+                    response = run_on_backend(backend, prompt, stream_handler)
+                else:
+                    response = run_locally(agent_future, prompt, stream_handler)
+                
+                response_container.markdown(response)
+                # Add assistant response to chat history
+                st.session_state.messages.append({"role": "assistant", "content": response})
+            except Exception as e:
+                error_message = f"Error: {str(e)}"
+                response_container.error(error_message)
+                st.session_state.messages.append({"role": "assistant", "content": error_message})
+        
+        # This turn's profile; the file explorer picks up changed files on its next refresh
+        render_turn_profile(st.session_state.get("last_profile"), profile_container.container())
+
 def main():
     # Initialize session state
     if "messages" not in st.session_state:
@@ -81,13 +288,19 @@ def main():
     
     if "github_repo" not in st.session_state:
         st.session_state.github_repo = GITHUB_REPO
-        
+    
     if "github_user" not in st.session_state:
         st.session_state.github_user = GITHUB_USER
-        
+    
     if "branch" not in st.session_state:
         st.session_state.branch = "main"
     
+    # With BACKEND_URL set, agents run in the backend service and this app is a thin client
+    backend = BackendClient(BACKEND_URL, token=BACKEND_TOKEN) if BACKEND_URL else None
+    
+    # Build the agent in the background while the page renders
+    start_session_agent(backend)
+    
     # Render the sidebar
     render_sidebar(
         st.session_state.repo_path,
@@ -95,6 +308,9 @@ def main():
         st.session_state.github_user,
         on_config_change=update_configuration
     )
+    with st.sidebar:
+        repository_panel(st.session_state.repo_path)
+    
     # Main content
     st.title("💻 Developer Assistant")
     st.markdown("""
@@ -107,56 +323,7 @@ def main():
     - Commit and push changes
     """)
     
-    # Initialize the agent if not already done
-    if not st.session_state.initialized:
-        with st.spinner("Setting up the developer assistant..."):
-            st.session_state.agent = initialize_agent_tools(
-                st.session_state.repo_path,
-                GITHUB_TOKEN,
-                st.session_state.github_repo,
-                st.session_state.github_user,
-                OPENAI_API_KEY,
-                st.session_state.branch
-            )
-            st.session_state.initialized = True
-    
-    # Display chat messages
-    for message in st.session_state.messages:
-        with st.chat_message(message["role"]):
-            st.markdown(message["content"])
-    
-    # Chat input
-    if prompt := st.chat_input("Ask me to help with your code..."):
-        # Add user message to chat history
-        st.session_state.messages.append({"role": "user", "content": prompt})
-        
-        # Display user message
-        with st.chat_message("user"):
-            st.markdown(prompt)
-        
-        # Generate assistant response
-        with st.chat_message("assistant"):
-            with st.spinner("Thinking..."):
-                response_container = st.empty()
-                try:
-                    # Limit prompt size to avoid rate limit errors
-                    if len(prompt) > 2000:
-                        prompt_truncated = prompt[:2000] + "... [truncated for processing]"
-                        response = st.session_state.agent.run(prompt_truncated)
-                        response = "Note: Your input was truncated due to size limitations.\n\n" + response
-                    else:
-                        response = st.session_state.agent.run(prompt)
-                    
-                    response_container.markdown(response)
-                    # Add assistant response to chat history
-                    st.session_state.messages.append({"role": "assistant", "content": response})
-                    
-                    # Force refresh the file explorer to show changes
-                    st.rerun()
-                except Exception as e:
-                    error_message = f"Error: {str(e)}"
-                    response_container.error(error_message)
-                    st.session_state.messages.append({"role": "assistant", "content": error_message})
-    
+    chat_panel(backend)
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
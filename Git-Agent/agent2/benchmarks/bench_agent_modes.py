@@ -0,0 +1,127 @@
+"""
+Compare LLM round-trips and wall time of the ReAct and tool-calling agent modes.
+
+Both modes run the same task (list files, read app.py, rewrite it) against a
+throwaway repository with scripted model replies, so only the agent loop is
+measured. The ReAct script includes one malformed step, which the text parser
+turns into an extra round-trip; the tool-calling script issues the two read
+calls in one reply, as chat models with parallel tool calls do.
+
+Usage:
+    python benchmarks/bench_agent_modes.py [--runs 20]
+"""
+import argparse
+import importlib.util
+import json
+import pathlib
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.language_models.fake import FakeListLLM
+from langchain_core.language_models.fake_chat_models import FakeMessagesListChatModel
+from langchain_core.messages import AIMessage
+
+agent_dir = pathlib.Path(__file__).parent.parent
+sys.path.insert(0, str(agent_dir))
+tools_spec = importlib.util.spec_from_file_location("agent_tools", agent_dir / "agent" / "tools.py")
+agent_tools = importlib.util.module_from_spec(tools_spec)
+tools_spec.loader.exec_module(agent_tools)
+
+NEW_CONTENT = 'def greet(name):\n    return f"Hi, {name}!"\n'
+
+REACT_SCRIPT = [
+    "I should see what is in the repository.\nAction: ListFiles\nAction Input: .",
+    # Missing "Action Input:" line, rejected by the ReAct output parser
+    "I need to read app.py.\nAction: ReadFile app.py",
+    "I need to read app.py.\nAction: ReadFile\nAction Input: app.py",
+    "I will update the greeting.\nAction: ModifyCode\n"
+    f"Action Input: file_path = \"app.py\", new_content = {json.dumps(NEW_CONTENT)}",
+    "I now know the final answer.\nFinal Answer: app.py now greets with \"Hi\".",
+]
+
+def tool_call(call_id, name, args):
+    return {"id": call_id, "type": "function", "function": {"name": name, "arguments": json.dumps(args)}}
+
+TOOLS_SCRIPT = [
+    AIMessage(content="", additional_kwargs={"tool_calls": [
+        tool_call("call_1", "ListFiles", {}),
+        tool_call("call_2", "ReadFile", {"file_path": "app.py"}),
+    ]}),
+    AIMessage(content="", additional_kwargs={"tool_calls": [
+        tool_call("call_3", "ModifyCode", {"file_path": "app.py", "new_content": NEW_CONTENT}),
+    ]}),
+    AIMessage(content="app.py now greets with \"Hi\"."),
+]
+
+class RoundTripCounter(BaseCallbackHandler):
+    """Counts model calls made by an agent run"""
+    def __init__(self):
+        self.calls = 0
+    
+    def on_llm_start(self, serialized, prompts, **kwargs):
+        self.calls += 1
+    
+    def on_chat_model_start(self, serialized, messages, **kwargs):
+        self.calls += 1
+
+def build_repo(root):
+    with open(pathlib.Path(root) / "app.py", "w") as f:
+        f.write('def greet(name):\n    return f"Hello, {name}!"\n')
+    subprocess.run(["git", "init", "-q"], cwd=root, check=True)
+    subprocess.run(["git", "add", "-A"], cwd=root, check=True)
+    subprocess.run(["git", "-c", "user.email=bench@example.com", "-c", "user.name=bench",
+                    "commit", "-q", "-m", "initial"], cwd=root, check=True)
+
+def make_executor(mode, repo_path):
+    if mode == "react":
+        from langchain.agents import initialize_agent, AgentType
+        tools = agent_tools.build_tools(repo_path, None, None, None)
+        return initialize_agent(
+            tools,
+            FakeListLLM(responses=REACT_SCRIPT),
+            agent=AgentType.ZERO_SHOT_REACT_DESCRIPTION,
+            handle_parsing_errors=True,
+            max_iterations=5,
+            max_execution_time=30,
+            early_stopping_method="generate",
+        )
+    tools = agent_tools.build_tools(repo_path, None, None, None, structured=True)
+    executor = agent_tools.build_tool_calling_agent(tools, FakeMessagesListChatModel(responses=TOOLS_SCRIPT))
+    executor.verbose = False
+    return executor
+
+def run_mode(mode, repo_path, runs):
+    round_trips = []
+    best = float("inf")
+    correct = True
+    for _ in range(runs):
+        subprocess.run(["git", "checkout", "-q", "--", "."], cwd=repo_path, check=True)
+        executor = make_executor(mode, repo_path)
+        counter = RoundTripCounter()
+        start = time.perf_counter()
+        executor.invoke({"input": "Change the greeting in app.py to Hi"}, config={"callbacks": [counter]})
+        best = min(best, time.perf_counter() - start)
+        round_trips.append(counter.calls)
+        correct = correct and (pathlib.Path(repo_path) / "app.py").read_text() == NEW_CONTENT
+    return round_trips, best, correct
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+    
+    root = tempfile.mkdtemp(prefix="agent-modes-")
+    try:
+        build_repo(root)
+        print(f"{'mode':>6} {'LLM round-trips':>16} {'best wall (ms)':>15} {'file updated':>13}")
+        for mode in ("react", "tools"):
+            round_trips, best, correct = run_mode(mode, root, args.runs)
+            print(f"{mode:>6} {sum(round_trips) / len(round_trips):>16.1f} {best * 1000:>15.1f} {str(correct):>13}")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Benchmark time-to-first-tool-call for each clone strategy.
+
+Builds a throwaway bare repository with some history, then
+for every strategy clones it through ``clone_with_strategy`` and runs a first
+ListFiles/ReadFile call against the checkout.
+
+Usage:
+    python benchmarks/bench_clone_strategies.py [--dirs 20] [--files 50] [--commits 10]
+"""
+import argparse
+import importlib.util
+import os
+import pathlib
+import shutil
+import subprocess
+import tempfile
+import time
+
+agent_dir = pathlib.Path(__file__).parent.parent
+utils_dir = agent_dir / "utils"
+
+git_ops_spec = importlib.util.spec_from_file_location("git_operations", utils_dir / "git_operations.py")
+git_operations = importlib.util.module_from_spec(git_ops_spec)
+git_ops_spec.loader.exec_module(git_operations)
+
+file_ops_spec = importlib.util.spec_from_file_location("file_operations", utils_dir / "file_operations.py")
+file_operations = importlib.util.module_from_spec(file_ops_spec)
+file_ops_spec.loader.exec_module(file_operations)
+
+STRATEGIES = {
+    "full": {},
+    "shallow (depth=1)": {"depth": 1},
+    "partial (blob:none)": {"filter_spec": "blob:none"},
+    "sparse (dir_000)": {"sparse_paths": ["dir_000"]},
+    "shallow+partial+sparse": {"depth": 1, "filter_spec": "blob:none", "sparse_paths": ["dir_000"]},
+}
+
+def git(*args, cwd):
+    subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True)
+
+def build_source_repo(root, dirs, files, commits):
+    """Create a bare repository with `commits` revisions of dirs x files"""
+    work = os.path.join(root, "work")
+    os.makedirs(work)
+    git("init", "-q", "-b", "main", cwd=work)
+    git("config", "user.email", "bench@example.com", cwd=work)
+    git("config", "user.name", "bench", cwd=work)
+    for commit in range(commits):
+        for d in range(dirs):
+            dir_path = os.path.join(work, f"dir_{d:03d}")
+            os.makedirs(dir_path, exist_ok=True)
+            for f in range(files):
+                with open(os.path.join(dir_path, f"file_{f:03d}.txt"), "w") as fh:
+                    fh.write(os.urandom(2048).hex())
+        git("add", "-A", cwd=work)
+        git("commit", "-q", "-m", f"revision {commit}", cwd=work)
+    
+    bare = os.path.join(root, "source.git")
+    git("clone", "-q", "--bare", work, bare, cwd=root)
+    # Partial clones need the server side to allow filters
+    git("config", "uploadpack.allowFilter", "true", cwd=bare)
+    git("config", "uploadpack.allowAnySHA1InWant", "true", cwd=bare)
+    return bare
+
+def dir_size(path):
+    total = 0
+    for root, _, filenames in os.walk(path):
+        for filename in filenames:
+            total += os.path.getsize(os.path.join(root, filename))
+    return total
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--dirs", type=int, default=20)
+    parser.add_argument("--files", type=int, default=50)
+    parser.add_argument("--commits", type=int, default=10)
+    args = parser.parse_args()
+    
+    root = tempfile.mkdtemp(prefix="bench_clone_")
+    try:
+        bare = build_source_repo(root, args.dirs, args.files, args.commits)
+        # file:// forces the regular transport so --depth/--filter are honoured
+        url = pathlib.Path(bare).as_uri()
+        
+        print(f"{'strategy':<26} {'clone (s)':>10} {'first call (s)':>15} {'total (s)':>10} {'on disk (MB)':>13}")
+        for name, options in STRATEGIES.items():
+            target = os.path.join(root, "clone")
+            start = time.perf_counter()
+            git_operations.clone_with_strategy(url, target, **options)
+            cloned = time.perf_counter()
+            file_operations.list_files(target, "dir_000")
+            file_operations.read_file("dir_000/file_000.txt", target)
+            done = time.perf_counter()
+            print(f"{name:<26} {cloned - start:>10.2f} {done - cloned:>15.3f} {done - start:>10.2f} "
+                  f"{dir_size(target) / (1024 * 1024):>13.1f}")
+            shutil.rmtree(target)
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
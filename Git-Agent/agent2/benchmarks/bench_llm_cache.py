@@ -0,0 +1,58 @@
+"""
+Cold and warm latency of an agent run with the on-disk LLM response cache.
+
+Runs the agent offline on the deterministic local model, with a simulated
+provider latency, against a throwaway repository and a throwaway cache file:
+the first run pays for every model call, repeats are answered from SQLite.
+
+Usage:
+    python benchmarks/bench_llm_cache.py [--latency 0.5] [--runs 3] [--mode react]
+"""
+import argparse
+import os
+import pathlib
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+agent_dir = pathlib.Path(__file__).parent.parent
+sys.path.insert(0, str(agent_dir))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--latency", type=float, default=0.5, help="simulated seconds per model call")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--mode", choices=["react", "tools"], default="react")
+    args = parser.parse_args()
+    
+    root = tempfile.mkdtemp(prefix="llm-cache-")
+    os.environ["LLM_PROVIDER"] = "fake"
+    os.environ["FAKE_LLM_LATENCY"] = str(args.latency)
+    os.environ["LLM_CACHE_PATH"] = os.path.join(root, "llm_cache.sqlite")
+    try:
+        repo_path = os.path.join(root, "repo")
+        os.makedirs(repo_path)
+        subprocess.run(["git", "init", "-q"], cwd=repo_path, check=True)
+        
+        # Imported after the environment is set, since config reads it at import time
+        import importlib.util
+        tools_spec = importlib.util.spec_from_file_location("agent_tools", agent_dir / "agent" / "tools.py")
+        agent_tools = importlib.util.module_from_spec(tools_spec)
+        tools_spec.loader.exec_module(agent_tools)
+        from utils.llm_cache import get_llm_cache
+        
+        tools = agent_tools.build_tools(repo_path, None, None, None, structured=args.mode == "tools")
+        for run in range(args.runs):
+            agent = agent_tools.build_agent(tools, None, mode=args.mode)
+            agent.verbose = False
+            start = time.perf_counter()
+            agent.invoke({"input": "Summarize the repository"})
+            print(f"run {run + 1} ({'cold' if run == 0 else 'warm'}): {(time.perf_counter() - start) * 1000:8.1f} ms")
+        print(f"cache: {get_llm_cache().stats()}")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Peak memory and latency of the ModifyCode write path for large payloads.
+
+"eager" is the previous path: repr() of the whole input for the debug log,
+the value decoded into one string, then written. "streaming" is the current
+modify_code_wrapper: the value stays a span of the input and is unescaped
+block by block straight into the file. Peak memory is measured with
+tracemalloc on top of the payload itself.
+
+Usage:
+    python benchmarks/bench_modify_code.py [--size-mb 10]
+"""
+import argparse
+import contextlib
+import io
+import pathlib
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent))
+from utils.input_parser import parse_tool_input
+from utils.wrappers import create_file, modify_code_wrapper, MAX_CONTENT_DISPLAY
+
+def make_payload(size):
+    """A Python source file of roughly `size` bytes, escaped the way the LLM sends it"""
+    line = 'def greet(name):\n\tprint("Hello, %s" % name)  # \\d+ stays literal\n'
+    content = (line * (size // len(line) + 1))[:size]
+    escaped = content.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n").replace("\t", "\\t")
+    return content, f'file_path = "src/app.py", new_content = "{escaped}"'
+
+def eager_path(inputs, repo_path):
+    print(f"ModifyCode received: {repr(inputs)[:MAX_CONTENT_DISPLAY]}")
+    params = parse_tool_input(inputs)
+    return create_file(params['file_path'], params['new_content'], repo_path)
+
+def measure(fn, payload, repo_path, repeat):
+    best = float("inf")
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn(payload, repo_path)
+            best = min(best, time.perf_counter() - start)
+        tracemalloc.start()
+        fn(payload, repo_path)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return best, peak
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--size-mb", type=float, default=10)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    
+    content, payload = make_payload(int(args.size_mb * 1024 * 1024))
+    repo_path = tempfile.mkdtemp(prefix="modify-code-")
+    try:
+        print(f"payload: {len(payload) / 1024 / 1024:.1f} MB raw, {len(content) / 1024 / 1024:.1f} MB decoded")
+        print(f"{'path':>10} {'best (ms)':>10} {'peak extra (MB)':>16} {'content ok':>11}")
+        for name, fn in (("eager", eager_path), ("streaming", modify_code_wrapper)):
+            best, peak = measure(fn, payload, repo_path, args.repeat)
+            written = (pathlib.Path(repo_path) / "src" / "app.py").read_text()
+            print(f"{name:>10} {best * 1000:>10.1f} {peak / 1024 / 1024:>16.1f} {str(written == content):>11}")
+            (pathlib.Path(repo_path) / "src" / "app.py").unlink()
+    finally:
+        shutil.rmtree(repo_path, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Concurrent LLM calls against a rate-limited stub provider, with and without the shared scheduler.
+
+Background workers (like LangGraph fan-out or several sessions) flood the
+local stub provider while an interactive caller makes occasional requests.
+Without the scheduler every client relies on the SDK's own retries, so calls
+fail with 429s; with it, all clients share one budget, 429s are rare and
+retried, and the interactive calls go ahead of the background queue.
+
+Usage:
+    python benchmarks/bench_rate_limit.py [--workers 8] [--calls 5] [--rpm 240] [--tpm 60000]
+"""
+import argparse
+import os
+import pathlib
+import statistics
+import sys
+import threading
+import time
+
+agent_dir = pathlib.Path(__file__).parent.parent
+sys.path.insert(0, str(agent_dir))
+sys.path.insert(0, str(agent_dir / "benchmarks"))
+
+from stub_llm_server import start_stub_server
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+def timed_call(llm, prompt, latencies, errors):
+    start = time.perf_counter()
+    try:
+        llm.invoke(prompt)
+        latencies.append(time.perf_counter() - start)
+    except Exception as e:
+        errors.append(type(e).__name__)
+
+def run_scenario(server, interactive_llm, background_llm, workers, calls):
+    server.limits.counts = {key: 0 for key in server.limits.counts}
+    background, interactive, errors = [], [], []
+    
+    def background_worker():
+        for i in range(calls):
+            timed_call(background_llm, f"Background task step {i}: " + "context " * 50, background, errors)
+    
+    def interactive_user():
+        for i in range(calls):
+            time.sleep(0.2)
+            timed_call(interactive_llm, f"User question {i}", interactive, errors)
+    
+    threads = [threading.Thread(target=background_worker) for _ in range(workers)]
+    threads.append(threading.Thread(target=interactive_user))
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return {
+        "wall_s": time.perf_counter() - start,
+        "ok": len(background) + len(interactive),
+        "failed": len(errors),
+        "server_429": server.limits.counts["rate_limited"],
+        "interactive_p50_s": statistics.median(interactive) if interactive else None,
+        "interactive_p95_s": percentile(interactive, 0.95) if interactive else None,
+        "background_p50_s": statistics.median(background) if background else None,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--workers", type=int, default=8, help="background callers")
+    parser.add_argument("--calls", type=int, default=5, help="calls per caller")
+    parser.add_argument("--rpm", type=int, default=240, help="stub provider requests per minute")
+    parser.add_argument("--tpm", type=int, default=60000, help="stub provider tokens per minute")
+    args = parser.parse_args()
+    
+    server, base_url = start_stub_server(rpm=args.rpm, tpm=args.tpm)
+    os.environ["OPENAI_API_BASE"] = base_url
+    os.environ["STREAM_TOKENS"] = "false"
+    
+    # Imported after the environment is set, since config reads it at import time
+    import importlib.util
+    tools_spec = importlib.util.spec_from_file_location("agent_tools", agent_dir / "agent" / "tools.py")
+    agent_tools = importlib.util.module_from_spec(tools_spec)
+    tools_spec.loader.exec_module(agent_tools)
+    import httpx
+    from langchain_openai import ChatOpenAI
+    from utils.rate_limiter import PRIORITY_BACKGROUND, get_rate_limiter, rate_limited_http_clients
+    
+    # Plain httpx clients stand in for the SDK defaults, which some httpx releases reject
+    def plain_llm(max_tokens):
+        return ChatOpenAI(base_url=base_url, api_key="stub", max_tokens=max_tokens,
+                          http_client=httpx.Client(), http_async_client=httpx.AsyncClient())
+    
+    scenarios = {
+        "sdk retries only": (plain_llm(1000), plain_llm(100)),
+        "shared scheduler": (
+            agent_tools.build_llm("stub", mode="tools", cache=False, rate_limit=True),
+            ChatOpenAI(base_url=base_url, api_key="stub", max_tokens=100,
+                       **rate_limited_http_clients(priority=PRIORITY_BACKGROUND)),
+        ),
+    }
+    print(f"{args.workers} background callers x {args.calls} calls + 1 interactive caller; "
+          f"stub allows {args.rpm} requests/min, {args.tpm} tokens/min\n")
+    print(f"{'scenario':<18} {'wall s':>7} {'ok':>4} {'failed':>6} {'429s':>5} "
+          f"{'user p50 s':>10} {'user p95 s':>10} {'bg p50 s':>9}")
+    for name, (interactive_llm, background_llm) in scenarios.items():
+        result = run_scenario(server, interactive_llm, background_llm, args.workers, args.calls)
+        cells = [f"{result[key]:.2f}" if result[key] is not None else "-"
+                 for key in ("interactive_p50_s", "interactive_p95_s", "background_p50_s")]
+        print(f"{name:<18} {result['wall_s']:>7.2f} {result['ok']:>4} {result['failed']:>6} "
+              f"{result['server_429']:>5} {cells[0]:>10} {cells[1]:>10} {cells[2]:>9}")
+    print(f"\nscheduler: {get_rate_limiter('openai').stats()}")
+    server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+"""
+Replay a recorded chat session against a fixture repository and time the tools.
+
+The recorded LLM replies are played back through the local fake models, so
+no provider is called and every run takes the same path, while the real
+tools run against a fresh clone of the fixture at the recorded commit. The
+report gives wall time per turn and per tool, and flags tool outputs that
+differ from the recording (a sign the fixture or a tool changed behaviour).
+
+Recordings come from the app with SESSION_RECORD_DIR set. Without one, a
+scripted demo session is recorded against a generated fixture first.
+
+Usage:
+    python benchmarks/bench_replay.py [recording.json] [--fixture PATH] [--runs 3] [--json report.json]
+"""
+import argparse
+import importlib.util
+import json
+import os
+import pathlib
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+agent_dir = pathlib.Path(__file__).parent.parent
+sys.path.insert(0, str(agent_dir))
+
+# Pushes in a replay go to a throwaway bare clone, or fail; never prompt
+os.environ["GIT_TERMINAL_PROMPT"] = "0"
+
+tools_spec = importlib.util.spec_from_file_location("agent_tools", agent_dir / "agent" / "tools.py")
+agent_tools = importlib.util.module_from_spec(tools_spec)
+tools_spec.loader.exec_module(agent_tools)
+
+from utils.commit_queue import flush_commit_queues
+from utils.local_llm import LocalFakeLLM, LocalFakeChatModel
+from utils.session_recorder import SessionRecorder, load_recording
+
+DEMO_SCRIPT = [
+    [
+        "I should see what is in the repository.\nAction: ListFiles\nAction Input: .",
+        "I should look for the greeting.\nAction: SearchCode\nAction Input: Hello",
+        "I need to read app.py.\nAction: ReadFile\nAction Input: app.py",
+        "I now know the final answer.\nFinal Answer: app.py defines greet().",
+    ],
+    [
+        "I will update the greeting.\nAction: ModifyCode\n"
+        "Action Input: file_path = \"app.py\", new_content = \"def greet(name):\\n    return f'Hi, {name}!'\\n\"",
+        "Let me check the change.\nAction: GenerateDiff\nAction Input: app.py",
+        "I now know the final answer.\nFinal Answer: app.py now greets with \"Hi\".",
+    ],
+]
+
+def git(cwd, *args):
+    subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True)
+
+def build_fixture(path):
+    os.makedirs(os.path.join(path, "pkg"))
+    with open(os.path.join(path, "app.py"), "w") as f:
+        f.write("def greet(name):\n    return f'Hello, {name}!'\n")
+    for i in range(50):
+        with open(os.path.join(path, "pkg", f"module_{i}.py"), "w") as f:
+            f.write("".join(f"def func_{j}():\n    return {j}\n\n" for j in range(40)))
+    git(path, "init", "-q", "-b", "main")
+    git(path, "add", "-A")
+    git(path, "-c", "user.email=bench@example.com", "-c", "user.name=bench", "commit", "-q", "-m", "initial")
+
+def prepare_checkout(remote, head, branch, path):
+    """A fresh clone of the fixture at the recorded commit, so mutating tools start from the same state"""
+    git(None, "clone", "-q", remote, path)
+    git(path, "config", "user.email", "replay@example.com")
+    git(path, "config", "user.name", "replay")
+    if head:
+        git(path, "checkout", "-q", "-B", branch or "replay", head)
+    return path
+
+def build_model(mode, replies):
+    model_class = LocalFakeChatModel if mode == "tools" else LocalFakeLLM
+    return model_class(responses=replies, cache=False)
+
+def run_session(recording, repo_path, recorder):
+    """Play every recorded turn through a fresh agent, recording the replay"""
+    mode = recording["mode"]
+    tools = agent_tools.build_tools(repo_path, None, None, None, structured=mode == "tools",
+                                    cache=agent_tools.ToolResultCache(repo_path))
+    for turn in recording["turns"]:
+        agent = agent_tools.build_agent(tools, None, mode=mode, llm=build_model(mode, turn["llm"]))
+        agent.verbose = False
+        try:
+            agent.run(turn["input"], callbacks=[recorder])
+        except Exception as e:
+            print(f"Error replaying turn: {str(e)}")
+        flush_commit_queues()
+
+def record_demo(root):
+    """Record the scripted demo session against a generated fixture"""
+    fixture = os.path.join(root, "fixture")
+    build_fixture(fixture)
+    recorder = SessionRecorder(fixture, mode="react")
+    prompts = ["Where is the greeting defined?", "Make the greeting say Hi"]
+    tools = agent_tools.build_tools(fixture, None, None, None, cache=agent_tools.ToolResultCache(fixture))
+    for prompt, replies in zip(prompts, DEMO_SCRIPT):
+        agent = agent_tools.build_agent(tools, None, mode="react", llm=build_model("react", replies))
+        agent.verbose = False
+        agent.run(prompt, callbacks=[recorder])
+    # Replays start from the recorded commit, not the modified work tree
+    git(fixture, "checkout", "-q", "--", ".")
+    path = os.path.join(root, "demo_session.json")
+    recorder.save(path)
+    return path, fixture
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+def summarize(recording, replays):
+    turns = []
+    for index, turn in enumerate(recording["turns"]):
+        replayed = [replay[index] for replay in replays if index < len(replay)]
+        diverged = sum(
+            1 for replay_turn in replayed
+            for expected, actual in zip(turn["tools"], replay_turn["tools"])
+            if (expected["name"], expected["output"]) != (actual["name"], actual["output"])
+        ) + sum(abs(len(turn["tools"]) - len(replay_turn["tools"])) for replay_turn in replayed)
+        turns.append({
+            "input": str(turn["input"])[:60],
+            "tool_calls": len(turn["tools"]),
+            "recorded_ms": turn["wall_ms"],
+            "replay_ms": statistics.median(t["wall_ms"] for t in replayed) if replayed else None,
+            "diverged": diverged,
+        })
+    
+    by_tool = {}
+    for replay in replays:
+        for turn in replay:
+            for call in turn["tools"]:
+                if call["wall_ms"] is not None:
+                    by_tool.setdefault(call["name"], []).append(call["wall_ms"])
+    tools = {
+        name: {
+            "count": len(values),
+            "total_ms": round(sum(values), 3),
+            "p50_ms": round(percentile(values, 0.5), 3),
+            "p95_ms": round(percentile(values, 0.95), 3),
+            "max_ms": round(max(values), 3),
+        }
+        for name, values in sorted(by_tool.items())
+    }
+    return {"runs": len(replays), "turns": turns, "tools": tools}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("recording", nargs="?", help="session recording (default: record a demo session)")
+    parser.add_argument("--fixture", help="git repository to replay against (default: the recorded repo path)")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--json", help="also write the report here")
+    args = parser.parse_args()
+    
+    root = tempfile.mkdtemp(prefix="replay-")
+    try:
+        if args.recording:
+            recording_path, fixture = args.recording, None
+        else:
+            recording_path, fixture = record_demo(root)
+        recording = load_recording(recording_path)
+        fixture = args.fixture or fixture or recording["repo"]["path"]
+        
+        remote = os.path.join(root, "remote.git")
+        git(None, "clone", "-q", "--bare", fixture, remote)
+        replays = []
+        for run in range(args.runs):
+            checkout = prepare_checkout(remote, recording["repo"]["head"], recording["repo"]["branch"],
+                                        os.path.join(root, f"run-{run}"))
+            recorder = SessionRecorder(checkout, mode=recording["mode"])
+            start = time.perf_counter()
+            run_session(recording, checkout, recorder)
+            print(f"run {run + 1}: {(time.perf_counter() - start) * 1000:8.1f} ms")
+            replays.append(recorder.turns)
+        
+        report = summarize(recording, replays)
+        print(f"\n{'turn':<62} {'tools':>5} {'recorded ms':>12} {'replay ms':>10} {'diverged':>8}")
+        for turn in report["turns"]:
+            recorded = f"{turn['recorded_ms']:.1f}" if turn["recorded_ms"] is not None else "-"
+            replay = f"{turn['replay_ms']:.1f}" if turn["replay_ms"] is not None else "-"
+            print(f"{turn['input']:<62} {turn['tool_calls']:>5} {recorded:>12} {replay:>10} {turn['diverged']:>8}")
+        print(f"\n{'tool':<22} {'calls':>5} {'total ms':>10} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8}")
+        for name, stats in report["tools"].items():
+            print(f"{name:<22} {stats['count']:>5} {stats['total_ms']:>10.1f} {stats['p50_ms']:>8.2f} "
+                  f"{stats['p95_ms']:>8.2f} {stats['max_ms']:>8.2f}")
+        if args.json:
+            with open(args.json, "w") as f:
+                json.dump(report, f, indent=1)
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
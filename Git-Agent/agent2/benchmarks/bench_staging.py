@@ -0,0 +1,75 @@
+"""
+Benchmark batched staging (stage_paths) against one `git add` per file.
+
+Creates a throwaway repository with many tracked files, modifies a subset and
+stages it first path by path, then again (with new content) in one batch.
+
+Usage:
+    python benchmarks/bench_staging.py [--tracked 100000] [--modified 50]
+"""
+import argparse
+import importlib.util
+import os
+import pathlib
+import shutil
+import subprocess
+import tempfile
+import time
+from git import Repo
+
+agent_dir = pathlib.Path(__file__).parent.parent
+git_ops_spec = importlib.util.spec_from_file_location("git_operations", agent_dir / "utils" / "git_operations.py")
+git_operations = importlib.util.module_from_spec(git_ops_spec)
+git_ops_spec.loader.exec_module(git_operations)
+
+def build_repo(root, tracked):
+    """Create a repository with `tracked` small committed files"""
+    for i in range(tracked):
+        dir_path = os.path.join(root, f"dir_{i // 1000:03d}")
+        os.makedirs(dir_path, exist_ok=True)
+        with open(os.path.join(dir_path, f"file_{i:06d}.txt"), "w") as f:
+            f.write(f"{i}\n")
+    subprocess.run(["git", "init", "-q"], cwd=root, check=True)
+    subprocess.run(["git", "add", "-A"], cwd=root, check=True)
+    subprocess.run(["git", "-c", "user.email=bench@example.com", "-c", "user.name=bench",
+                    "commit", "-q", "-m", "initial"], cwd=root, check=True)
+
+def modify(root, paths, marker):
+    for path in paths:
+        with open(os.path.join(root, path), "a") as f:
+            f.write(f"{marker}\n")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tracked", type=int, default=100000)
+    parser.add_argument("--modified", type=int, default=50)
+    args = parser.parse_args()
+    
+    root = tempfile.mkdtemp(prefix="bench_staging_")
+    try:
+        print(f"Creating repository with {args.tracked} tracked files...")
+        build_repo(root, args.tracked)
+        step = max(1, args.tracked // args.modified)
+        paths = [f"dir_{i // 1000:03d}/file_{i:06d}.txt" for i in range(0, args.tracked, step)][:args.modified]
+        index_size = os.path.getsize(os.path.join(root, ".git", "index"))
+        print(f"Index size: {index_size / (1024 * 1024):.1f} MB, staging {len(paths)} modified files\n")
+        
+        repo = Repo(root)
+        modify(root, paths, "per-file")
+        start = time.perf_counter()
+        for path in paths:
+            repo.git.add(path)
+        per_file = time.perf_counter() - start
+        
+        modify(root, paths, "batched")
+        start = time.perf_counter()
+        git_operations.stage_paths(root, paths)
+        batched = time.perf_counter() - start
+        
+        print(f"{'per-file git add':<20} {per_file:>8.3f} s")
+        print(f"{'stage_paths':<20} {batched:>8.3f} s  ({per_file / batched:.1f}x faster)")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Micro-benchmark of tool input parsing for large ModifyCode payloads.
+
+Compares the single-pass parse_tool_input with the previous regex +
+character-scan + replace() extraction on payloads from 1 KB to 5 MB, and
+checks whether each one round-trips the content.
+
+Usage:
+    python benchmarks/bench_tool_input.py
+"""
+import pathlib
+import re
+import sys
+import time
+
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent))
+from utils.input_parser import parse_tool_input
+
+SIZES = [1024, 10 * 1024, 100 * 1024, 1024 * 1024, 5 * 1024 * 1024]
+
+def legacy_parse(inputs):
+    """The extraction modify_code_wrapper used before parse_tool_input"""
+    def find_closing_quote(s, start_idx, quote_char):
+        i = start_idx
+        while i < len(s):
+            if s[i] == quote_char and (i == start_idx or s[i-1] != '\\'):
+                return i
+            i += 1
+        return -1
+    
+    file_path = re.search(r'file_path\s*=\s*[\'\"]([^\'\"]+)[\'\"]', inputs).group(1)
+    start_idx = inputs.find("new_content =") + len("new_content =")
+    content_part = inputs[start_idx:].strip()
+    end_idx = find_closing_quote(content_part, 1, '"')
+    new_content = content_part[1:end_idx].replace('\\n', '\n').replace('\\t', '\t')
+    return {"file_path": file_path, "new_content": new_content}
+
+def make_payload(size):
+    """A Python source file of roughly `size` bytes, escaped the way the LLM sends it"""
+    line = 'def greet(name):\n\tprint("Hello, %s" % name)  # \\d+ stays literal\n'
+    content = (line * (size // len(line) + 1))[:size]
+    escaped = content.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n").replace("\t", "\\t")
+    return content, f'file_path = "src/app.py", new_content = "{escaped}"'
+
+def timed(fn, payload, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(payload)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def main():
+    print(f"{'payload':>10} {'legacy (ms)':>12} {'single-pass (ms)':>17} {'legacy ok':>10} {'single-pass ok':>15}")
+    for size in SIZES:
+        content, payload = make_payload(size)
+        repeat = 5 if size <= 1024 * 1024 else 2
+        legacy_time, legacy_result = timed(legacy_parse, payload, repeat)
+        new_time, new_result = timed(parse_tool_input, payload, repeat)
+        print(f"{size // 1024:>8} KB {legacy_time * 1000:>12.1f} {new_time * 1000:>17.1f} "
+              f"{str(legacy_result['new_content'] == content):>10} {str(new_result['new_content'] == content):>15}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Script run times of the Streamlit app on a large repository.
+
+Drives app.py headlessly with Streamlit's AppTest against a generated
+repository, with the offline model, and reports the median time of:
+
+- page: a full script run (first load, sidebar form, configuration change)
+- reply: a chat turn as the page handles it. With --script pointing at an
+  older app.py that ends a reply with st.rerun(), this is two full runs.
+- chat fragment / explorer fragment: what a reply and a sidebar refresh
+  re-run in this app. AppTest always runs whole scripts, so these are timed
+  through a small driver script that calls only the fragment.
+- explorer after an edit: a sidebar refresh after a tool changed one file,
+  which patches that path instead of walking the repository
+
+Usage:
+    python benchmarks/bench_ui_rerun.py [--files 3000] [--runs 5] [--script app.py]
+"""
+import argparse
+import os
+import pathlib
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+agent_dir = pathlib.Path(__file__).parent.parent
+sys.path.insert(0, str(agent_dir))
+
+DRIVER = '''
+import sys
+sys.path.insert(0, {agent_dir!r})
+import streamlit as st
+import app
+st.session_state.setdefault("messages", [])
+st.session_state.setdefault("initialized", False)
+st.session_state.setdefault("repo_path", app.REPO_PATH)
+st.session_state.setdefault("github_repo", app.GITHUB_REPO)
+st.session_state.setdefault("github_user", app.GITHUB_USER)
+st.session_state.setdefault("branch", "main")
+if {panel!r} == "chat":
+    app.chat_panel(None)
+else:
+    with st.sidebar:
+        app.repository_panel(st.session_state.repo_path)
+'''
+
+def git(cwd, *args):
+    subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True)
+
+def build_fixture(path, files):
+    directories = max(1, files // 50)
+    for i in range(files):
+        directory = os.path.join(path, f"pkg_{i % directories}", f"sub_{i % 3}")
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, f"module_{i}.py"), "w") as f:
+            f.write(f"def func_{i}():\n    return {i}\n")
+    git(path, "init", "-q", "-b", "main")
+    git(path, "add", "-A")
+    git(path, "-c", "user.email=bench@example.com", "-c", "user.name=bench", "commit", "-q", "-m", "initial")
+
+def timed(action, runs):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        action()
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--files", type=int, default=3000)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--script", default=str(agent_dir / "app.py"), help="app script to time")
+    args = parser.parse_args()
+    
+    root = tempfile.mkdtemp(prefix="ui-rerun-")
+    try:
+        fixture = os.path.join(root, "repo")
+        os.makedirs(fixture)
+        build_fixture(fixture, args.files)
+        os.environ.update({
+            "LOCAL_REPO_PATH": fixture,
+            "LLM_PROVIDER": "fake",
+            "LLM_CACHE_ENABLED": "false",
+            "STREAM_TOKENS": "false",
+            "GIT_TERMINAL_PROMPT": "0",
+        })
+        
+        from streamlit.testing.v1 import AppTest
+        page = AppTest.from_file(args.script, default_timeout=120)
+        page.run()
+        if page.exception:
+            print(f"Error running {args.script}: {page.exception[0].message}")
+            return
+        
+        def chat_turn():
+            page.chat_input[0].set_value("Summarize the repository").run()
+        
+        results = {
+            "page": timed(page.run, args.runs),
+            "reply": timed(chat_turn, args.runs),
+        }
+        
+        if "def chat_panel" in pathlib.Path(args.script).read_text():
+            drivers = {}
+            for panel in ("chat", "explorer"):
+                driver_path = os.path.join(root, f"driver_{panel}.py")
+                with open(driver_path, "w") as f:
+                    f.write(DRIVER.format(agent_dir=str(pathlib.Path(args.script).parent), panel=panel))
+                drivers[panel] = AppTest.from_file(driver_path, default_timeout=120)
+                drivers[panel].run()
+            
+            from utils.repo_state import bump_repo_version, note_path_changed
+            edited = os.path.join(fixture, "pkg_0", "sub_0", "module_0.py")
+            
+            def edit_and_refresh():
+                with open(edited, "a") as f:
+                    f.write("# edited\n")
+                note_path_changed(fixture, edited)
+                bump_repo_version(fixture)
+                drivers["explorer"].run()
+            
+            results["chat fragment"] = timed(drivers["chat"].run, args.runs)
+            results["explorer fragment"] = timed(drivers["explorer"].run, args.runs)
+            results["explorer after an edit"] = timed(edit_and_refresh, args.runs)
+        
+        print(f"{args.script} on {args.files} files, median of {args.runs} runs:")
+        for name, ms in results.items():
+            print(f"  {name:<24} {ms:8.1f} ms")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
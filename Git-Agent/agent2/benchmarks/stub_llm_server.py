@@ -0,0 +1,190 @@
+"""
+Local stand-in for an OpenAI-compatible provider that enforces rate limits.
+
+Serves /v1/chat/completions and /v1/completions with a canned reply, after
+charging the request to per-minute request and token buckets like the real
+API: every response carries x-ratelimit-* headers, and requests over budget
+get a 429 with Retry-After. The buckets hold only `burst` seconds of budget,
+so concurrent callers run into 429s within a few requests.
+
+GET /stats returns the counts (requests, ok, rate_limited); POST /stats resets them.
+
+Usage:
+    python benchmarks/stub_llm_server.py [--port 8766] [--rpm 120] [--tpm 40000] [--burst 1] [--latency 0.05]
+Then point a client at it, e.g. ChatOpenAI(base_url="http://127.0.0.1:8766/v1", api_key="stub").
+"""
+import argparse
+import json
+import math
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+REPLY = "Stub reply."
+
+class StubLimits:
+    """Provider-side request and token buckets, refilled continuously"""
+    def __init__(self, rpm, tpm, burst=1.0):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.capacity = {"requests": rpm / 60 * burst, "tokens": tpm / 60 * burst}
+        self.level = dict(self.capacity)
+        self.rate = {"requests": rpm / 60, "tokens": tpm / 60}
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+        self.counts = {"requests": 0, "ok": 0, "rate_limited": 0}
+    
+    def charge(self, tokens):
+        """
+        Charge one request of `tokens`
+        
+        Returns:
+            tuple: (allowed, headers)
+        """
+        with self.lock:
+            now = time.monotonic()
+            for kind in self.level:
+                self.level[kind] = min(self.capacity[kind], self.level[kind] + (now - self.updated) * self.rate[kind])
+            self.updated = now
+            self.counts["requests"] += 1
+            tokens = min(tokens, self.capacity["tokens"])
+            allowed = self.level["requests"] >= 1 and self.level["tokens"] >= tokens
+            if allowed:
+                self.level["requests"] -= 1
+                self.level["tokens"] -= tokens
+                self.counts["ok"] += 1
+            else:
+                self.counts["rate_limited"] += 1
+            
+            reset = {
+                "requests": max(0.0, 1 - self.level["requests"]) / self.rate["requests"],
+                "tokens": max(0.0, tokens - self.level["tokens"]) / self.rate["tokens"],
+            }
+            headers = {
+                "x-ratelimit-limit-requests": str(self.rpm),
+                "x-ratelimit-limit-tokens": str(self.tpm),
+                "x-ratelimit-remaining-requests": str(int(self.level["requests"])),
+                "x-ratelimit-remaining-tokens": str(int(self.level["tokens"])),
+                "x-ratelimit-reset-requests": f"{int(reset['requests'] * 1000)}ms",
+                "x-ratelimit-reset-tokens": f"{int(reset['tokens'] * 1000)}ms",
+            }
+            if not allowed:
+                wait = max(reset.values())
+                headers["retry-after-ms"] = str(int(wait * 1000))
+                headers["retry-after"] = str(math.ceil(wait))
+            return allowed, headers
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    
+    def handle_error(self, request, client_address):
+        # Clients dropping idle keep-alive connections are not errors
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+def make_handler(limits, latency):
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        
+        def log_message(self, format, *args):
+            pass
+        
+        def send_json(self, status, body, headers=None):
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(data)
+        
+        def do_GET(self):
+            if self.path == "/stats":
+                with limits.lock:
+                    self.send_json(200, dict(limits.counts))
+            else:
+                self.send_json(404, {"error": {"message": "Not found"}})
+        
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            try:
+                body = json.loads(self.rfile.read(length) or b"{}")
+            except ValueError:
+                body = {}
+            if self.path == "/stats":
+                with limits.lock:
+                    limits.counts = {key: 0 for key in limits.counts}
+                self.send_json(200, {"reset": True})
+                return
+            if not self.path.endswith(("/chat/completions", "/completions")):
+                self.send_json(404, {"error": {"message": "Not found"}})
+                return
+            
+            prompt = body.get("messages") or body.get("prompt") or ""
+            prompt_tokens = len(prompt if isinstance(prompt, str) else json.dumps(prompt)) // 4
+            completion_tokens = len(REPLY) // 4
+            allowed, headers = limits.charge(prompt_tokens + int(body.get("max_tokens") or completion_tokens))
+            if not allowed:
+                self.send_json(429, {"error": {"message": "Rate limit reached", "type": "requests", "code": "rate_limit_exceeded"}}, headers)
+                return
+            
+            time.sleep(latency)
+            usage = {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                     "total_tokens": prompt_tokens + completion_tokens}
+            if self.path.endswith("/chat/completions"):
+                choice = {"index": 0, "message": {"role": "assistant", "content": REPLY}, "finish_reason": "stop"}
+                kind = "chat.completion"
+            else:
+                choice = {"index": 0, "text": REPLY, "logprobs": None, "finish_reason": "stop"}
+                kind = "text_completion"
+            self.send_json(200, {
+                "id": f"stub-{time.monotonic_ns()}",
+                "object": kind,
+                "created": int(time.time()),
+                "model": body.get("model", "stub"),
+                "choices": [choice],
+                "usage": usage,
+            }, headers)
+    
+    return StubHandler
+
+def start_stub_server(port=0, rpm=120, tpm=40000, burst=1.0, latency=0.05):
+    """
+    Serve the stub on a background thread
+    
+    Args:
+        port (int): Port to listen on (0: any free port)
+        rpm (int): Requests per minute
+        tpm (int): Tokens per minute
+        burst (float): Seconds of budget the buckets hold
+        latency (float): Seconds to answer an allowed request
+    
+    Returns:
+        tuple: (server, base_url); stop with server.shutdown()
+    """
+    limits = StubLimits(rpm, tpm, burst)
+    server = StubServer(("127.0.0.1", port), make_handler(limits, latency))
+    server.limits = limits
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--rpm", type=int, default=120)
+    parser.add_argument("--tpm", type=int, default=40000)
+    parser.add_argument("--burst", type=float, default=1.0, help="seconds of budget the buckets hold")
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds per allowed request")
+    args = parser.parse_args()
+    
+    server, base_url = start_stub_server(args.port, args.rpm, args.tpm, args.burst, args.latency)
+    print(f"Stub provider at {base_url} ({args.rpm} requests/min, {args.tpm} tokens/min)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
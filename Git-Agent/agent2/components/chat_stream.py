@@ -0,0 +1,71 @@
+import time
+import threading
+from langchain_core.callbacks import BaseCallbackHandler
+
+class StreamlitChatCallbackHandler(BaseCallbackHandler):
+    """
+    Streams LLM tokens and tool start/finish events into a Streamlit placeholder
+    
+    Streamlit elements can only be updated from the script thread, so events
+    from tool worker threads are buffered and shown with the next update made
+    on the script thread. Redraws are throttled to `min_interval` seconds.
+    """
+    def __init__(self, container, min_interval=0.05):
+        self.container = container
+        self.min_interval = min_interval
+        self.script_thread = threading.get_ident()
+        self.lock = threading.Lock()
+        self.steps = []  # finished lines: model output and tool events
+        self.tokens = []  # tokens of the model call in progress
+        self.tool_starts = {}
+        self.last_render = 0.0
+        self.first_output_at = None
+        self.started_at = time.perf_counter()
+    
+    def _render(self, force=False):
+        if threading.get_ident() != self.script_thread:
+            return
+        now = time.perf_counter()
+        if not force and now - self.last_render < self.min_interval:
+            return
+        self.last_render = now
+        with self.lock:
+            text = "\n\n".join(self.steps + (["".join(self.tokens) + " ▌"] if self.tokens else []))
+        self.container.markdown(text or "Thinking...")
+    
+    def _mark_output(self):
+        if self.first_output_at is None:
+            self.first_output_at = time.perf_counter() - self.started_at
+    
+    def on_llm_new_token(self, token, **kwargs):
+        self._mark_output()
+        with self.lock:
+            self.tokens.append(token)
+        self._render()
+    
+    def on_llm_end(self, response, **kwargs):
+        with self.lock:
+            if self.tokens:
+                self.steps.append("".join(self.tokens).strip())
+                self.tokens = []
+        self._render(force=True)
+    
+    def on_tool_start(self, serialized, input_str, run_id=None, **kwargs):
+        self._mark_output()
+        name = (serialized or {}).get("name", "tool")
+        with self.lock:
+            self.tool_starts[run_id] = (name, time.perf_counter())
+            self.steps.append(f"🔧 Running `{name}`...")
+        self._render(force=True)
+    
+    def on_tool_end(self, output, run_id=None, **kwargs):
+        with self.lock:
+            name, started = self.tool_starts.pop(run_id, ("tool", time.perf_counter()))
+            self.steps.append(f"✅ `{name}` finished in {time.perf_counter() - started:.1f} s ({len(str(output))} chars)")
+        self._render(force=True)
+    
+    def on_tool_error(self, error, run_id=None, **kwargs):
+        with self.lock:
+            name, _ = self.tool_starts.pop(run_id, ("tool", None))
+            self.steps.append(f"❌ `{name}` failed: {str(error)[:200]}")
+        self._render(force=True)
@@ -1,6 +1,8 @@
+import os
 import streamlit as st
 import importlib.util
 import pathlib
+from utils.repo_state import get_changed_paths, get_state_version
 
 # Dynamic import for file_operations
 utils_dir = pathlib.Path(__file__).parent.parent / "utils"
@@ -10,31 +12,114 @@ file_operations = importlib.util.module_from_spec(file_ops_spec)
 file_ops_spec.loader.exec_module(file_operations)
 
 list_files = file_operations.list_files
+update_file_tree = file_operations.update_file_tree
 
-def render_file_tree(repo_path):
+def get_file_tree(repo_path):
+    """
+    The file tree of the repository, kept in session state between runs
+    
+    After the first walk, only the paths changed since the last call (see
+    utils.repo_state.get_changed_paths) are looked at again; the repository
+    is walked again when the changes cannot be named. Walks are shared by
+    all sessions through load_file_tree.
+    
+    Args:
+        repo_path (str): Path to the repository
+    
+    Returns:
+        dict or str: Tree as from list_files(get_tree=True), or an error message
+    """
+    state = st.session_state.get("file_tree")
+    since = state["version"] if state and state["repo_path"] == repo_path else None
+    version, changed = get_changed_paths(repo_path, since)
+    if changed is None or isinstance(state["tree"], str):
+        state = {"repo_path": repo_path, "tree": load_file_tree(repo_path, get_state_version(repo_path))}
+    else:
+        for path in changed:
+            update_file_tree(state["tree"], repo_path, path)
+    state["version"] = version
+    st.session_state.file_tree = state
+    return state["tree"]
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def load_file_tree(repo_path, version):
+    """
+    Walk the repository once per version from utils.repo_state.get_state_version
+    
+    Each caller gets its own copy of the tree, so sessions can patch theirs.
+    """
+    return list_files(repo_path, get_tree=True)
+
+def render_file_tree(repo_path, container=None):
     """
     Render a collapsible file explorer for the repository
     
     Args:
         repo_path (str): Path to the repository
+        container: The streamlit container to render in (defaults to the sidebar)
     """
-    st.sidebar.markdown("### Repository Files")
+    container = container or st.sidebar
+    container.markdown("### Repository Files")
     
     # Get the file tree structure
-    file_tree = list_files(repo_path, get_tree=True)
+    file_tree = get_file_tree(repo_path)
     
     if isinstance(file_tree, str):
         # Error message from list_files
-        st.sidebar.warning(file_tree)
+        container.warning(file_tree)
     elif not file_tree:
-        st.sidebar.info("No files found in repository.")
+        container.info("No files found in repository.")
     else:
+        # One picker for viewing files instead of a button per file
+        file_path = container.selectbox(
+            "View file",
+            options=sorted(list_tree_paths(file_tree)),
+            index=None,
+            placeholder="Choose a file to view",
+            key="view_file"
+        )
+        if file_path:
+            render_file_view(repo_path, file_path, container)
+        
         # Render the tree structure
-        render_directory("", file_tree, 0, st.sidebar)
+        files, _ = split_entries(file_tree)
+        if files:
+            container.markdown(file_list_markdown(files))
+        render_directory("", file_tree, 0, container)
+
+def split_entries(directory):
+    """Sorted (files, subdirectories) of a tree level, as (name, info) pairs"""
+    files, subdirectories = [], []
+    for name, info in sorted(directory.items()):
+        # Skip metadata keys
+        if name in ["__type", "__files", "__size", "__path"]:
+            continue
+        if info.get("__type") == "directory":
+            subdirectories.append((name, info))
+        else:
+            files.append((name, info))
+    return files, subdirectories
+
+def file_list_markdown(files):
+    return "\n".join(f"- 📄 **{name}** ({info.get('__size', '')})" for name, info in files)
+
+def list_tree_paths(directory):
+    """Paths of all files in a tree, directories first at each level"""
+    files, subdirectories = split_entries(directory)
+    paths = []
+    for _, info in subdirectories:
+        paths.extend(list_tree_paths(info.get("__files", {})))
+    paths.extend(info.get("__path", name) for name, info in files)
+    return paths
 
 def render_directory(path_prefix, directory, depth, container):
     """
-    Recursively render a directory and its contents
+    Recursively render the subdirectories of a directory
+    
+    Each subdirectory is an expander labelled with its path that lists its
+    files in a single element; expanders cannot be nested, so deeper
+    directories follow as siblings. A few elements per directory keep large
+    repositories quick to render.
     
     Args:
         path_prefix (str): Path prefix for this directory
@@ -42,49 +127,28 @@ def render_directory(path_prefix, directory, depth, container):
         depth (int): Current depth in the tree
         container: The streamlit container to render in
     """
-    # Sort entries: directories first, then files
-    sorted_entries = sorted(
-        directory.items(),
-        key=lambda x: (0 if x[0] == "__type" or x[0] == "__files" or x[0] == "__size" or x[0] == "__path" 
-                        else (1 if x[1].get("__type") == "directory" else 2), x[0])
-    )
-    
-    for name, info in sorted_entries:
-        # Skip metadata keys
-        if name in ["__type", "__files", "__size", "__path"]:
-            continue
-        
-        # Check if this is a directory or file
-        is_directory = info.get("__type") == "directory"
+    _, subdirectories = split_entries(directory)
+    for name, info in subdirectories:
+        # Calculate the full path for this directory
+        dir_path = f"{path_prefix}/{name}" if path_prefix else name
+        contents = info.get("__files", {})
+        files, _ = split_entries(contents)
         
-        if is_directory:
-            # Calculate the full path for this directory
-            dir_path = f"{path_prefix}/{name}" if path_prefix else name
-            
-            # Create an expander for this directory
-            with container.expander(f"📁 {name}", expanded=depth < 1):
-                # Render the contents of this directory in a new container to avoid nesting expanders
-                render_directory(dir_path, info.get("__files", {}), depth + 1, container)
+        # Create an expander for this directory
+        expander = container.expander(f"📁 {dir_path}", expanded=depth < 1)
+        expander.markdown(file_list_markdown(files) if files else "_No files_")
+        render_directory(dir_path, contents, depth + 1, container)
+
+def render_file_view(repo_path, file_path, container):
+    """Show the content of a repository file"""
+    container.subheader(f"File: {os.path.basename(file_path)}")
+    try:
+        full_path = os.path.join(repo_path, file_path)
+        if os.path.exists(full_path):
+            with open(full_path, 'r') as f:
+                content = f.read()
+            container.code(content)
         else:
-            # This is a file
-            file_size = info.get("__size", "")
-            file_path = info.get("__path", "")
-            
-            # Display the file with its size
-            container.markdown(f"📄 **{name}** ({file_size})")
-            
-            # Add a button to view the file content
-            if container.button(f"View", key=f"view_{file_path}"):
-                # Create a main area container to show the file content
-                st.subheader(f"File: {name}")
-                try:
-                    import os
-                    full_path = os.path.join(st.session_state.repo_path, file_path)
-                    if os.path.exists(full_path):
-                        with open(full_path, 'r') as f:
-                            content = f.read()
-                        st.code(content)
-                    else:
-                        st.warning(f"File not found: {file_path}")
-                except Exception as e:
-                    st.error(f"Error reading file: {str(e)}")
\ No newline at end of file
+            container.warning(f"File not found: {file_path}")
+    except Exception as e:
+        container.error(f"Error reading file: {str(e)}")
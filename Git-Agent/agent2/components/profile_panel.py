@@ -0,0 +1,34 @@
+import streamlit as st
+
+def render_turn_profile(profile, container=None):
+    """
+    Render the time breakdown of the last agent turn
+    
+    Args:
+        profile (dict): Summary from TurnProfiler.finish()
+        container: Streamlit container to render into (defaults to the sidebar)
+    """
+    if not profile:
+        return
+    container = container or st.sidebar
+    
+    with container.expander(f"Last turn: {profile['total_ms'] / 1000:.1f} s", expanded=False):
+        by_category = profile["by_category_ms"]
+        columns = st.columns(3)
+        columns[0].metric("LLM", f"{by_category['llm'] / 1000:.1f} s")
+        columns[1].metric("Tools", f"{by_category['tool'] / 1000:.1f} s")
+        columns[2].metric("Subprocess", f"{by_category['subprocess'] / 1000:.1f} s")
+        st.caption(f"Tokens: {profile['prompt_tokens']} prompt, {profile['completion_tokens']} completion")
+        
+        rows = []
+        for span in profile["spans"]:
+            detail = span["attributes"].get("command") or ""
+            if span["name"] == "llm":
+                detail = f"{span['attributes'].get('prompt_tokens', 0)} → {span['attributes'].get('completion_tokens', 0)} tokens"
+            rows.append({
+                "span": " " * span["depth"] + span["name"],
+                "ms": round(span["duration_ms"], 1),
+                "detail": detail,
+                "error": span["error"] or "",
+            })
+        st.dataframe(rows, hide_index=True, use_container_width=True)
@@ -2,7 +2,9 @@ import streamlit as st
 import os
 import importlib.util
 import pathlib
-from git import Repo, GitCommandError
+from utils.repo_sync import get_fetch_status
+from utils.ref_snapshot import get_ref_snapshot
+from utils.repo_state import get_state_version
 
 # Dynamic import for file_operations
 utils_dir = pathlib.Path(__file__).parent.parent / "utils"
@@ -14,21 +16,21 @@ file_ops_spec.loader.exec_module(file_operations)
 list_files = file_operations.list_files
 
 def get_branches(repo_path):
-    """Get list of branches in the repository"""
+    """Get list of branches in the repository, read again only when the repository changed"""
+    return load_branches(repo_path, get_state_version(repo_path))
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def load_branches(repo_path, version):
+    """Branches of the repository at a version from utils.repo_state.get_state_version"""
     try:
         if os.path.exists(os.path.join(repo_path, ".git")):
-            repo = Repo(repo_path)
-            branches = []
-            for ref in repo.references:
-                if ref.name.startswith("origin/"):
-                    branch_name = ref.name.split("origin/")[1]
-                    branches.append(branch_name)
-                elif not ref.name.startswith("HEAD"):
-                    branches.append(ref.name)
+            snapshot = get_ref_snapshot(repo_path)
+            branches = set(snapshot["local_branches"])
+            for remote_branch in snapshot["remote_branches"]:
+                branches.add(remote_branch.split("/", 1)[1])
             
             # Remove duplicates and sort
-            branches = sorted(list(set(branches)))
-            return branches
+            return sorted(branches)
         return ["main"]  # Default branch
     except Exception as e:
         print(f"Error getting branches: {str(e)}")
@@ -105,4 +107,30 @@ def render_sidebar(repo_path, github_repo, github_user, on_config_change=None):
         "repo_path": repo_path,
         "github_repo": github_repo,
         "github_user": github_user
-    }
\ No newline at end of file
+    }
+
+def render_repo_status(repo_path, container=None):
+    """
+    Render the background fetch status and the tool cache hit rates
+    
+    Args:
+        repo_path (str): Current repository path
+        container: The streamlit container to render in (defaults to the sidebar)
+    """
+    container = container or st.sidebar
+    
+    # Background fetch status
+    fetch_status = get_fetch_status(repo_path)
+    if fetch_status["status"] == "running":
+        container.caption("Fetching latest changes...")
+    elif fetch_status["message"]:
+        container.caption(fetch_status["message"])
+    
+    # Tool result cache hit rates for this session
+    tool_cache = st.session_state.get("tool_cache")
+    if tool_cache is not None:
+        total = tool_cache.hit_rates()["total"]
+        if total["hits"] + total["misses"]:
+            container.caption(
+                f"Tool cache: {total['hits']}/{total['hits'] + total['misses']} hits ({total['hit_rate']:.0%})"
+            )
@@ -13,4 +13,109 @@ OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 
 # Constants
 MAX_CONTENT_DISPLAY = 1000  # Maximum characters to display in logs
-MAX_FILE_SIZE = 50000  # Maximum file size to process in tools
\ No newline at end of file
+MAX_FILE_SIZE = 50000  # Maximum file size to process in tools
+
+# Clone strategy (see utils/git_operations.clone_with_strategy)
+CLONE_DEPTH = int(os.getenv("CLONE_DEPTH", "0")) or None  # e.g. 1 for a shallow clone
+CLONE_FILTER = os.getenv("CLONE_FILTER") or None  # e.g. "blob:none" for a partial clone
+CLONE_SPARSE_PATHS = [p.strip() for p in os.getenv("CLONE_SPARSE_PATHS", "").split(",") if p.strip()]
+
+# Shared bare mirror per remote; sessions get a git worktree off it instead of a full clone
+USE_MIRROR_CACHE = os.getenv("USE_MIRROR_CACHE", "true").lower() == "true"
+MIRROR_CACHE_DIR = os.getenv("MIRROR_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "agent2", "mirrors"))
+
+# Background fetch: skip fetching when the last one is younger than this
+FETCH_TTL_SECONDS = int(os.getenv("FETCH_TTL_SECONDS", "300"))
+
+# CommitAndPush coalescing: changes queued within this window become one commit and one push
+COMMIT_COALESCE_WINDOW = float(os.getenv("COMMIT_COALESCE_WINDOW", "10"))
+PUSH_MAX_RETRIES = int(os.getenv("PUSH_MAX_RETRIES", "5"))
+
+# Blob cache for ReadFileAtRevision (bytes, keyed by blob SHA)
+REVISION_CACHE_BYTES = int(os.getenv("REVISION_CACHE_BYTES", str(32 * 1024 * 1024)))
+
+# Concurrent agent tasks, each on its own git worktree
+TASK_MAX_WORKERS = int(os.getenv("TASK_MAX_WORKERS", "4"))
+TASK_WORKTREE_ROOT = os.getenv("TASK_WORKTREE_ROOT")  # defaults to "<repo_path>.worktrees"
+
+# Agent mode: "react" (text ReAct on a completion model) or "tools" (native tool calling on a chat model)
+AGENT_MODE = os.getenv("AGENT_MODE", "react")
+AGENT_CHAT_MODEL = os.getenv("AGENT_CHAT_MODEL", "gpt-3.5-turbo")
+
+# Tool tracing: spans for every wrapper and dev operation, exported as JSON lines
+TRACE_ENABLED = os.getenv("TRACE_ENABLED", "true").lower() == "true"
+TRACE_FILE = os.getenv("TRACE_FILE", os.path.join(os.path.expanduser("~"), ".cache", "agent2", "traces.jsonl"))
+# The trace file is rotated at this size, keeping TRACE_FILE_BACKUPS old files
+TRACE_FILE_MAX_BYTES = int(os.getenv("TRACE_FILE_MAX_BYTES", str(10 * 1024 * 1024)))
+TRACE_FILE_BACKUPS = int(os.getenv("TRACE_FILE_BACKUPS", "2"))
+
+# Read-only tool calls from one model reply run concurrently on this many threads
+TOOL_CALL_MAX_WORKERS = int(os.getenv("TOOL_CALL_MAX_WORKERS", "4"))
+
+# Token budgets: share of the model context window each tool's output (and the prompt) may use
+CONTEXT_WINDOW_TOKENS = int(os.getenv("CONTEXT_WINDOW_TOKENS", "4096"))
+TOKEN_BUDGET_SHARES = {
+    "ReadFile": 0.3,
+    "ReadFileAtRevision": 0.3,
+    "GenerateDiff": 0.25,
+    "RunTests": 0.2,
+    "RunCommand": 0.2,
+    "SearchCode": 0.15,
+    "LintCode": 0.15,
+    "AnalyzeCode": 0.15,
+    "prompt": 0.15,
+    "repo_map": 0.1,
+    "default": 0.1,
+}
+
+# LLM provider: "openai", or "fake" for the deterministic local stand-in (offline runs, benchmarks)
+LLM_PROVIDER = os.getenv("LLM_PROVIDER", "openai")
+FAKE_LLM_RESPONSES = os.getenv("FAKE_LLM_RESPONSES")  # JSON list of scripted replies
+FAKE_LLM_LATENCY = float(os.getenv("FAKE_LLM_LATENCY", "0"))  # simulated seconds per call
+
+# On-disk exact-match cache of LLM responses
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", os.path.join(os.path.expanduser("~"), ".cache", "agent2", "llm_cache.sqlite"))
+LLM_CACHE_TTL_SECONDS = int(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "5000"))
+
+# Ready agents kept per (repository, branch) so switching back is instant
+AGENT_POOL_SIZE = int(os.getenv("AGENT_POOL_SIZE", "3"))
+
+# Stream model tokens to the chat as they are generated
+STREAM_TOKENS = os.getenv("STREAM_TOKENS", "true").lower() == "true"
+
+# Per-turn agent profiles (span trees), exported as OTLP/JSON lines
+PROFILE_FILE = os.getenv("PROFILE_FILE", os.path.join(os.path.expanduser("~"), ".cache", "agent2", "profiles.jsonl"))
+
+# Record each chat session's LLM replies and tool calls here, for benchmarks/bench_replay.py (unset: off)
+SESSION_RECORD_DIR = os.getenv("SESSION_RECORD_DIR")
+
+# Repository map (tree, symbols, entry points) put in the agent prompt, cached on disk per HEAD
+REPO_MAP_ENABLED = os.getenv("REPO_MAP_ENABLED", "true").lower() == "true"
+REPO_MAP_CACHE_DIR = os.getenv("REPO_MAP_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "agent2", "repo_maps"))
+
+# Agent backend (server.py): hosts agents for all sessions; the app becomes a thin client when BACKEND_URL is set
+BACKEND_URL = os.getenv("BACKEND_URL")  # e.g. http://127.0.0.1:8765
+BACKEND_HOST = os.getenv("BACKEND_HOST", "127.0.0.1")
+BACKEND_PORT = int(os.getenv("BACKEND_PORT", "8765"))
+AGENT_SERVICE_WORKERS = int(os.getenv("AGENT_SERVICE_WORKERS", "4"))  # agent runs at once, across sessions
+# Shared secret clients send as "Authorization: Bearer <token>"; the backend refuses to start without one
+BACKEND_TOKEN = os.getenv("BACKEND_TOKEN")
+# Host names the backend answers to (against DNS rebinding) and browser origins it accepts (none by default)
+BACKEND_ALLOWED_HOSTS = [h.strip() for h in os.getenv("BACKEND_ALLOWED_HOSTS", "127.0.0.1,localhost,::1").split(",") if h.strip()]
+BACKEND_ALLOWED_ORIGINS = [o.strip() for o in os.getenv("BACKEND_ALLOWED_ORIGINS", "").split(",") if o.strip()]
+# Directories sessions may work in (comma-separated); defaults to LOCAL_REPO_PATH
+BACKEND_REPO_ROOTS = [r.strip() for r in os.getenv("BACKEND_REPO_ROOTS", REPO_PATH).split(",") if r.strip()]
+
+# Shared scheduler for LLM provider calls (utils/rate_limiter.py): request and token budgets per minute,
+# learned down from the provider's rate-limit headers; 429s pause every caller and are retried
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+RATE_LIMIT_RPM = int(os.getenv("RATE_LIMIT_RPM", "500"))  # requests per minute
+RATE_LIMIT_TPM = int(os.getenv("RATE_LIMIT_TPM", "200000"))  # prompt + completion tokens per minute
+RATE_LIMIT_MAX_RETRIES = int(os.getenv("RATE_LIMIT_MAX_RETRIES", "5"))  # 429 retries per request
+RATE_LIMIT_MAX_WAIT = float(os.getenv("RATE_LIMIT_MAX_WAIT", "120"))  # seconds a request may queue
+
+# The sidebar (file explorer, fetch status) refreshes on its own every this many seconds, patching only
+# changed paths; chat replies refresh only the chat (0: the sidebar refreshes on its own interactions only)
+FILE_TREE_REFRESH_SECONDS = float(os.getenv("FILE_TREE_REFRESH_SECONDS", "5"))
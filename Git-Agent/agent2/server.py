@@ -0,0 +1,225 @@
+"""
+Agent backend: hosts the agents of every chat session in one asyncio process.
+
+Endpoints (JSON):
+    GET    /health                      worker pool usage
+    POST   /sessions                    start a session {repo_path, github_repo, github_user, branch}
+    GET    /sessions/{id}               session state, agent status and messages
+    DELETE /sessions/{id}               forget a session
+    POST   /sessions/{id}/runs          run a turn {prompt}; streams events as JSON lines
+    GET    /sessions/{id}/ws            WebSocket; send {"prompt": ...}, receive events
+
+The GitHub token and OpenAI key are read from the environment here and never
+sent by clients. Point the Streamlit app at it with BACKEND_URL.
+
+Every request must carry "Authorization: Bearer $BACKEND_TOKEN" and a Host in
+BACKEND_ALLOWED_HOSTS; requests from browser origins outside
+BACKEND_ALLOWED_ORIGINS and bodies that are not application/json are refused,
+and sessions may only use repositories under BACKEND_REPO_ROOTS.
+
+Usage:
+    python server.py [--host 127.0.0.1] [--port 8765] [--workers 4]
+"""
+import os
+import sys
+import hmac
+import json
+import argparse
+import importlib.util
+import pathlib
+
+try:
+    from aiohttp import web, WSMsgType
+except ImportError:
+    web = None
+
+current_dir = pathlib.Path(__file__).parent
+sys.path.insert(0, str(current_dir))
+
+config_path = current_dir / "config.py"
+config_spec = importlib.util.spec_from_file_location("config", config_path)
+config = importlib.util.module_from_spec(config_spec)
+config_spec.loader.exec_module(config)
+
+REPO_PATH = config.REPO_PATH
+GITHUB_REPO = config.GITHUB_REPO
+GITHUB_USER = config.GITHUB_USER
+BACKEND_HOST = config.BACKEND_HOST
+BACKEND_PORT = config.BACKEND_PORT
+AGENT_SERVICE_WORKERS = config.AGENT_SERVICE_WORKERS
+BACKEND_TOKEN = config.BACKEND_TOKEN
+BACKEND_ALLOWED_HOSTS = config.BACKEND_ALLOWED_HOSTS
+BACKEND_ALLOWED_ORIGINS = config.BACKEND_ALLOWED_ORIGINS
+BACKEND_REPO_ROOTS = config.BACKEND_REPO_ROOTS
+
+service_path = current_dir / "agent" / "service.py"
+service_spec = importlib.util.spec_from_file_location("service", service_path)
+service_module = importlib.util.module_from_spec(service_spec)
+service_spec.loader.exec_module(service_module)
+
+AgentService = service_module.AgentService
+
+def _dumps(value):
+    return json.dumps(value, default=str)
+
+def _session_id(request, service):
+    session_id = request.match_info["session_id"]
+    if session_id not in service.sessions:
+        raise web.HTTPNotFound(text=_dumps({"error": f"Unknown session {session_id}"}), content_type="application/json")
+    return session_id
+
+def _error(exception_class, message):
+    return exception_class(text=_dumps({"error": message}), content_type="application/json")
+
+def _host_name(host):
+    """Host header without the port ("[::1]:8765" -> "::1")"""
+    if host.startswith("["):
+        return host[1:].split("]", 1)[0]
+    return host.rsplit(":", 1)[0] if host.count(":") == 1 else host
+
+def _within_roots(repo_path, roots):
+    """Whether repo_path is one of the roots or below one (symlinks resolved)"""
+    path = os.path.realpath(repo_path)
+    for root in roots:
+        root = os.path.realpath(root)
+        if path == root or path.startswith(root.rstrip(os.sep) + os.sep):
+            return True
+    return False
+
+def make_guard(token, allowed_hosts, allowed_origins):
+    """
+    Middleware checking the shared secret, Host and Origin of every request
+    
+    The backend drives agents that run commands with the server's GitHub
+    token, so it only answers known clients: a page in a browser can neither
+    send the secret nor (through DNS rebinding) a Host outside allowed_hosts.
+    """
+    expected = f"Bearer {token}".encode()
+    
+    @web.middleware
+    async def guard(request, handler):
+        if _host_name(request.host or "") not in allowed_hosts:
+            raise _error(web.HTTPMisdirectedRequest, "Unknown host")
+        origin = request.headers.get("Origin")
+        if origin is not None and origin not in allowed_origins:
+            raise _error(web.HTTPForbidden, "Origin not allowed")
+        if not hmac.compare_digest(request.headers.get("Authorization", "").encode(), expected):
+            raise _error(web.HTTPUnauthorized, "Missing or wrong backend token")
+        return await handler(request)
+    
+    return guard
+
+async def _read_json(request):
+    # A form or text/plain body would let a cross-site page post without a preflight
+    if request.content_type != "application/json":
+        raise _error(web.HTTPUnsupportedMediaType, "Expected Content-Type: application/json")
+    try:
+        body = await request.json()
+    except ValueError:
+        body = None
+    if not isinstance(body, dict):
+        raise web.HTTPBadRequest(text=_dumps({"error": "Expected a JSON object"}), content_type="application/json")
+    return body
+
+def create_app(service=None, token=BACKEND_TOKEN, allowed_hosts=BACKEND_ALLOWED_HOSTS,
+               allowed_origins=BACKEND_ALLOWED_ORIGINS, repo_roots=BACKEND_REPO_ROOTS):
+    """
+    Build the aiohttp application around an AgentService
+    
+    Args:
+        service (AgentService): Service to expose (default: a new one)
+        token (str): Shared secret clients must send as a bearer token
+        allowed_hosts (list): Host names the server answers to
+        allowed_origins (list): Browser origins allowed to call it
+        repo_roots (list): Directories session repositories must be in
+    
+    Returns:
+        aiohttp.web.Application
+    """
+    if not token:
+        raise ValueError("Set BACKEND_TOKEN: the backend only serves clients that send it")
+    service = service or AgentService()
+    routes = web.RouteTableDef()
+    
+    @routes.get("/health")
+    async def health(request):
+        return web.json_response(service.stats(), dumps=_dumps)
+    
+    @routes.post("/sessions")
+    async def create_session(request):
+        body = await _read_json(request)
+        repo_path = body.get("repo_path") or REPO_PATH
+        if not _within_roots(repo_path, repo_roots):
+            raise _error(web.HTTPForbidden, f"Repository path {repo_path} is outside BACKEND_REPO_ROOTS")
+        session = service.create_session(
+            repo_path,
+            body.get("github_repo") or GITHUB_REPO,
+            body.get("github_user") or GITHUB_USER,
+            body.get("branch") or "main",
+        )
+        return web.json_response(session, status=201, dumps=_dumps)
+    
+    @routes.get("/sessions/{session_id}")
+    async def get_session(request):
+        return web.json_response(service.describe(_session_id(request, service)), dumps=_dumps)
+    
+    @routes.delete("/sessions/{session_id}")
+    async def delete_session(request):
+        service.close_session(_session_id(request, service))
+        return web.json_response({"deleted": True})
+    
+    @routes.post("/sessions/{session_id}/runs")
+    async def run(request):
+        session_id = _session_id(request, service)
+        prompt = (await _read_json(request)).get("prompt")
+        if not prompt:
+            raise web.HTTPBadRequest(text=_dumps({"error": "Missing prompt"}), content_type="application/json")
+        
+        response = web.StreamResponse(headers={"Content-Type": "application/x-ndjson"})
+        await response.prepare(request)
+        async for event in service.run(session_id, prompt):
+            await response.write((_dumps(event) + "\n").encode())
+        await response.write_eof()
+        return response
+    
+    @routes.get("/sessions/{session_id}/ws")
+    async def websocket(request):
+        session_id = _session_id(request, service)
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        async for message in ws:
+            if message.type != WSMsgType.TEXT:
+                continue
+            try:
+                prompt = json.loads(message.data).get("prompt")
+            except (ValueError, AttributeError):
+                prompt = None
+            if not prompt:
+                await ws.send_str(_dumps({"type": "error", "error": "Expected {\"prompt\": ...}"}))
+                continue
+            async for event in service.run(session_id, prompt):
+                await ws.send_str(_dumps(event))
+        return ws
+    
+    app = web.Application(middlewares=[make_guard(token, allowed_hosts, allowed_origins)])
+    app.add_routes(routes)
+    app["service"] = service
+    return app
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--host", default=BACKEND_HOST)
+    parser.add_argument("--port", type=int, default=BACKEND_PORT)
+    parser.add_argument("--workers", type=int, default=AGENT_SERVICE_WORKERS, help="agent runs at once")
+    args = parser.parse_args()
+    
+    if web is None:
+        print("The agent backend needs aiohttp: pip install aiohttp")
+        sys.exit(1)
+    if not BACKEND_TOKEN:
+        print("Set BACKEND_TOKEN to a shared secret (and the same in the app's environment)")
+        sys.exit(1)
+    web.run_app(create_app(AgentService(max_workers=args.workers)), host=args.host, port=args.port)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,26 @@
+import pathlib
+import subprocess
+import sys
+
+import pytest
+
+# Tests import the app's modules the way app.py does, with agent2/ on the path
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent))
+
+@pytest.fixture
+def git_identity(monkeypatch):
+    for role in ("AUTHOR", "COMMITTER"):
+        monkeypatch.setenv(f"GIT_{role}_NAME", "Test")
+        monkeypatch.setenv(f"GIT_{role}_EMAIL", "test@example.com")
+
+@pytest.fixture
+def remote(tmp_path, git_identity):
+    """A bare repository with one commit on main, standing in for GitHub"""
+    seed = tmp_path / "seed"
+    seed.mkdir()
+    (seed / "README.md").write_text("seed\n")
+    for command in (["init", "-q", "-b", "main"], ["add", "README.md"], ["commit", "-q", "-m", "Initial commit"]):
+        subprocess.run(["git", *command], cwd=seed, check=True)
+    bare = tmp_path / "remote.git"
+    subprocess.run(["git", "clone", "-q", "--bare", str(seed), str(bare)], check=True)
+    return str(bare)
@@ -0,0 +1,58 @@
+import re
+
+import pytest
+
+from utils.file_operations import MAX_FILE_SIZE, read_file_lines
+from utils.wrappers import read_file_wrapper
+
+@pytest.fixture
+def repo(tmp_path):
+    (tmp_path / "five.txt").write_text("".join(f"line {i}\n" for i in range(1, 6)))
+    (tmp_path / "no_newline.txt").write_text("a\nb")
+    (tmp_path / "empty.txt").write_text("")
+    (tmp_path / "blob.bin").write_bytes(b"\x89PNG\0\0\x01")
+    return str(tmp_path)
+
+def test_first_page(repo):
+    assert read_file_lines("five.txt", repo, 1, 2) == (["line 1\n", "line 2\n"], 5)
+
+def test_page_ending_at_last_line(repo):
+    assert read_file_lines("five.txt", repo, 4, 2) == (["line 4\n", "line 5\n"], 5)
+
+def test_page_past_last_line_is_cut(repo):
+    assert read_file_lines("five.txt", repo, 5, 10) == (["line 5\n"], 5)
+
+def test_offset_past_end(repo):
+    assert read_file_lines("five.txt", repo, 6, 1).startswith("Error: offset 6 is past the end")
+
+def test_no_limit_reads_to_end(repo):
+    assert read_file_lines("five.txt", repo, 3) == (["line 3\n", "line 4\n", "line 5\n"], 5)
+
+def test_last_line_without_newline(repo):
+    assert read_file_lines("no_newline.txt", repo, 2, 1) == (["b"], 2)
+
+def test_empty_file(repo):
+    assert read_file_lines("empty.txt", repo) == ([], 0)
+
+def test_binary_file_is_refused(repo):
+    assert "binary" in read_file_lines("blob.bin", repo)
+
+def test_large_file_gets_preview(repo, tmp_path):
+    (tmp_path / "big.txt").write_text("y\n" * MAX_FILE_SIZE)
+    result = read_file_lines("big.txt", repo)
+    assert isinstance(result, str) and "too large" in result
+
+def test_pages_rebuild_the_file(tmp_path):
+    content = "".join(f"{i:04d} " + "word " * 12 + "\n" for i in range(1, 600))
+    (tmp_path / "long.py").write_text(content)
+    pages, offset = [], 1
+    while True:
+        page = read_file_wrapper(f"file_path=long.py, offset={offset}", str(tmp_path))
+        note = re.search(r"\[Lines (\d+)-(\d+) of (\d+)(?:; .*offset=(\d+))?\]$", page)
+        assert note, page[-200:]
+        pages.append(page[:note.start()])
+        if note.group(4) is None:
+            break
+        offset = int(note.group(4))
+    assert len(pages) > 1
+    assert "".join(pages) == content
@@ -0,0 +1,41 @@
+import os
+
+from git import Repo
+
+from utils.git_operations import add_session_worktree, ensure_mirror, push_to_upstream, session_branch_name
+
+def commit_file(repo_path, name, text):
+    with open(os.path.join(repo_path, name), "w") as f:
+        f.write(text)
+    repo = Repo(repo_path)
+    repo.index.add([name])
+    repo.index.commit(f"Add {name}")
+    return repo
+
+def test_session_branch_pushes_to_its_upstream(remote, tmp_path):
+    mirror = ensure_mirror(remote, cache_dir=str(tmp_path / "mirrors"))
+    first, second = str(tmp_path / "first"), str(tmp_path / "second")
+    assert add_session_worktree(mirror, first, "main") == "main"
+    assert add_session_worktree(mirror, second, "main") == session_branch_name("main", second)
+    
+    repo = commit_file(second, "notes.txt", "from the second session\n")
+    push_to_upstream(repo, [repo.active_branch.name], remote)
+    
+    pushed = Repo(remote)
+    assert [head.name for head in pushed.heads] == ["main"]
+    assert pushed.heads.main.commit == repo.head.commit
+    assert repo.commit("origin/main") == repo.head.commit
+
+def test_push_leaves_shared_remote_url_alone(remote, tmp_path):
+    url = f"file://user:token@{remote}"
+    mirror = ensure_mirror(url, cache_dir=str(tmp_path / "mirrors"))
+    worktree = str(tmp_path / "session")
+    add_session_worktree(mirror, worktree, "main")
+    
+    repo = commit_file(worktree, "notes.txt", "notes\n")
+    push_to_upstream(repo, ["main"], url)
+    
+    assert Repo(remote).heads.main.commit == repo.head.commit
+    assert Repo(mirror).remote("origin").url == f"file://{remote}"
+    with open(os.path.join(mirror, "config")) as f:
+        assert "token" not in f.read()
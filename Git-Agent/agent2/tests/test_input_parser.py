@@ -0,0 +1,61 @@
+import tracemalloc
+
+import pytest
+
+from utils.input_parser import find_closing_quote, parse_tool_input, scan_quoted
+
+@pytest.mark.parametrize("body, quote, expected", [
+    ('abc"', '"', 3),
+    ('a\\"b"', '"', 4),
+    ('a\\\\"', '"', 3),
+    ('a\\\\\\"b"', '"', 6),
+    ('no close', '"', -1),
+    ('trailing \\"', '"', -1),
+    ("it\\'s'", "'", 5),
+    ('x"y"""', '"""', 3),
+    ('a""""', '"""', 1),
+    ('\\""""', '"""', 2),
+    ("a''b'''", "'''", 4),
+])
+def test_find_closing_quote(body, quote, expected):
+    assert find_closing_quote(body, 0, quote) == expected
+
+def test_find_closing_quote_starts_at_pos():
+    # A backslash before pos belongs to the key, not to the value
+    s = 'k = \\"value"'
+    assert find_closing_quote(s, 6, '"') == 11
+
+def test_many_escapes_keep_memory_flat():
+    body = '\\"' * 1_000_000 + '\\n' * 1_000_000 + '"'
+    tracemalloc.start()
+    try:
+        close = find_closing_quote(body, 0, '"')
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert close == len(body) - 1
+    assert peak < 64 * 1024
+
+def test_lazy_value_with_many_escapes():
+    content = 'print("hi")\n' * 50_000
+    escaped = content.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    params = parse_tool_input(f'file_path = "a.py", new_content = "{escaped}"', lazy=("new_content",))
+    assert params["file_path"] == "a.py"
+    assert str(params["new_content"]) == content
+
+def test_unterminated_value_runs_to_end():
+    value, end = scan_quoted('abc\\" ,', 0, '"')
+    assert value == 'abc"'
+    assert end == 7
+
+@pytest.mark.parametrize("inputs, expected", [
+    ("command=echo a,b", {"command": "echo a,b"}),
+    ("command = echo a, b, timeout = 5", {"command": "echo a, b", "timeout": "5"}),
+    ('command = "echo x, timeout = 1"', {"command": "echo x, timeout = 1"}),
+])
+def test_bare_value_keeps_commas_not_followed_by_a_key(inputs, expected):
+    assert parse_tool_input(inputs, positional="command") == expected
+
+def test_bare_list_value_keeps_its_commas():
+    params = parse_tool_input("file_path=a.py, revision=main,HEAD~1", positional="spec", known=("file_path", "revision"))
+    assert params == {"file_path": "a.py", "revision": "main,HEAD~1"}
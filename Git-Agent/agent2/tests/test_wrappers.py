@@ -0,0 +1,11 @@
+from utils.wrappers import run_command_wrapper
+
+def test_invalid_timeout_falls_back_to_default(tmp_path):
+    result = run_command_wrapper("command = echo a,b, timeout = soon", str(tmp_path))
+    assert result.startswith("Ignored invalid timeout 'soon'; used 60 seconds.")
+    assert "succeeded" in result
+    assert "a,b" in result
+
+def test_valid_timeout_is_used_quietly(tmp_path):
+    result = run_command_wrapper("command = echo ok, timeout = 5", str(tmp_path))
+    assert result.startswith("Command succeeded")
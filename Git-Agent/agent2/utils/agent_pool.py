@@ -0,0 +1,86 @@
+import threading
+import importlib.util
+import pathlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+# Dynamic import for config
+config_path = pathlib.Path(__file__).parent.parent / "config.py"
+spec = importlib.util.spec_from_file_location("config", config_path)
+config = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(config)
+
+AGENT_POOL_SIZE = config.AGENT_POOL_SIZE
+
+class AgentPool:
+    """
+    LRU pool of agents built in the background
+    
+    Each key (e.g. repository, remote and branch) maps to a future for the
+    built agent. Requesting a key that is building or ready returns the same
+    future; failed builds are retried on the next request. Past max_size, the
+    least recently used finished entries are dropped.
+    """
+    def __init__(self, max_size=AGENT_POOL_SIZE, max_workers=2):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="agent-build")
+    
+    def get_or_build(self, key, build_fn):
+        """
+        Return the future for key, starting build_fn() in the background if needed
+        
+        Args:
+            key (tuple): Pool key
+            build_fn (callable): Builds the agent; runs on a worker thread
+            
+        Returns:
+            concurrent.futures.Future: Resolves to build_fn's result
+        """
+        with self.lock:
+            future = self.entries.get(key)
+            if future is not None and not (future.done() and future.exception() is not None):
+                self.entries.move_to_end(key)
+                return future
+            
+            future = self.executor.submit(build_fn)
+            self.entries[key] = future
+            self._evict()
+            return future
+    
+    def _evict(self):
+        finished = [key for key, future in self.entries.items() if future.done()]
+        while len(self.entries) > self.max_size and finished:
+            del self.entries[finished.pop(0)]
+    
+    def discard(self, key):
+        """Drop an entry so the next request rebuilds it"""
+        with self.lock:
+            self.entries.pop(key, None)
+    
+    def status(self):
+        """
+        State of every pooled key, least recently used first
+        
+        Returns:
+            dict: key -> "building", "ready" or "failed"
+        """
+        with self.lock:
+            return {
+                key: "building" if not future.done() else "failed" if future.exception() is not None else "ready"
+                for key, future in self.entries.items()
+            }
+
+# One pool per process. This module is imported as ``utils.agent_pool`` so the
+# pool survives Streamlit reruns and is shared between sessions.
+_pool = None
+_pool_guard = threading.Lock()
+
+def get_agent_pool():
+    """Return the process-wide AgentPool"""
+    global _pool
+    with _pool_guard:
+        if _pool is None:
+            _pool = AgentPool()
+        return _pool
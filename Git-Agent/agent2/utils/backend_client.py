@@ -0,0 +1,92 @@
+import json
+import urllib.request
+import urllib.error
+
+class BackendError(Exception):
+    """Raised when the agent backend answers with an error status"""
+
+class BackendClient:
+    """
+    Minimal client for the agent backend (server.py), standard library only
+    
+    Runs are streamed as JSON lines, so tokens and tool events arrive while
+    the agent works.
+    """
+    def __init__(self, base_url, token=None, timeout=600):
+        self.base_url = base_url.rstrip("/")
+        self.token = token
+        self.timeout = timeout
+    
+    def _request(self, method, path, body=None):
+        data = json.dumps(body).encode() if body is not None else None
+        headers = {"Content-Type": "application/json"} if data is not None else {}
+        if self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+        request = urllib.request.Request(f"{self.base_url}{path}", data=data, method=method, headers=headers)
+        try:
+            return urllib.request.urlopen(request, timeout=self.timeout)
+        except urllib.error.HTTPError as e:
+            raise BackendError(f"{method} {path} failed with {e.code}: {e.read().decode(errors='replace')}") from e
+    
+    def _json(self, method, path, body=None):
+        with self._request(method, path, body) as response:
+            return json.load(response)
+    
+    def health(self):
+        return self._json("GET", "/health")
+    
+    def create_session(self, repo_path, github_repo, github_user, branch="main"):
+        """Start a session; returns its description, including the id"""
+        return self._json("POST", "/sessions", {
+            "repo_path": repo_path,
+            "github_repo": github_repo,
+            "github_user": github_user,
+            "branch": branch,
+        })
+    
+    def get_session(self, session_id):
+        """Session state: agent ("building", "ready" or "failed"), status and messages"""
+        return self._json("GET", f"/sessions/{session_id}")
+    
+    def close_session(self, session_id):
+        return self._json("DELETE", f"/sessions/{session_id}")
+    
+    def stream_run(self, session_id, prompt):
+        """
+        Run one turn and yield its events as they arrive
+        
+        Args:
+            session_id (str): Session to run in
+            prompt (str): User message
+        
+        Yields:
+            dict: Events ("queued", "token", "llm_end", "tool_start",
+                "tool_end", "tool_error", then "final" or "error")
+        """
+        with self._request("POST", f"/sessions/{session_id}/runs", {"prompt": prompt}) as response:
+            for line in response:
+                if line.strip():
+                    yield json.loads(line)
+
+def dispatch_event(event, handler):
+    """
+    Feed a backend event to a LangChain-style callback handler, so the
+    in-process chat stream renders backend runs unchanged
+    
+    Returns:
+        dict: The event when it ends the run ("final" or "error"), else None
+    """
+    kind = event.get("type")
+    if kind == "token":
+        handler.on_llm_new_token(event["text"])
+    elif kind == "llm_end":
+        handler.on_llm_end(None)
+    elif kind == "tool_start":
+        handler.on_tool_start({"name": event["name"]}, "", run_id=event["run_id"])
+    elif kind == "tool_end":
+        handler.on_tool_end(event["output"], run_id=event["run_id"])
+    elif kind == "tool_error":
+        handler.on_tool_error(event["error"], run_id=event["run_id"])
+    elif kind in ("final", "error"):
+        return event
+    return None
@@ -3,8 +3,17 @@ import sys
 import subprocess
 import pathlib
 import json
-from git import Repo, GitCommandError
+from git import GitCommandError
+from utils.ref_snapshot import get_ref_snapshot
+from utils.repo_state import get_repo_session
+from utils.tracing import redact_credentials, traced
 
+def _command_attributes(command, *args, **kwargs):
+    if isinstance(command, (list, tuple)):
+        command = " ".join(command)
+    return {"command": redact_credentials(command)[:200]}
+
+@traced(attributes=_command_attributes)
 def run_command(command, repo_path, timeout=60):
     """
     Run a shell command in the repository directory
@@ -13,7 +22,7 @@ def run_command(command, repo_path, timeout=60):
         command (str or list): Command to run
         repo_path (str): Path to the repository
         timeout (int): Maximum time to wait for command to complete
-        
+    
     Returns:
         dict: Result of the command with stdout, stderr, and return code
     """
@@ -52,6 +61,7 @@ def run_command(command, repo_path, timeout=60):
             "success": False
         }
 
+@traced
 def create_branch(branch_name, repo_path):
     """
     Create a new branch
@@ -59,15 +69,15 @@ def create_branch(branch_name, repo_path):
     Args:
         branch_name (str): Name of the branch to create
         repo_path (str): Path to the repository
-        
+    
     Returns:
         str: Result message
     """
     try:
-        repo = Repo(repo_path)
+        repo = get_repo_session(repo_path)
         
         # Check if branch already exists
-        if branch_name in [b.name for b in repo.branches]:
+        if branch_name in get_ref_snapshot(repo_path)["local_branches"]:
             return f"Branch '{branch_name}' already exists"
         
         # Create a new branch from current HEAD
@@ -76,6 +86,7 @@ def create_branch(branch_name, repo_path):
     except Exception as e:
         return f"Error creating branch: {str(e)}"
 
+@traced
 def search_code(query, repo_path, file_pattern="*"):
     """
     Search for code matching the query in the repository
@@ -84,7 +95,7 @@ def search_code(query, repo_path, file_pattern="*"):
         query (str): Search query
         repo_path (str): Path to the repository
         file_pattern (str): File pattern to search in (e.g., "*.py")
-        
+    
     Returns:
         dict: Search results with matched files and lines
     """
@@ -114,7 +125,7 @@ def search_code(query, repo_path, file_pattern="*"):
                     "line": line_num,
                     "text": matched_text.strip()
                 })
-                
+        
         return {
             "query": query,
             "matches": matches,
@@ -123,6 +134,7 @@ def search_code(query, repo_path, file_pattern="*"):
     except Exception as e:
         return f"Error searching code: {str(e)}"
 
+@traced
 def run_tests(test_path, repo_path):
     """
     Run tests in the repository
@@ -130,7 +142,7 @@ def run_tests(test_path, repo_path):
     Args:
         test_path (str): Path to tests to run (relative to repo root)
         repo_path (str): Path to the repository
-        
+    
     Returns:
         str: Test results
     """
@@ -163,6 +175,7 @@ def run_tests(test_path, repo_path):
     except Exception as e:
         return f"Error running tests: {str(e)}"
 
+@traced
 def install_dependencies(requirements_file, repo_path):
     """
     Install dependencies from requirements.txt
@@ -170,7 +183,7 @@ def install_dependencies(requirements_file, repo_path):
     Args:
         requirements_file (str): Path to requirements file (relative to repo root)
         repo_path (str): Path to the repository
-        
+    
     Returns:
         str: Installation results
     """
@@ -191,6 +204,7 @@ def install_dependencies(requirements_file, repo_path):
     except Exception as e:
         return f"Error installing dependencies: {str(e)}"
 
+@traced
 def analyze_code(file_path, repo_path):
     """
     Analyze code for issues and complexity
@@ -198,7 +212,7 @@ def analyze_code(file_path, repo_path):
     Args:
         file_path (str): Path to file to analyze (relative to repo root)
         repo_path (str): Path to the repository
-        
+    
     Returns:
         dict: Analysis results
     """
@@ -237,6 +251,7 @@ def analyze_code(file_path, repo_path):
     except Exception as e:
         return f"Error analyzing code: {str(e)}"
 
+@traced
 def create_pull_request(branch, title, description, repo_path, github_token, github_repo):
     """
     Create a pull request
@@ -248,14 +263,13 @@ def create_pull_request(branch, title, description, repo_path, github_token, git
         repo_path (str): Path to the repository
         github_token (str): GitHub token
         github_repo (str): GitHub repository (owner/repo)
-        
+    
     Returns:
         str: Result of the PR creation
     """
     try:
         # Ensure branch exists
-        repo = Repo(repo_path)
-        branches = [b.name for b in repo.branches]
+        branches = get_ref_snapshot(repo_path)["local_branches"]
         
         if branch not in branches:
             return f"Branch '{branch}' does not exist"
@@ -302,6 +316,7 @@ def create_pull_request(branch, title, description, repo_path, github_token, git
     except Exception as e:
         return f"Error creating pull request: {str(e)}"
 
+@traced
 def lint_code(repo_path, path=None):
     """
     Run linting across the repository or a specific path
@@ -309,7 +324,7 @@ def lint_code(repo_path, path=None):
     Args:
         repo_path (str): Path to the repository
         path (str): Path to lint (relative to repo root, None for entire repo)
-        
+    
     Returns:
         str: Linting results
     """
@@ -343,7 +358,7 @@ def lint_code(repo_path, path=None):
                 pylint_result = run_command(["pylint"] + pylint_target, repo_path)
             else:
                 pylint_result = run_command(["pylint", pylint_target], repo_path)
-                
+            
             if pylint_result["returncode"] >= 0:
                 results["pylint"] = {
                     "output": pylint_result["stdout"],
@@ -354,6 +369,7 @@ def lint_code(repo_path, path=None):
     except Exception as e:
         return f"Error running linting: {str(e)}"
 
+@traced
 def stash_changes(repo_path, pop=False, message=None):
     """
     Stash or pop stashed changes
@@ -362,12 +378,12 @@ def stash_changes(repo_path, pop=False, message=None):
         repo_path (str): Path to the repository
         pop (bool): Whether to pop the stash
         message (str): Stash message
-        
+    
     Returns:
         str: Result message
     """
     try:
-        repo = Repo(repo_path)
+        repo = get_repo_session(repo_path)
         
         if pop:
             result = repo.git.stash("pop")
@@ -385,27 +401,26 @@ def stash_changes(repo_path, pop=False, message=None):
     except Exception as e:
         return f"Error with stash operation: {str(e)}"
 
+@traced
 def get_repo_status(repo_path):
     """
     Get repository status
     
     Args:
         repo_path (str): Path to the repository
-        
+    
     Returns:
         dict: Repository status information
     """
     try:
-        repo = Repo(repo_path)
+        repo = get_repo_session(repo_path)
+        snapshot = get_ref_snapshot(repo_path)
         
         # Get current branch
-        try:
-            current_branch = repo.active_branch.name
-        except Exception:
-            current_branch = "DETACHED_HEAD"
+        current_branch = snapshot["current_branch"] or "DETACHED_HEAD"
         
         # Get list of branches
-        branches = [b.name for b in repo.branches]
+        branches = snapshot["local_branches"]
         
         # Get status (modified, added, deleted files)
         status = repo.git.status("--porcelain")
@@ -437,7 +452,7 @@ def get_repo_status(repo_path):
         
         # Get last commit info
         last_commit = None
-        if repo.heads:
+        if snapshot["head"]:
             last_commit = {
                 "hash": repo.head.commit.hexsha[:7],
                 "message": repo.head.commit.message.strip(),
@@ -455,6 +470,7 @@ def get_repo_status(repo_path):
     except Exception as e:
         return f"Error getting repository status: {str(e)}"
 
+@traced
 def generate_diff(repo_path, file_path=None):
     """
     Generate diff for the current changes
@@ -462,12 +478,12 @@ def generate_diff(repo_path, file_path=None):
     Args:
         repo_path (str): Path to the repository
         file_path (str): Path to specific file to get diff for
-        
+    
     Returns:
         str: Diff output
     """
     try:
-        repo = Repo(repo_path)
+        repo = get_repo_session(repo_path)
         
         if file_path:
             if not os.path.exists(os.path.join(repo_path, file_path)):
@@ -1,5 +1,6 @@
 import os
 import sys
+import itertools
 import importlib.util
 import pathlib
 
@@ -12,7 +13,7 @@ spec.loader.exec_module(config)
 MAX_FILE_SIZE = config.MAX_FILE_SIZE
 
 def create_file(file_path, content, repo_path):
-    """Create a file with the given content"""
+    """Create a file with the given content (a string or an iterable of string chunks)"""
     try:
         # Clean up file path - remove quotes
         if isinstance(file_path, str):
@@ -30,7 +31,11 @@ def create_file(file_path, content, repo_path):
             os.makedirs(dir_path, exist_ok=True)
         
         with open(full_path, 'w') as f:
-            f.write(content)
+            if isinstance(content, str):
+                f.write(content)
+            else:
+                # Streamed content is written chunk by chunk, never joined in memory
+                f.writelines(content)
         
         return f"File {file_path} created successfully."
     except Exception as e:
@@ -57,6 +62,67 @@ def delete_file(file_path, repo_path):
     except Exception as e:
         return f"Error deleting file: {str(e)}"
 
+def format_size(size):
+    """Human-readable file size, as shown by list_files"""
+    if size > 1024*1024:
+        return f"{size/(1024*1024):.1f} MB"
+    if size > 1024:
+        return f"{size/1024:.1f} KB"
+    return f"{size} bytes"
+
+def is_binary_file(full_path, sample_size=8192):
+    """Whether a file looks binary (a NUL byte in its first block), as git decides"""
+    with open(full_path, 'rb') as f:
+        return b"\0" in f.read(sample_size)
+
+def read_file_lines(file_path, repo_path, offset=1, limit=None):
+    """
+    Read a range of lines of a file, for reading large files in pages
+    
+    The file is streamed: one pass counts its lines and a second one keeps
+    only the requested range, so a page costs no more memory than its lines.
+    Files over MAX_FILE_SIZE get read_file's preview and binary files an
+    error, as with a whole-file read.
+    
+    Args:
+        file_path (str): Path of the file (relative to repo root)
+        repo_path (str): Path to the repository
+        offset (int): First line to return (1-based)
+        limit (int): Number of lines to return (None: to the end)
+    
+    Returns:
+        tuple or str: (lines with their line endings, total line count), or an error message
+    """
+    try:
+        # Clean up file path - remove quotes
+        if isinstance(file_path, str):
+            file_path = file_path.strip()
+            if (file_path.startswith('"') and file_path.endswith('"')) or \
+               (file_path.startswith("'") and file_path.endswith("'")):
+                file_path = file_path[1:-1]
+        
+        full_path = os.path.join(repo_path, file_path)
+        print(f"Reading lines of file: {full_path}")
+        
+        if not os.path.exists(full_path):
+            return f"File {file_path} does not exist."
+        if os.path.getsize(full_path) > MAX_FILE_SIZE:
+            return read_file(file_path, repo_path)
+        if is_binary_file(full_path):
+            return f"File {file_path} is a binary file and cannot be read as text."
+        
+        start = max(offset, 1) - 1
+        stop = None if limit is None else start + max(limit, 0)
+        with open(full_path, 'r') as f:
+            total_lines = sum(1 for _ in f)
+            if start and start >= total_lines:
+                return f"Error: offset {offset} is past the end of {file_path} ({total_lines} lines)."
+            f.seek(0)
+            lines = list(itertools.islice(f, start, stop))
+        return lines, total_lines
+    except Exception as e:
+        return f"Error reading file: {str(e)}"
+
 def list_files(repo_path, directory_path="", get_tree=False):
     """
     List all files in the repository or directory
@@ -116,16 +182,9 @@ def list_files(repo_path, directory_path="", get_tree=False):
                 # Add files to the current level
                 for filename in filenames:
                     full_path = os.path.join(root, filename)
-                    size = os.path.getsize(full_path)
-                    size_str = f"{size} bytes"
-                    if size > 1024:
-                        size_str = f"{size/1024:.1f} KB"
-                    if size > 1024*1024:
-                        size_str = f"{size/(1024*1024):.1f} MB"
-                    
                     current[filename] = {
                         "__type": "file",
-                        "__size": size_str,
+                        "__size": format_size(os.path.getsize(full_path)),
                         "__path": os.path.join(rel_root, filename) if rel_root else filename
                     }
             
@@ -142,19 +201,61 @@ def list_files(repo_path, directory_path="", get_tree=False):
                     rel_path = os.path.relpath(os.path.join(root, filename), repo_path)
                     # Add file size information
                     full_path = os.path.join(root, filename)
-                    size = os.path.getsize(full_path)
-                    size_str = f"{size} bytes"
-                    if size > 1024:
-                        size_str = f"{size/1024:.1f} KB"
-                    if size > 1024*1024:
-                        size_str = f"{size/(1024*1024):.1f} MB"
-                    
-                    files.append(f"{rel_path} ({size_str})")
+                    files.append(f"{rel_path} ({format_size(os.path.getsize(full_path))})")
             
             return files if files else f"No files found in {directory_path or 'repository'}."
     except Exception as e:
         return f"Error listing files: {str(e)}"
 
+def update_file_tree(file_tree, repo_path, rel_path):
+    """
+    Bring one path of a list_files(get_tree=True) tree up to date with the work tree
+    
+    A file that exists is added or resized; a missing path is removed along
+    with parent directories that are gone too; a directory is rescanned.
+    
+    Args:
+        file_tree (dict): Tree to update in place
+        repo_path (str): Path to the repository
+        rel_path (str): Changed path, relative to the repo root
+    """
+    parts = [part for part in rel_path.replace(os.sep, "/").split("/") if part]
+    if not parts or ".git" in parts:
+        return
+    full_path = os.path.join(repo_path, *parts)
+    
+    # Walk down to the parent directory, remembering the way back up
+    levels = [file_tree]
+    for part in parts[:-1]:
+        entry = levels[-1].get(part)
+        if entry is None or entry.get("__type") != "directory":
+            if not os.path.exists(full_path):
+                return
+            entry = levels[-1][part] = {"__type": "directory", "__files": {}}
+        levels.append(entry["__files"])
+    
+    name = parts[-1]
+    if os.path.isdir(full_path):
+        levels[-1][name] = {"__type": "directory", "__files": {}}
+        for root, dirs, filenames in os.walk(full_path):
+            if '.git' in dirs:
+                dirs.remove('.git')
+            for filename in filenames:
+                update_file_tree(file_tree, repo_path, os.path.relpath(os.path.join(root, filename), repo_path))
+    elif os.path.isfile(full_path):
+        levels[-1][name] = {
+            "__type": "file",
+            "__size": format_size(os.path.getsize(full_path)),
+            "__path": os.path.join(*parts)
+        }
+    else:
+        levels[-1].pop(name, None)
+        # Drop parent directories that were removed with it
+        for depth in range(len(parts) - 1, 0, -1):
+            if os.path.isdir(os.path.join(repo_path, *parts[:depth])):
+                break
+            levels[depth - 1].pop(parts[depth - 1], None)
+
 def read_file(file_path, repo_path):
     """Read the content of a file"""
     try:
@@ -182,7 +283,7 @@ def read_file(file_path, repo_path):
                    f"Here's a preview of the first {preview_size} characters:\n\n"
                    f"{content_preview}\n\n..."
                    f"\n\nPlease use a more specific command to work with sections of this file.")
-            
+        
         with open(full_path, 'r') as f:
             content = f.read()
         
@@ -0,0 +1,281 @@
+import re
+import json
+
+# Escape sequences understood inside quoted values; anything else keeps its backslash
+ESCAPES = {"n": "\n", "t": "\t", "r": "\r", "0": "\0", "\\": "\\", '"': '"', "'": "'"}
+
+# `key = ` or a quoted `"key": ` (a bare `key:` is not a key, e.g. "main:app.py")
+_KEY = re.compile(r'\s*(?:([A-Za-z_]\w*)\s*=|(["\'])([A-Za-z_]\w*)\2\s*[=:])\s*')
+_HEX4 = re.compile(r'[0-9a-fA-F]{4}')
+_UNICODE_ESCAPE = re.compile(r'\\u([0-9a-fA-F]{4})')
+_SIMPLE_ESCAPES = [("\\" + key, value) for key, value in ESCAPES.items() if key != "\\"]
+
+# Raw characters decoded per chunk when streaming a value
+UNESCAPE_BLOCK_SIZE = 256 * 1024
+
+# Fast path for double-quoted values: the C JSON decoder finds the closing
+# quote and decodes in one go. JSON rejects escapes we treat as literal (\d,
+# \'), and \b, \f and \/ mean something else to it, so those take the slow path.
+_JSON_ONLY_ESCAPE = re.compile(r'(?<!\\)(?:\\\\)*\\[bf/]')
+_JSON_DECODER = json.JSONDecoder(strict=False)
+
+def _scan_double_quoted_fast(s, pos):
+    try:
+        value, end = _JSON_DECODER.raw_decode(s, pos - 1)
+    except ValueError:
+        return None
+    if _JSON_ONLY_ESCAPE.search(s, pos, end):
+        return None
+    return value, end
+
+def _unescape_block(block):
+    # Escaped backslashes first, so every backslash left in a part starts an escape
+    parts = block.split("\\\\")
+    for i, part in enumerate(parts):
+        if "\\" not in part:
+            continue
+        for escaped, char in _SIMPLE_ESCAPES:
+            part = part.replace(escaped, char)
+        if "\\u" in part:
+            part = _UNICODE_ESCAPE.sub(lambda match: chr(int(match.group(1), 16)), part)
+        parts[i] = part
+    return "\\".join(parts)
+
+def iter_unescaped(s, start, end, block_size=UNESCAPE_BLOCK_SIZE):
+    """
+    Decode the escapes of s[start:end] in blocks, yielding decoded chunks
+    
+    Only one block is held at a time, so a large value can be written out
+    without ever building the whole decoded string.
+    
+    Args:
+        s (str): Whole input
+        start (int): Index of the first raw character
+        end (int): Index just after the last raw character
+        block_size (int): Raw characters per chunk
+    
+    Yields:
+        str: Decoded chunks, in order
+    """
+    while start < end:
+        stop = min(start + block_size, end)
+        if stop < end:
+            # Don't cut an escape sequence (at most 6 characters, \uXXXX) in
+            # half: walk the escapes from the start of the last backslash run
+            backslash = s.rfind("\\", max(start, stop - 6), stop)
+            if backslash != -1:
+                while backslash > start and s[backslash - 1] == "\\":
+                    backslash -= 1
+                while backslash < stop:
+                    if s[backslash] != "\\":
+                        backslash += 1
+                    elif s.startswith("u", backslash + 1) and _HEX4.fullmatch(s, backslash + 2, backslash + 6):
+                        backslash += 6
+                    else:
+                        backslash += 2
+                stop = min(backslash, end)
+        yield _unescape_block(s[start:stop])
+        start = stop
+
+def find_closing_quote(s, pos, quote):
+    """
+    Find the closing quote of a value starting just after its opening quote
+    
+    Candidates are found with str.find; one preceded by an even number of
+    backslashes closes the value. Every backslash run is looked at once and
+    nothing is allocated, so the scan stays linear in time and flat in memory
+    however many escapes the value has (a regex with a repeated group keeps
+    backtracking state per escape).
+    
+    Args:
+        s (str): Whole input
+        pos (int): Index just after the opening quote
+        quote (str): The opening quote (', ", ''' or \"\"\")
+    
+    Returns:
+        int: Index of the closing quote, or -1 if the value is unterminated
+    """
+    start = pos
+    while True:
+        close = s.find(quote, pos)
+        if close == -1:
+            return -1
+        backslash = close
+        while backslash > start and s[backslash - 1] == "\\":
+            backslash -= 1
+        if (close - backslash) % 2 == 0:
+            return close
+        pos = close + 1
+
+def _unterminated_end(s, pos):
+    # An unterminated value runs to the end, minus trailing space and commas
+    end = len(s)
+    while end > pos and s[end - 1] in " \t\r\n,":
+        end -= 1
+    return end
+
+class QuotedValue:
+    """
+    A quoted value kept as a span of the raw input and decoded on demand
+    
+    Iterating yields decoded chunks (see iter_unescaped), so large values can
+    be streamed to a file; str() decodes the whole value.
+    """
+    __slots__ = ("source", "start", "end")
+    
+    def __init__(self, source, start, end):
+        self.source = source
+        self.start = start
+        self.end = end
+    
+    def __iter__(self):
+        return iter_unescaped(self.source, self.start, self.end)
+    
+    def __str__(self):
+        return "".join(self)
+    
+    def __bool__(self):
+        return self.end > self.start
+    
+    @property
+    def raw_length(self):
+        return self.end - self.start
+    
+    def head(self, size):
+        """Decode roughly the first `size` characters, for previews"""
+        return _unescape_block(self.source[self.start:min(self.end, self.start + size)])
+
+def scan_quoted(s, pos, quote, lazy=False):
+    """
+    Scan a quoted value starting just after its opening quote
+    
+    The closing quote is located with find_closing_quote and the escapes are then
+    decoded block by block, so the value is built in a single pass.
+    
+    Args:
+        s (str): Whole input
+        pos (int): Index just after the opening quote
+        quote (str): The opening quote (', ", ''' or \"\"\")
+        lazy (bool): Return a QuotedValue instead of decoding the value
+    
+    Returns:
+        tuple: (decoded value, index just after the closing quote); an
+            unterminated value runs to the end of the input
+    """
+    if quote == '"' and not lazy:
+        fast = _scan_double_quoted_fast(s, pos)
+        if fast is not None:
+            return fast
+    
+    close = find_closing_quote(s, pos, quote)
+    if close == -1:
+        end, next_pos = _unterminated_end(s, pos), len(s)
+    else:
+        end, next_pos = close, close + len(quote)
+    
+    if lazy:
+        return QuotedValue(s, pos, end), next_pos
+    return "".join(iter_unescaped(s, pos, end)), next_pos
+
+def _strip_quotes(value):
+    value = value.strip()
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'":
+        return value[1:-1]
+    return value
+
+def _parse_pairs(s, pos=0, length=None, lazy=()):
+    """Parse `key = value, ...` in s[pos:length]; returns None if it doesn't start with a key"""
+    params = {}
+    if length is None:
+        length = len(s)
+    while pos < length:
+        match = _KEY.match(s, pos, length)
+        if not match:
+            break
+        key = match.group(1) or match.group(3)
+        pos = match.end()
+        
+        if s.startswith(('"""', "'''"), pos):
+            value, pos = scan_quoted(s, pos + 3, s[pos:pos + 3], key in lazy)
+        elif pos < length and s[pos] in "\"'":
+            value, pos = scan_quoted(s, pos + 1, s[pos], key in lazy)
+        else:
+            # Bare value (number, boolean, unquoted text) up to the next comma
+            # that starts another `key =`; other commas belong to the value
+            end = s.find(",", pos, length)
+            while end != -1 and not _KEY.match(s, end + 1, length):
+                end = s.find(",", end + 1, length)
+            end = length if end == -1 else end
+            value = s[pos:end].strip()
+            pos = end
+        params[key] = value
+        
+        # Skip whitespace and the separating comma
+        while pos < length and s[pos] in " \t\r\n,":
+            pos += 1
+    return params or None
+
+def parse_tool_input(inputs, positional=None, lazy=(), known=()):
+    """
+    Parse a tool input into a dictionary in one pass
+    
+    Accepts a dict (returned as-is), a JSON object, or ``key = "value", ...``
+    with single, double or triple quoted values. An unquoted value runs to
+    the next comma that is followed by another key, so ``command = echo a,b``
+    keeps its comma (a value that itself contains ``, key =`` must be
+    quoted). When the input is none of these, or its keys name none of the
+    tool's parameters (``FOO=1 pytest``, ``retries = 3``), it is treated as
+    positional values.
+    
+    Args:
+        inputs (str or dict): Raw tool input from the agent
+        positional (str or tuple): Parameter name(s) for plain inputs; with a
+            tuple the input is split on whitespace into that many parts
+        lazy (tuple): Keys whose quoted values are returned as QuotedValue
+            spans instead of decoded strings, for large payloads
+        known (tuple): Other parameter names that mark an input as
+            ``key = value`` pairs when no positional name appears in it
+    
+    Returns:
+        dict: Parsed parameters
+    """
+    if inputs is None:
+        return {}
+    if not isinstance(inputs, str):
+        return dict(inputs)
+    
+    # Work on index bounds rather than stripped copies of a possibly large input
+    start, end = 0, len(inputs)
+    while start < end and inputs[start].isspace():
+        start += 1
+    while end > start and inputs[end - 1].isspace():
+        end -= 1
+    
+    if end - start >= 2 and inputs[start] == "{" and inputs[end - 1] == "}":
+        try:
+            data, data_end = _JSON_DECODER.raw_decode(inputs, start)
+            if data_end == end and isinstance(data, dict):
+                return data
+        except ValueError:
+            pass
+        start, end = start + 1, end - 1
+        while start < end and inputs[start].isspace():
+            start += 1
+        while end > start and inputs[end - 1].isspace():
+            end -= 1
+    
+    params = _parse_pairs(inputs, start, end, lazy)
+    if params is not None:
+        if not positional:
+            return params
+        names = (positional,) if isinstance(positional, str) else tuple(positional)
+        if any(key in params for key in names + tuple(known)):
+            return params
+    
+    text = inputs[start:end]
+    if not positional or not text:
+        return {}
+    if isinstance(positional, str):
+        return {positional: _strip_quotes(text)}
+    parts = text.split(maxsplit=len(positional) - 1)
+    return {name: _strip_quotes(part) for name, part in zip(positional, parts)}
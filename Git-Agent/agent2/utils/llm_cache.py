@@ -0,0 +1,125 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+import importlib.util
+import pathlib
+from langchain_core.caches import BaseCache
+from langchain_core.load import dumps, loads
+
+# Dynamic import for config
+config_path = pathlib.Path(__file__).parent.parent / "config.py"
+spec = importlib.util.spec_from_file_location("config", config_path)
+config = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(config)
+
+LLM_CACHE_PATH = config.LLM_CACHE_PATH
+LLM_CACHE_TTL_SECONDS = config.LLM_CACHE_TTL_SECONDS
+LLM_CACHE_MAX_ENTRIES = config.LLM_CACHE_MAX_ENTRIES
+
+# Caches per database path. This module is imported as ``utils.llm_cache`` so
+# every agent built in the process shares one connection per file.
+_caches = {}
+_caches_guard = threading.Lock()
+
+def _drop_ids(value):
+    if isinstance(value, dict):
+        return {key: _drop_ids(item) for key, item in value.items() if key != "id"}
+    if isinstance(value, list):
+        return [_drop_ids(item) for item in value]
+    return value
+
+def normalize_prompt(prompt):
+    """
+    Canonical form of a prompt for cache keys
+    
+    Chat prompts arrive as serialized message lists: message ids are dropped
+    and keys sorted. Text prompts lose trailing whitespace on each line.
+    """
+    if prompt.startswith("["):
+        try:
+            return json.dumps(_drop_ids(json.loads(prompt)), sort_keys=True, separators=(",", ":"))
+        except ValueError:
+            pass
+    return "\n".join(line.rstrip() for line in prompt.strip().splitlines())
+
+class SQLiteLLMCache(BaseCache):
+    """
+    Exact-match LLM response cache in SQLite, with TTL and size eviction
+    
+    Entries are keyed by a hash of the model string (model name and call
+    parameters, as LangChain serializes them) and the normalized prompt.
+    Expired entries are ignored on lookup and deleted on the next write; past
+    max_entries the least recently used ones are evicted.
+    """
+    def __init__(self, database_path=LLM_CACHE_PATH, ttl_seconds=LLM_CACHE_TTL_SECONDS, max_entries=LLM_CACHE_MAX_ENTRIES):
+        self.database_path = database_path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        if database_path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(database_path)), exist_ok=True)
+        self.connection = sqlite3.connect(database_path, check_same_thread=False, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            "key TEXT PRIMARY KEY, llm_string TEXT, generations TEXT, "
+            "created_at REAL, accessed_at REAL)"
+        )
+        self.connection.execute("CREATE INDEX IF NOT EXISTS llm_cache_accessed ON llm_cache (accessed_at)")
+    
+    @staticmethod
+    def make_key(prompt, llm_string):
+        return hashlib.sha256(f"{llm_string}\0{normalize_prompt(prompt)}".encode("utf-8")).hexdigest()
+    
+    def lookup(self, prompt, llm_string):
+        key = self.make_key(prompt, llm_string)
+        now = time.time()
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT generations, created_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or (self.ttl_seconds and now - row[1] > self.ttl_seconds):
+                self.misses += 1
+                return None
+            self.connection.execute("UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (now, key))
+            self.hits += 1
+        return loads(row[0])
+    
+    def update(self, prompt, llm_string, return_val):
+        key = self.make_key(prompt, llm_string)
+        now = time.time()
+        with self.lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO llm_cache VALUES (?, ?, ?, ?, ?)",
+                (key, llm_string, dumps(return_val), now, now)
+            )
+            if self.ttl_seconds:
+                self.connection.execute("DELETE FROM llm_cache WHERE created_at < ?", (now - self.ttl_seconds,))
+            if self.max_entries:
+                self.connection.execute(
+                    "DELETE FROM llm_cache WHERE key IN (SELECT key FROM llm_cache "
+                    "ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)", (self.max_entries,)
+                )
+    
+    def clear(self, **kwargs):
+        with self.lock:
+            self.connection.execute("DELETE FROM llm_cache")
+    
+    def stats(self):
+        """Hits and misses since start, and the number of stored entries"""
+        with self.lock:
+            entries = self.connection.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+        total = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hits / total if total else 0.0, "entries": entries}
+
+def get_llm_cache(database_path=LLM_CACHE_PATH):
+    """Return the shared SQLiteLLMCache for a database file"""
+    with _caches_guard:
+        if database_path not in _caches:
+            _caches[database_path] = SQLiteLLMCache(database_path)
+        return _caches[database_path]
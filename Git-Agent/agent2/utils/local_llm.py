@@ -0,0 +1,102 @@
+import re
+import time
+import json
+import hashlib
+from typing import Any, List, Optional
+from langchain_core.language_models.llms import LLM
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+def load_responses(path):
+    """Scripted replies from a JSON list; chat replies may be strings or AIMessage dicts"""
+    if not path:
+        return []
+    with open(path) as f:
+        return json.load(f)
+
+def _stream_reply(text, latency, on_token):
+    """Spread the simulated latency over word-sized tokens, as a streaming provider would"""
+    tokens = re.findall(r'\s*\S+', text) or [text]
+    for token in tokens:
+        if latency:
+            time.sleep(latency / len(tokens))
+        on_token(token)
+
+def _digest(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:12]
+
+class LocalFakeLLM(LLM):
+    """
+    Deterministic stand-in for the completion model, for offline runs
+    
+    Plays back `responses` in order (wrapping around); without a script it
+    answers every prompt with a ReAct final answer derived from the prompt, so
+    the same prompt always gets the same reply. `latency` simulates provider
+    time per call; with `streaming` it is spread over word-sized tokens
+    sent to the callbacks.
+    """
+    responses: List[str] = []
+    latency: float = 0.0
+    streaming: bool = False
+    model_name: str = "local-fake"
+    calls: int = 0
+    
+    @property
+    def _llm_type(self) -> str:
+        return "local-fake"
+    
+    @property
+    def _identifying_params(self):
+        return {"model_name": self.model_name, "responses": _digest(json.dumps(self.responses))}
+    
+    def _call(self, prompt: str, stop: Optional[List[str]] = None, run_manager=None, **kwargs: Any) -> str:
+        index = self.calls
+        self.calls += 1
+        if self.responses:
+            reply = self.responses[index % len(self.responses)]
+        else:
+            reply = f"I now know the final answer.\nFinal Answer: Offline reply {_digest(prompt)}"
+        if self.streaming and run_manager:
+            _stream_reply(reply, self.latency, run_manager.on_llm_new_token)
+        elif self.latency:
+            time.sleep(self.latency)
+        return reply
+
+class LocalFakeChatModel(BaseChatModel):
+    """
+    Deterministic stand-in for the chat model, for offline runs
+    
+    Like LocalFakeLLM; scripted replies may be strings or dicts with content
+    and additional_kwargs (e.g. OpenAI-style tool_calls).
+    """
+    responses: List[Any] = []
+    latency: float = 0.0
+    streaming: bool = False
+    model_name: str = "local-fake-chat"
+    calls: int = 0
+    
+    @property
+    def _llm_type(self) -> str:
+        return "local-fake-chat"
+    
+    @property
+    def _identifying_params(self):
+        return {"model_name": self.model_name, "responses": _digest(json.dumps(self.responses))}
+    
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        index = self.calls
+        self.calls += 1
+        if self.responses:
+            reply = self.responses[index % len(self.responses)]
+            if isinstance(reply, str):
+                message = AIMessage(content=reply)
+            else:
+                message = AIMessage(content=reply.get("content", ""), additional_kwargs=reply.get("additional_kwargs", {}))
+        else:
+            message = AIMessage(content=f"Offline reply {_digest(messages[-1].content if messages else '')}")
+        if self.streaming and run_manager and message.content:
+            _stream_reply(message.content, self.latency, run_manager.on_llm_new_token)
+        elif self.latency:
+            time.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=message)])
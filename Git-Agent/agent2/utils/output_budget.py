@@ -0,0 +1,240 @@
+import re
+import threading
+import importlib.util
+import pathlib
+
+# Dynamic import for config
+config_path = pathlib.Path(__file__).parent.parent / "config.py"
+spec = importlib.util.spec_from_file_location("config", config_path)
+config = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(config)
+
+CONTEXT_WINDOW_TOKENS = config.CONTEXT_WINDOW_TOKENS
+TOKEN_BUDGET_SHARES = config.TOKEN_BUDGET_SHARES
+
+# Lines worth keeping from test, lint and command output
+_ERROR_LINE = re.compile(
+    r'(error|exception|traceback|failed|failure|assert|warning|^E\s|^\S+:\d+:\d*:?\s*[A-Z]\d+)',
+    re.IGNORECASE
+)
+# "path:line: text" lines as formatted by the SearchCode wrapper
+_MATCH_LINE = re.compile(r'^(.+?):(\d+): ?(.*)$')
+
+_encoding = None
+_encoding_guard = threading.Lock()
+_encoding_failed = False
+
+def _get_encoding():
+    global _encoding, _encoding_failed
+    if _encoding is None and not _encoding_failed:
+        with _encoding_guard:
+            if _encoding is None and not _encoding_failed:
+                try:
+                    import tiktoken
+                    _encoding = tiktoken.get_encoding("cl100k_base")
+                except Exception as e:
+                    # tiktoken missing, or its vocabulary can't be downloaded
+                    print(f"Falling back to character-based token estimates: {str(e)[:100]}")
+                    _encoding_failed = True
+    return _encoding
+
+def count_tokens(text):
+    """
+    Count tokens with the local tiktoken vocabulary, or estimate them
+    (4 characters per token) when tiktoken is not available
+    """
+    encoding = _get_encoding()
+    if encoding is None:
+        return (len(text) + 3) // 4
+    return len(encoding.encode(text, disallowed_special=()))
+
+def tool_budget(tool_name):
+    """Token budget for one output of a tool (or "prompt"), from its share of the context window"""
+    share = TOKEN_BUDGET_SHARES.get(tool_name, TOKEN_BUDGET_SHARES["default"])
+    return int(CONTEXT_WINDOW_TOKENS * share)
+
+def _take_lines(lines, budget, reverse=False):
+    """Longest run of lines from the start (or the end) that fits the budget"""
+    taken = []
+    used = 0
+    for line in (reversed(lines) if reverse else lines):
+        cost = count_tokens(line) + 1
+        if used + cost > budget:
+            break
+        taken.append(line)
+        used += cost
+    return taken[::-1] if reverse else taken
+
+def shape_head_tail(text, budget):
+    """
+    Keep the start and the end of a text, dropping lines in the middle
+    
+    Args:
+        text (str): Tool output
+        budget (int): Token budget
+    
+    Returns:
+        str: The text unchanged if it fits, else its head and tail with a marker
+    """
+    if count_tokens(text) <= budget:
+        return text
+    lines = text.splitlines()
+    if len(lines) < 3:
+        # One long line: cut by estimated characters instead
+        chars = budget * 4
+        return text[:chars // 2] + f"\n... [{len(text) - chars} characters omitted] ...\n" + text[-chars // 2:]
+    
+    head = _take_lines(lines, budget * 2 // 3)
+    tail = _take_lines(lines[len(head):], budget - budget * 2 // 3 - 10, reverse=True)
+    omitted = len(lines) - len(head) - len(tail)
+    return "\n".join(head + [f"... [{omitted} lines omitted] ..."] + tail)
+
+def page_lines(lines, first_line, total_lines, budget, continue_hint):
+    """
+    As many lines as fit the budget, with a note on where to continue
+    
+    Unlike shape_head_tail nothing in the middle is dropped, so a file read
+    page by page can be rewritten in full.
+    
+    Args:
+        lines (list): Lines with their line endings, starting at first_line
+        first_line (int): Line number of lines[0] (1-based)
+        total_lines (int): Lines in the whole file
+        budget (int): Token budget
+        continue_hint (str): How to read on, completed with the next line number
+    
+    Returns:
+        str: The lines, plus "[Lines a-b of n ...]" when not the whole file
+    """
+    shown = _take_lines(lines, budget - 40)
+    if not shown and lines:
+        # One line longer than the budget: cut it by estimated characters
+        shown = [lines[0][:max(budget - 40, 1) * 4] + "\n"]
+    last_line = first_line + len(shown) - 1
+    text = "".join(shown)
+    if first_line <= 1 and last_line >= total_lines:
+        return text
+    note = f"[Lines {first_line}-{last_line} of {total_lines}"
+    if last_line < total_lines:
+        note += f"; {continue_hint}{last_line + 1}"
+    return text + ("" if text.endswith("\n") or not text else "\n") + note + "]"
+
+def shape_errors(text, budget, context=2):
+    """
+    Keep error and failure lines (with a little context) and the closing summary
+    
+    Used for test, lint and analysis output, where the passing lines matter
+    least.
+    
+    Args:
+        text (str): Tool output
+        budget (int): Token budget
+        context (int): Lines kept after each error line
+    
+    Returns:
+        str: The text unchanged if it fits, else the first line, the error
+            lines and the last lines
+    """
+    if count_tokens(text) <= budget:
+        return text
+    lines = text.splitlines()
+    keep = set(range(min(1, len(lines)))) | set(range(max(0, len(lines) - 5), len(lines)))
+    for index, line in enumerate(lines):
+        if _ERROR_LINE.search(line):
+            keep.update(range(index, min(index + context + 1, len(lines))))
+    
+    shaped = []
+    previous = -1
+    for index in sorted(keep):
+        if index > previous + 1:
+            shaped.append(f"... [{index - previous - 1} lines omitted] ...")
+        shaped.append(lines[index])
+        previous = index
+    return shape_head_tail("\n".join(shaped), budget)
+
+def shape_matches(text, budget, per_file=5, max_line_chars=160):
+    """
+    Group search matches by file and keep a few per file
+    
+    Args:
+        text (str): Header line followed by "path:line: text" lines
+        budget (int): Token budget
+        per_file (int): Matches listed per file
+        max_line_chars (int): Matched lines are cut to this length
+    
+    Returns:
+        str: The text unchanged if it fits, else one block per file with its
+            match count, as many files as fit
+    """
+    if count_tokens(text) <= budget:
+        return text
+    header = []
+    groups = {}
+    for line in text.splitlines():
+        match = _MATCH_LINE.match(line)
+        if not match:
+            header.append(line)
+            continue
+        path, line_number, matched = match.groups()
+        groups.setdefault(path, []).append((line_number, matched.strip()[:max_line_chars]))
+    
+    shaped = header[:]
+    used = sum(count_tokens(line) + 1 for line in shaped)
+    listed_files = 0
+    # Files with the most matches first
+    for path, matches in sorted(groups.items(), key=lambda item: -len(item[1])):
+        block = [f"{path} ({len(matches)} matches)"]
+        block += [f"  {line_number}: {matched}" for line_number, matched in matches[:per_file]]
+        if len(matches) > per_file:
+            block.append(f"  ... {len(matches) - per_file} more")
+        cost = sum(count_tokens(line) + 1 for line in block)
+        if used + cost > budget - 20:
+            break
+        shaped += block
+        used += cost
+        listed_files += 1
+    
+    if listed_files < len(groups):
+        remaining = list(groups.items())
+        remaining.sort(key=lambda item: -len(item[1]))
+        rest = remaining[listed_files:]
+        shaped.append(f"... and {len(rest)} more files ({sum(len(m) for _, m in rest)} matches); narrow the query or file_pattern")
+    return "\n".join(shaped)
+
+def shape_none(text, budget):
+    """Leave a text as is (for tools that page their output themselves)"""
+    return text
+
+# How each tool's output is shaped; anything else keeps its head and tail
+_SHAPERS = {
+    "ReadFile": shape_none,
+    "SearchCode": shape_matches,
+    "RunTests": shape_errors,
+    "LintCode": shape_errors,
+    "AnalyzeCode": shape_errors,
+    "RunCommand": shape_errors,
+}
+
+def shape_output(tool_name, output, budget=None):
+    """
+    Fit a tool output into the tool's token budget
+    
+    Args:
+        tool_name (str): Tool name, e.g. "ReadFile"
+        output: Tool output; non-strings are returned unchanged
+        budget (int): Token budget, defaults to the tool's share of the context window
+    
+    Returns:
+        The shaped output
+    """
+    if not isinstance(output, str):
+        return output
+    if budget is None:
+        budget = tool_budget(tool_name)
+    return _SHAPERS.get(tool_name, shape_head_tail)(output, budget)
+
+def with_output_budget(tool_name, func):
+    """Wrap a tool function so its output is shaped to the tool's token budget"""
+    def run(inputs):
+        return shape_output(tool_name, func(inputs))
+    return run
@@ -0,0 +1,273 @@
+import os
+import json
+import time
+import secrets
+import threading
+import importlib.util
+import pathlib
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.messages import get_buffer_string
+from utils.tracing import add_span_listener, remove_span_listener, flush_traces, instrument_git, redact_credentials
+from utils.output_budget import count_tokens
+
+# Dynamic import for config
+config_path = pathlib.Path(__file__).parent.parent / "config.py"
+spec = importlib.util.spec_from_file_location("config", config_path)
+config = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(config)
+
+PROFILE_FILE = config.PROFILE_FILE
+
+# Time spent in GitPython commands shows up as "git" spans under the tool that ran them
+instrument_git()
+
+_export_guard = threading.Lock()
+
+def _span_category(name):
+    if name.startswith("llm"):
+        return "llm"
+    if name.startswith("tool:"):
+        return "tool"
+    if name == "git" or name.endswith("run_command"):
+        return "subprocess"
+    return "other"
+
+class TurnProfiler(BaseCallbackHandler):
+    """
+    Records one agent turn as a span tree
+    
+    Agent steps, LLM calls (latency, prompt and completion tokens) and tool
+    calls come from LangChain callbacks; wrapper, dev operation, subprocess and
+    git spans come from utils.tracing and are attached under the tool call
+    that ran them (same thread, inside its time window).
+    
+    Use as a callback for one run, then call finish() for the summary.
+    """
+    def __init__(self, name="agent turn"):
+        self.trace_id = secrets.token_hex(16)
+        self.spans = {}
+        self.order = []
+        self.traced_spans = []
+        self.lock = threading.Lock()
+        self.root_id = self._new_span(name, None, {})
+        self.agent_key = None
+        self.step_key = None
+        self.steps = 0
+        self.finished = False
+        add_span_listener(self._on_traced_span)
+    
+    def _new_span(self, name, parent_key, attributes, key=None):
+        key = key or secrets.token_hex(8)
+        with self.lock:
+            self.spans[key] = {
+                "span_id": secrets.token_hex(8),
+                "parent": parent_key,
+                "name": name,
+                "start": time.time(),
+                "end": None,
+                "thread": threading.current_thread().name,
+                "attributes": attributes,
+                "error": None,
+            }
+            self.order.append(key)
+        return key
+    
+    def _end_span(self, key, error=None, **attributes):
+        with self.lock:
+            span = self.spans.get(key)
+            if span is None:
+                return
+            span["end"] = time.time()
+            span["attributes"].update(attributes)
+            if error is not None:
+                span["error"] = redact_credentials(str(error))[:200]
+    
+    def _step_parent(self, parent_run_id):
+        """Current agent step for LLM and tool calls made by the agent; root otherwise"""
+        key = str(parent_run_id) if parent_run_id else None
+        if key is not None and key in self.spans and key != self.agent_key:
+            return key
+        return self.step_key or self.agent_key or self.root_id
+    
+    def _start_step(self):
+        if self.agent_key is None:
+            return
+        if self.step_key is not None:
+            self._end_span(self.step_key)
+        self.steps += 1
+        self.step_key = self._new_span(f"step {self.steps}", self.agent_key, {})
+    
+    def _on_traced_span(self, span):
+        with self.lock:
+            self.traced_spans.append(span)
+    
+    # LangChain callbacks
+    
+    def on_chain_start(self, serialized, inputs, run_id=None, parent_run_id=None, **kwargs):
+        # Only the agent executor itself becomes a span; inner runnables are noise
+        if parent_run_id is None:
+            self.agent_key = self._new_span("agent", self.root_id, {}, key=str(run_id))
+    
+    def on_chain_end(self, outputs, run_id=None, **kwargs):
+        if str(run_id) == self.agent_key and self.step_key is not None:
+            self._end_span(self.step_key)
+        self._end_span(str(run_id))
+    
+    def on_chain_error(self, error, run_id=None, **kwargs):
+        if str(run_id) == self.agent_key and self.step_key is not None:
+            self._end_span(self.step_key)
+        self._end_span(str(run_id), error=error)
+    
+    def on_llm_start(self, serialized, prompts, run_id=None, parent_run_id=None, **kwargs):
+        # Every model call starts a new agent iteration
+        self._start_step()
+        self._new_span("llm", self._step_parent(None),
+                       {"prompt_tokens": sum(count_tokens(prompt) for prompt in prompts)}, key=str(run_id))
+    
+    def on_chat_model_start(self, serialized, messages, run_id=None, parent_run_id=None, **kwargs):
+        self._start_step()
+        prompt_tokens = sum(count_tokens(get_buffer_string(batch)) for batch in messages)
+        self._new_span("llm", self._step_parent(None), {"prompt_tokens": prompt_tokens}, key=str(run_id))
+    
+    def on_llm_end(self, response, run_id=None, **kwargs):
+        usage = (response.llm_output or {}).get("token_usage") or {}
+        completion = "".join(
+            getattr(generation, "text", "") for generations in response.generations for generation in generations
+        )
+        attributes = {"completion_tokens": usage.get("completion_tokens") or count_tokens(completion)}
+        if usage.get("prompt_tokens"):
+            attributes["prompt_tokens"] = usage["prompt_tokens"]
+        self._end_span(str(run_id), **attributes)
+    
+    def on_llm_error(self, error, run_id=None, **kwargs):
+        self._end_span(str(run_id), error=error)
+    
+    def on_tool_start(self, serialized, input_str, run_id=None, parent_run_id=None, **kwargs):
+        name = (serialized or {}).get("name", "tool")
+        self._new_span(f"tool:{name}", self._step_parent(parent_run_id), {"input_chars": len(input_str or "")}, key=str(run_id))
+    
+    def on_tool_end(self, output, run_id=None, **kwargs):
+        self._end_span(str(run_id), output_chars=len(str(output)))
+    
+    def on_tool_error(self, error, run_id=None, **kwargs):
+        self._end_span(str(run_id), error=error)
+    
+    # Assembly
+    
+    def _attach_traced_spans(self):
+        """Add tracing spans under the tool (or root) span that ran them"""
+        by_trace_id = {}
+        tools = [key for key in self.order if self.spans[key]["name"].startswith("tool:")]
+        for traced in sorted(self.traced_spans, key=lambda span: span["span_id"]):
+            start = traced["start"]
+            end = start + traced["duration_ms"] / 1000
+            parent = by_trace_id.get(traced["parent_id"])
+            if parent is None:
+                for key in tools:
+                    tool = self.spans[key]
+                    if tool["thread"] == traced["thread"] and tool["start"] <= start and end <= (tool["end"] or end):
+                        parent = key
+            if parent is None:
+                # Not run by this turn's tools (background fetch, another session)
+                continue
+            key = secrets.token_hex(8)
+            self.spans[key] = {
+                "span_id": secrets.token_hex(8),
+                "parent": parent,
+                "name": traced["name"],
+                "start": start,
+                "end": end,
+                "thread": traced["thread"],
+                "attributes": {**traced.get("attributes", {}), "input_size": traced["input_size"],
+                               "output_size": traced["output_size"]},
+                "error": traced["error"] or (None if traced["outcome"] == "ok" else traced["outcome"]),
+            }
+            self.order.append(key)
+            by_trace_id[traced["span_id"]] = key
+    
+    def finish(self, export=True):
+        """
+        End the turn: collect the tracing spans, optionally export, and summarize
+        
+        Returns:
+            dict: total_ms, per-category milliseconds (llm, tool, subprocess),
+                token counts, and the flattened span tree (name, depth,
+                duration_ms, attributes, error)
+        """
+        if not self.finished:
+            self.finished = True
+            self._end_span(self.root_id)
+            flush_traces()
+            remove_span_listener(self._on_traced_span)
+            self._attach_traced_spans()
+            if export and PROFILE_FILE:
+                export_otlp(self, PROFILE_FILE)
+        return self.summary()
+    
+    def summary(self):
+        children = {}
+        for key in self.order:
+            children.setdefault(self.spans[key]["parent"], []).append(key)
+        
+        rows = []
+        totals = {"llm": 0.0, "tool": 0.0, "subprocess": 0.0}
+        tokens = {"prompt_tokens": 0, "completion_tokens": 0}
+        
+        def walk(key, depth):
+            span = self.spans[key]
+            duration_ms = ((span["end"] or time.time()) - span["start"]) * 1000
+            category = _span_category(span["name"])
+            if category in totals:
+                totals[category] += duration_ms
+            if category == "llm":
+                for name in tokens:
+                    tokens[name] += span["attributes"].get(name, 0)
+            rows.append({"name": span["name"], "depth": depth, "duration_ms": duration_ms,
+                         "attributes": span["attributes"], "error": span["error"]})
+            for child in sorted(children.get(key, []), key=lambda child: self.spans[child]["start"]):
+                walk(child, depth + 1)
+        
+        walk(self.root_id, 0)
+        return {"total_ms": rows[0]["duration_ms"], "by_category_ms": totals, **tokens, "spans": rows}
+
+def _otlp_value(value):
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+def to_otlp(profiler):
+    """The profile as an OTLP/JSON ExportTraceServiceRequest"""
+    spans = []
+    for key in profiler.order:
+        span = profiler.spans[key]
+        parent = profiler.spans.get(span["parent"])
+        attributes = {**span["attributes"], "thread.name": span["thread"]}
+        spans.append({
+            "traceId": profiler.trace_id,
+            "spanId": span["span_id"],
+            "parentSpanId": parent["span_id"] if parent else "",
+            "name": span["name"],
+            "kind": 1,
+            "startTimeUnixNano": str(int(span["start"] * 1e9)),
+            "endTimeUnixNano": str(int((span["end"] or span["start"]) * 1e9)),
+            "attributes": [{"key": name, "value": _otlp_value(value)} for name, value in attributes.items()],
+            "status": {"code": 2, "message": span["error"]} if span["error"] else {"code": 1},
+        })
+    return {"resourceSpans": [{
+        "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": "agent2"}}]},
+        "scopeSpans": [{"scope": {"name": "agent2.profiler"}, "spans": spans}],
+    }]}
+
+def export_otlp(profiler, path=PROFILE_FILE):
+    """Append the profile to a JSON-lines file, one OTLP request per turn"""
+    try:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        line = json.dumps(to_otlp(profiler))
+        with _export_guard, open(path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+    except OSError as e:
+        print(f"Error exporting profile: {str(e)}")
@@ -0,0 +1,517 @@
+import re
+import json
+import time
+import heapq
+import asyncio
+import itertools
+import threading
+import importlib.util
+import pathlib
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+import httpx
+from langchain_core.callbacks import BaseCallbackHandler
+
+# Dynamic import for config
+config_path = pathlib.Path(__file__).parent.parent / "config.py"
+spec = importlib.util.spec_from_file_location("config", config_path)
+config = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(config)
+
+RATE_LIMIT_RPM = config.RATE_LIMIT_RPM
+RATE_LIMIT_TPM = config.RATE_LIMIT_TPM
+RATE_LIMIT_MAX_RETRIES = config.RATE_LIMIT_MAX_RETRIES
+RATE_LIMIT_MAX_WAIT = config.RATE_LIMIT_MAX_WAIT
+
+# Lower runs first: chat turns go ahead of batch work such as the PR agents
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 10
+
+# Completion tokens charged up front when a request sets no max_tokens
+DEFAULT_COMPLETION_TOKENS = 256
+
+# Schedulers per provider. This module is imported as ``utils.rate_limiter``
+# so every client built in the process shares one budget per provider.
+_limiters = {}
+_limiters_guard = threading.Lock()
+# HTTP client pairs per (scheduler, priority, retries), shared by every model built with them
+_http_clients = {}
+
+# OpenAI and Anthropic spellings of the rate-limit headers
+_HEADERS = {
+    "requests": {
+        "limit": ("x-ratelimit-limit-requests", "anthropic-ratelimit-requests-limit"),
+        "remaining": ("x-ratelimit-remaining-requests", "anthropic-ratelimit-requests-remaining"),
+        "reset": ("x-ratelimit-reset-requests", "anthropic-ratelimit-requests-reset"),
+    },
+    "tokens": {
+        "limit": ("x-ratelimit-limit-tokens", "anthropic-ratelimit-tokens-limit"),
+        "remaining": ("x-ratelimit-remaining-tokens", "anthropic-ratelimit-tokens-remaining"),
+        "reset": ("x-ratelimit-reset-tokens", "anthropic-ratelimit-tokens-reset"),
+    },
+}
+
+_DURATION = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_UNITS = {"h": 3600, "m": 60, "s": 1, "ms": 0.001}
+
+class RateLimitTimeout(Exception):
+    """Raised when a request waits longer than the scheduler's max_wait to be sent"""
+
+def parse_duration(value):
+    """
+    Seconds until a rate-limit reset or retry
+    
+    Accepts plain seconds ("1.5"), OpenAI durations ("6m0s", "20ms"),
+    RFC 3339 timestamps (Anthropic resets) and HTTP dates (Retry-After).
+    
+    Returns:
+        float: Seconds from now, or None when the value cannot be read
+    """
+    if value is None:
+        return None
+    value = str(value).strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    parts = _DURATION.findall(value)
+    if parts and "".join(number + unit for number, unit in parts) == value:
+        return sum(float(number) * _UNITS[unit] for number, unit in parts)
+    for parse in (datetime.fromisoformat, parsedate_to_datetime):
+        try:
+            return max(0.0, parse(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            continue
+    return None
+
+def retry_after(headers):
+    """Seconds a 429 response asks to wait (retry-after-ms or retry-after), or None"""
+    milliseconds = headers.get("retry-after-ms")
+    if milliseconds:
+        try:
+            return float(milliseconds) / 1000
+        except ValueError:
+            pass
+    return parse_duration(headers.get("retry-after"))
+
+def _header(headers, names):
+    for name in names:
+        value = headers.get(name)
+        if value is not None:
+            return value
+    return None
+
+def _header_number(headers, names):
+    try:
+        return float(_header(headers, names))
+    except (TypeError, ValueError):
+        return None
+
+def estimate_tokens(body):
+    """
+    Tokens charged for a request before it is sent: prompt characters / 4
+    plus its completion limit. Corrected from the response's usage when known.
+    
+    Args:
+        body (dict): Request JSON (chat "messages" or completion "prompt")
+    """
+    prompt = body.get("messages") or body.get("prompt") or ""
+    text = prompt if isinstance(prompt, str) else json.dumps(prompt)
+    return len(text) // 4 + int(body.get("max_tokens") or DEFAULT_COMPLETION_TOKENS)
+
+def _used_tokens(usage):
+    if not isinstance(usage, dict):
+        return None
+    if usage.get("total_tokens") is not None:
+        return usage["total_tokens"]
+    if "input_tokens" in usage or "output_tokens" in usage:
+        return (usage.get("input_tokens") or 0) + (usage.get("output_tokens") or 0)
+    return None
+
+class TokenBucket:
+    """
+    Budget refilled continuously at `limit` per minute, holding at most `limit`
+    
+    A limit of 0 means unlimited. The level may go negative when a request
+    turns out to cost more than was charged for it.
+    """
+    def __init__(self, per_minute):
+        self.configured = per_minute
+        self.limit = per_minute
+        self.level = float(per_minute)
+        self.updated = time.monotonic()
+    
+    def refill(self, now, factor):
+        if self.limit:
+            self.level = min(self.limit, self.level + (now - self.updated) * self.limit / 60 * factor)
+        self.updated = now
+    
+    def wait_time(self, amount, factor):
+        """Seconds until `amount` is available (amounts above the limit wait for a full bucket)"""
+        if not self.limit:
+            return 0.0
+        missing = min(amount, self.limit) - self.level
+        return max(0.0, missing / (self.limit / 60 * factor))
+    
+    def take(self, amount):
+        if self.limit:
+            self.level -= min(amount, self.limit)
+    
+    def learn(self, limit, remaining):
+        """Adopt the provider's limit (never above the configured one) and remaining budget"""
+        if limit:
+            self.limit = min(self.configured, limit) if self.configured else limit
+            self.level = min(self.level, self.limit)
+        if remaining is not None and self.limit:
+            self.level = min(self.level, remaining)
+
+class RateLimitScheduler:
+    """
+    Shared admission control for calls to one LLM provider
+    
+    Requests wait in a priority queue (lowest priority first, then arrival
+    order) until a request and its estimated tokens fit in the per-minute
+    buckets. The buckets adapt to the provider: limits and remaining budgets
+    are read from its rate-limit headers, and a 429 pauses every caller for
+    the Retry-After time (or an exponential backoff), empties the buckets
+    and cuts the refill rate by a quarter, recovering step by step on success.
+    
+    acquire() blocks a thread and acquire_async() awaits; both may be mixed.
+    """
+    def __init__(self, requests_per_minute=RATE_LIMIT_RPM, tokens_per_minute=RATE_LIMIT_TPM,
+                 max_wait=RATE_LIMIT_MAX_WAIT, name="llm"):
+        self.name = name
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.max_wait = max_wait
+        self.rate_factor = 1.0
+        self.backoff = 0.0
+        self.paused_until = 0.0
+        self.waiting = []
+        self.sequence = itertools.count()
+        self.condition = threading.Condition()
+        self.granted = 0
+        self.rate_limited = 0
+        self.timeouts = 0
+        self.waited_seconds = 0.0
+        self.max_queue = 0
+    
+    def _enqueue(self, priority):
+        ticket = (priority, next(self.sequence))
+        heapq.heappush(self.waiting, ticket)
+        self.max_queue = max(self.max_queue, len(self.waiting))
+        return ticket
+    
+    def _cancel(self, ticket):
+        if ticket in self.waiting:
+            self.waiting.remove(ticket)
+            heapq.heapify(self.waiting)
+        self.condition.notify_all()
+    
+    def _try_grant(self, ticket, tokens):
+        """Grant the ticket if it is first and the budget allows; else seconds to wait (None: until notified)"""
+        if self.waiting[0] != ticket:
+            return None
+        now = time.monotonic()
+        self.requests.refill(now, self.rate_factor)
+        self.tokens.refill(now, self.rate_factor)
+        wait = max(
+            self.paused_until - now,
+            self.requests.wait_time(1, self.rate_factor),
+            self.tokens.wait_time(tokens, self.rate_factor),
+        )
+        if wait > 0:
+            return wait
+        heapq.heappop(self.waiting)
+        self.requests.take(1)
+        self.tokens.take(tokens)
+        self.granted += 1
+        self.condition.notify_all()
+        return 0.0
+    
+    def _timeout(self, ticket, priority):
+        self._cancel(ticket)
+        self.timeouts += 1
+        return RateLimitTimeout(
+            f"Waited over {self.max_wait:g}s for the {self.name} rate limit "
+            f"({len(self.waiting)} requests queued, priority {priority})"
+        )
+    
+    def acquire(self, tokens=0, priority=PRIORITY_INTERACTIVE):
+        """
+        Block until a request may be sent
+        
+        Args:
+            tokens (int): Estimated tokens of the request (see estimate_tokens)
+            priority (int): Queue priority, lower first
+        
+        Returns:
+            float: Seconds waited
+        """
+        start = time.monotonic()
+        with self.condition:
+            ticket = self._enqueue(priority)
+            while True:
+                wait = self._try_grant(ticket, tokens)
+                if wait == 0:
+                    break
+                remaining = start + self.max_wait - time.monotonic()
+                if remaining <= 0:
+                    raise self._timeout(ticket, priority)
+                self.condition.wait(min(remaining, 1.0 if wait is None else wait))
+            waited = time.monotonic() - start
+            self.waited_seconds += waited
+        return waited
+    
+    async def acquire_async(self, tokens=0, priority=PRIORITY_INTERACTIVE):
+        """acquire() for coroutines: waits without blocking the event loop"""
+        start = time.monotonic()
+        with self.condition:
+            ticket = self._enqueue(priority)
+        try:
+            while True:
+                with self.condition:
+                    wait = self._try_grant(ticket, tokens)
+                    if wait == 0:
+                        ticket = None
+                        waited = time.monotonic() - start
+                        self.waited_seconds += waited
+                        return waited
+                    remaining = start + self.max_wait - time.monotonic()
+                    if remaining <= 0:
+                        raise self._timeout(ticket, priority)
+                await asyncio.sleep(min(remaining, 0.05 if wait is None else wait))
+        finally:
+            if ticket is not None:
+                with self.condition:
+                    self._cancel(ticket)
+    
+    def release(self, estimated, used):
+        """Correct the token bucket once a request's actual usage is known"""
+        if used is None:
+            return
+        with self.condition:
+            if self.tokens.limit:
+                self.tokens.level = min(self.tokens.limit, self.tokens.level + estimated - used)
+            self.condition.notify_all()
+    
+    def update_from_headers(self, headers):
+        """Learn limits and remaining budgets from a provider response's rate-limit headers"""
+        with self.condition:
+            now = time.monotonic()
+            for kind, bucket in (("requests", self.requests), ("tokens", self.tokens)):
+                names = _HEADERS[kind]
+                remaining = _header_number(headers, names["remaining"])
+                bucket.refill(now, self.rate_factor)
+                bucket.learn(_header_number(headers, names["limit"]), remaining)
+                if remaining is not None and remaining < 1:
+                    reset = parse_duration(_header(headers, names["reset"]))
+                    if reset:
+                        self.paused_until = max(self.paused_until, now + reset)
+    
+    def on_rate_limited(self, delay=None):
+        """
+        Back off after a 429: pause all callers, empty the buckets and slow the refill
+        
+        Args:
+            delay (float): Seconds the provider asked to wait; doubles from 1s (up to 60s) if None
+        """
+        with self.condition:
+            self.rate_limited += 1
+            now = time.monotonic()
+            # 429s for requests already in flight belong to the same overload: back off once
+            if now >= self.paused_until:
+                self.backoff = min(60.0, max(1.0, self.backoff * 2))
+                self.rate_factor = max(0.1, self.rate_factor * 0.75)
+            self.paused_until = max(self.paused_until, now + (self.backoff if delay is None else delay))
+            for bucket in (self.requests, self.tokens):
+                bucket.refill(now, self.rate_factor)
+                bucket.level = min(bucket.level, 0.0)
+            self.condition.notify_all()
+    
+    def on_success(self):
+        with self.condition:
+            self.backoff = 0.0
+            self.rate_factor = min(1.0, self.rate_factor + 0.1)
+    
+    def stats(self):
+        """Counters and current budgets, for benchmarks and health checks"""
+        with self.condition:
+            return {
+                "name": self.name,
+                "granted": self.granted,
+                "rate_limited": self.rate_limited,
+                "timeouts": self.timeouts,
+                "queued": len(self.waiting),
+                "max_queue": self.max_queue,
+                "waited_seconds": round(self.waited_seconds, 3),
+                "requests_per_minute": self.requests.limit,
+                "tokens_per_minute": self.tokens.limit,
+                "rate_factor": round(self.rate_factor, 2),
+            }
+
+def get_rate_limiter(name="openai"):
+    """
+    The process-wide scheduler for a provider
+    
+    Args:
+        name (str): Provider ("openai", "anthropic", ...)
+    
+    Returns:
+        RateLimitScheduler: Shared by every client built for that provider
+    """
+    with _limiters_guard:
+        if name not in _limiters:
+            _limiters[name] = RateLimitScheduler(name=name)
+        return _limiters[name]
+
+def _request_body(request):
+    try:
+        body = json.loads(request.content or b"{}")
+    except (ValueError, httpx.RequestNotRead):
+        return {}
+    return body if isinstance(body, dict) else {}
+
+def _response_usage(response):
+    try:
+        return _used_tokens(response.json().get("usage"))
+    except (ValueError, AttributeError):
+        return None
+
+class RateLimitedTransport(httpx.BaseTransport):
+    """
+    httpx transport that sends each request through a RateLimitScheduler
+    
+    Every response feeds its rate-limit headers back to the scheduler, and
+    429s are retried here (up to max_retries) after the scheduler's pause, so
+    the SDK above only sees a 429 once the budget is really exhausted.
+    """
+    def __init__(self, scheduler=None, priority=PRIORITY_INTERACTIVE, max_retries=RATE_LIMIT_MAX_RETRIES, transport=None):
+        self.scheduler = scheduler or get_rate_limiter()
+        self.priority = priority
+        self.max_retries = max_retries
+        self.transport = transport or httpx.HTTPTransport()
+    
+    def handle_request(self, request):
+        body = _request_body(request)
+        estimate = estimate_tokens(body)
+        for attempt in range(self.max_retries + 1):
+            self.scheduler.acquire(estimate, self.priority)
+            response = self.transport.handle_request(request)
+            self.scheduler.update_from_headers(response.headers)
+            if response.status_code != 429:
+                if response.is_success:
+                    self.scheduler.on_success()
+                    if not body.get("stream"):
+                        response.read()
+                        self.scheduler.release(estimate, _response_usage(response))
+                return response
+            self.scheduler.on_rate_limited(retry_after(response.headers))
+            if attempt == self.max_retries:
+                return response
+            response.close()
+    
+    def close(self):
+        self.transport.close()
+
+class AsyncRateLimitedTransport(httpx.AsyncBaseTransport):
+    """RateLimitedTransport for async clients"""
+    def __init__(self, scheduler=None, priority=PRIORITY_INTERACTIVE, max_retries=RATE_LIMIT_MAX_RETRIES, transport=None):
+        self.scheduler = scheduler or get_rate_limiter()
+        self.priority = priority
+        self.max_retries = max_retries
+        self.transport = transport or httpx.AsyncHTTPTransport()
+    
+    async def handle_async_request(self, request):
+        body = _request_body(request)
+        estimate = estimate_tokens(body)
+        for attempt in range(self.max_retries + 1):
+            await self.scheduler.acquire_async(estimate, self.priority)
+            response = await self.transport.handle_async_request(request)
+            self.scheduler.update_from_headers(response.headers)
+            if response.status_code != 429:
+                if response.is_success:
+                    self.scheduler.on_success()
+                    if not body.get("stream"):
+                        await response.aread()
+                        self.scheduler.release(estimate, _response_usage(response))
+                return response
+            self.scheduler.on_rate_limited(retry_after(response.headers))
+            if attempt == self.max_retries:
+                return response
+            await response.aclose()
+    
+    async def aclose(self):
+        await self.transport.aclose()
+
+def rate_limited_http_clients(scheduler=None, priority=PRIORITY_INTERACTIVE, max_retries=RATE_LIMIT_MAX_RETRIES):
+    """
+    HTTP clients for the OpenAI LangChain models, routed through a scheduler
+    
+    One client pair (and its connection pool) is created per scheduler,
+    priority and retry count and shared by every model that asks for it, so
+    rebuilding agents does not leave unclosed clients behind.
+    
+    Usage:
+        ChatOpenAI(..., **rate_limited_http_clients())
+    
+    Args:
+        scheduler (RateLimitScheduler): Budget to use (default: the shared "openai" one)
+        priority (int): Queue priority of the model's requests
+        max_retries (int): 429 retries per request
+    
+    Returns:
+        dict: http_client and http_async_client keyword arguments
+    """
+    scheduler = scheduler or get_rate_limiter("openai")
+    key = (id(scheduler), priority, max_retries)
+    with _limiters_guard:
+        if key not in _http_clients:
+            _http_clients[key] = {
+                "scheduler": scheduler,  # keeps id(scheduler) from being reused
+                "http_client": httpx.Client(transport=RateLimitedTransport(scheduler, priority, max_retries)),
+                "http_async_client": httpx.AsyncClient(transport=AsyncRateLimitedTransport(scheduler, priority, max_retries)),
+            }
+        clients = _http_clients[key]
+    return {"http_client": clients["http_client"], "http_async_client": clients["http_async_client"]}
+
+class RateLimitCallbackHandler(BaseCallbackHandler):
+    """
+    Admits a model's calls through a scheduler from its callbacks, for clients
+    that take no custom HTTP client (e.g. ChatAnthropic)
+    
+    Calls wait in on_llm_start / on_chat_model_start. Headers of successful
+    calls are not visible here, so the budget adapts only to the rate-limit
+    errors the SDK raises once its own retries are spent.
+    """
+    raise_error = True
+    
+    def __init__(self, scheduler=None, priority=PRIORITY_INTERACTIVE):
+        self.scheduler = scheduler or get_rate_limiter()
+        self.priority = priority
+        self.estimates = {}
+    
+    def _admit(self, text, run_id, invocation_params):
+        estimate = len(text) // 4 + int((invocation_params or {}).get("max_tokens") or DEFAULT_COMPLETION_TOKENS)
+        self.estimates[run_id] = estimate
+        self.scheduler.acquire(estimate, self.priority)
+    
+    def on_llm_start(self, serialized, prompts, run_id=None, invocation_params=None, **kwargs):
+        self._admit("".join(prompts), run_id, invocation_params)
+    
+    def on_chat_model_start(self, serialized, messages, run_id=None, invocation_params=None, **kwargs):
+        self._admit("".join(str(message.content) for batch in messages for message in batch), run_id, invocation_params)
+    
+    def on_llm_end(self, response, run_id=None, **kwargs):
+        estimate = self.estimates.pop(run_id, 0)
+        llm_output = getattr(response, "llm_output", None) or {}
+        self.scheduler.on_success()
+        self.scheduler.release(estimate, _used_tokens(llm_output.get("usage") or llm_output.get("token_usage")))
+    
+    def on_llm_error(self, error, run_id=None, **kwargs):
+        self.estimates.pop(run_id, None)
+        if getattr(error, "status_code", None) != 429:
+            return
+        headers = getattr(getattr(error, "response", None), "headers", None) or {}
+        self.scheduler.update_from_headers(headers)
+        self.scheduler.on_rate_limited(retry_after(headers))
@@ -0,0 +1,157 @@
+import os
+import subprocess
+import threading
+from git import GitCommandError
+
+# Snapshots per repository path. This module is imported as ``utils.ref_snapshot``
+# so the sidebar, status and branch tools all share one cache.
+_git_dirs = {}
+_snapshots = {}
+_snapshots_guard = threading.Lock()
+
+def _git(repo_path, *args):
+    command = ["git", *args]
+    result = subprocess.run(command, cwd=repo_path, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise GitCommandError(command, result.returncode, result.stderr)
+    return result.stdout
+
+def _dot_git_key(repo_path):
+    """
+    Identity of a checkout's .git: the directory itself, or for a worktree the
+    file pointing at its git dir, which is rewritten when the worktree is
+    removed and added again at the same path
+    """
+    try:
+        stat = os.stat(os.path.join(repo_path, ".git"))
+    except OSError:
+        return None
+    if os.path.isdir(os.path.join(repo_path, ".git")):
+        return (stat.st_dev, stat.st_ino)
+    return (stat.st_dev, stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+def _resolve_git_dirs(repo_path):
+    """Return (git_dir, common_dir); they differ for worktrees"""
+    key = _dot_git_key(repo_path)
+    cached = _git_dirs.get(repo_path)
+    if cached is not None and cached[0] == key and os.path.isdir(cached[1][0]):
+        return cached[1]
+    git_dir, common_dir = _git(repo_path, "rev-parse", "--absolute-git-dir", "--git-common-dir").splitlines()
+    git_dirs = (git_dir, os.path.normpath(os.path.join(repo_path, common_dir)))
+    if cached is not None and cached[1] != git_dirs:
+        # Another checkout at the same path; its refs have nothing to do with the old snapshot
+        _snapshots.pop(repo_path, None)
+    _git_dirs[repo_path] = (key, git_dirs)
+    return git_dirs
+
+def _stat_key(path):
+    try:
+        stat = os.stat(path)
+        return (stat.st_mtime_ns, stat.st_size)
+    except FileNotFoundError:
+        return None
+
+def _ref_signature(git_dir, common_dir):
+    """
+    Cheap fingerprint of HEAD, packed-refs and the loose refs tree
+    
+    Git updates a loose ref by renaming a lock file over it, which bumps the
+    mtime of the containing directory, so stat-ing the directories under refs/
+    is enough to notice any created, updated or deleted ref.
+    """
+    signature = [_stat_key(os.path.join(git_dir, "HEAD")), _stat_key(os.path.join(common_dir, "packed-refs"))]
+    for root, dirs, _ in os.walk(os.path.join(common_dir, "refs")):
+        dirs.sort()
+        signature.append((root, _stat_key(root)))
+    return tuple(signature)
+
+def _read_snapshot(repo_path, git_dir):
+    refs = {}
+    output = _git(repo_path, "for-each-ref", "--format=%(objectname) %(refname)")
+    for line in output.splitlines():
+        sha, _, name = line.partition(" ")
+        refs[name] = sha
+    
+    with open(os.path.join(git_dir, "HEAD")) as f:
+        head = f.read().strip()
+    if head.startswith("ref: "):
+        head_ref = head[len("ref: "):]
+        current_branch = head_ref[len("refs/heads/"):] if head_ref.startswith("refs/heads/") else None
+        head_sha = refs.get(head_ref)
+    else:
+        current_branch = None
+        head_sha = head
+    
+    return {
+        "head": head_sha,
+        "current_branch": current_branch,
+        "local_branches": sorted(n[len("refs/heads/"):] for n in refs if n.startswith("refs/heads/")),
+        "remote_branches": sorted(
+            n[len("refs/remotes/"):] for n in refs
+            if n.startswith("refs/remotes/") and not n.endswith("/HEAD")
+        ),
+        "tags": sorted(n[len("refs/tags/"):] for n in refs if n.startswith("refs/tags/")),
+        "refs": refs
+    }
+
+def get_ref_snapshot(repo_path):
+    """
+    Return the branches, tags and HEAD of a repository
+    
+    The snapshot is read with a single ``git for-each-ref`` and cached until
+    HEAD, packed-refs or anything under refs/ changes.
+    
+    Args:
+        repo_path (str): Path to the repository
+    
+    Returns:
+        dict: head, current_branch (None when detached), local_branches,
+            remote_branches (e.g. ``origin/main``), tags and the raw refs map
+    """
+    repo_path = os.path.abspath(repo_path)
+    with _snapshots_guard:
+        git_dir, common_dir = _resolve_git_dirs(repo_path)
+        signature = _ref_signature(git_dir, common_dir)
+        cached = _snapshots.get(repo_path)
+        if cached and cached[0] == signature:
+            return cached[1]
+        snapshot = _read_snapshot(repo_path, git_dir)
+        _snapshots[repo_path] = (signature, snapshot)
+        return snapshot
+
+def get_git_dir(repo_path):
+    """
+    Return the absolute git dir of a checkout (its own one for a worktree)
+    
+    Args:
+        repo_path (str): Path to the repository
+    
+    Returns:
+        str: Path of the git dir, where HEAD and the index live
+    """
+    repo_path = os.path.abspath(repo_path)
+    with _snapshots_guard:
+        return _resolve_git_dirs(repo_path)[0]
+
+def forget_repository(repo_path):
+    """Drop the cached git dirs and snapshot of a repository (e.g. a removed worktree)"""
+    repo_path = os.path.abspath(repo_path)
+    with _snapshots_guard:
+        _git_dirs.pop(repo_path, None)
+        _snapshots.pop(repo_path, None)
+
+def get_ref_signature(repo_path):
+    """
+    Return (git_dir, signature) where the signature changes whenever HEAD or
+    any ref is created, moved or deleted
+    
+    Args:
+        repo_path (str): Path to the repository
+    
+    Returns:
+        tuple: Absolute git dir of the checkout and a hashable ref fingerprint
+    """
+    repo_path = os.path.abspath(repo_path)
+    with _snapshots_guard:
+        git_dir, common_dir = _resolve_git_dirs(repo_path)
+    return git_dir, _ref_signature(git_dir, common_dir)
@@ -0,0 +1,404 @@
+import os
+import re
+import ast
+import json
+import glob
+import hashlib
+import posixpath
+import subprocess
+import threading
+import importlib.util
+import pathlib
+from collections import Counter
+from utils.ref_snapshot import get_ref_snapshot
+from utils.revision_reader import get_revision_reader
+from utils.output_budget import count_tokens, tool_budget
+
+# Dynamic import for config
+config_path = pathlib.Path(__file__).parent.parent / "config.py"
+spec = importlib.util.spec_from_file_location("config", config_path)
+config = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(config)
+
+REPO_MAP_ENABLED = config.REPO_MAP_ENABLED
+REPO_MAP_CACHE_DIR = config.REPO_MAP_CACHE_DIR
+
+MAP_FORMAT_VERSION = 1
+
+# Files whose top-level symbols are extracted; everything else only counts in the tree
+SOURCE_EXTENSIONS = {
+    ".py", ".js", ".jsx", ".mjs", ".ts", ".tsx", ".go", ".rb", ".java", ".kt", ".rs",
+    ".php", ".cs", ".c", ".h", ".cpp", ".hpp", ".swift", ".scala",
+}
+ENTRY_POINT_NAMES = {
+    "main.py", "app.py", "__main__.py", "manage.py", "wsgi.py", "asgi.py", "cli.py", "setup.py",
+    "pyproject.toml", "package.json", "Makefile", "Dockerfile", "main.go", "main.rs",
+    "index.js", "index.ts", "server.js", "server.ts",
+}
+MAX_OUTLINE_BYTES = 1024 * 1024
+READ_BATCH_SIZE = 500
+
+# Top-level declarations in languages other than Python (no indentation, so
+# methods and nested functions are left out)
+_DECLARATION = re.compile(
+    r'^(?:export\s+(?:default\s+)?)?(?:(?:public|private|protected|internal|static|final|abstract|sealed|'
+    r'partial|pub(?:\([\w:]+\))?|async|unsafe|data)\s+)*'
+    r'(?:(?:function\*?|class|interface|type|enum|struct|trait|object|module|def|fn)\s+'
+    r'|func\s+(?:\([^)]*\)\s*)?)([A-Za-z_$][\w$]*)'
+    r'|^(?:export\s+)?(?:const|let|var)\s+([A-Za-z_$][\w$]*)\s*=\s*(?:async\s*)?(?:\(|function)',
+    re.M
+)
+_IMPORT = re.compile(r'''(?:\bfrom|\bimport|\brequire\(|\buse)\s*['"]([^'"\n]+)['"]''')
+_PY_FILE_STRING = re.compile(r'^[\w./-]+\.py$')
+
+# One map per repository path. This module is imported as ``utils.repo_map`` so
+# the agent prompt and the editing tools share it.
+_maps = {}
+_locks = {}
+_maps_guard = threading.Lock()
+
+def _git(repo_path, *args):
+    return subprocess.run(["git", *args], cwd=repo_path, capture_output=True, check=True).stdout
+
+def _is_main_guard(test):
+    return (
+        isinstance(test, ast.Compare)
+        and isinstance(test.left, ast.Name) and test.left.id == "__name__"
+        and any(isinstance(c, ast.Constant) and c.value == "__main__" for c in test.comparators)
+    )
+
+def _outline_python(text):
+    tree = ast.parse(text)
+    symbols, imports, runnable = [], [], False
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and not node.name.startswith("_"):
+            symbols.append(f"{node.name}()")
+        elif isinstance(node, ast.ClassDef) and not node.name.startswith("_"):
+            methods = [
+                item.name for item in node.body
+                if isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef)) and not item.name.startswith("_")
+            ]
+            symbols.append(f"class {node.name}[{', '.join(methods)}]" if methods else f"class {node.name}")
+        elif isinstance(node, ast.If) and _is_main_guard(node.test):
+            runnable = True
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            imports.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            if node.module:
+                imports.append(node.module)
+            else:
+                imports.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.Constant) and isinstance(node.value, str) and _PY_FILE_STRING.match(node.value):
+            # Modules loaded by path, e.g. spec_from_file_location(..., "tools.py")
+            imports.append(node.value)
+    return symbols, imports, runnable
+
+def _outline_text(text):
+    symbols = []
+    for match in _DECLARATION.finditer(text):
+        name = match.group(1) or match.group(2)
+        if name not in symbols:
+            symbols.append(name)
+    return symbols, _IMPORT.findall(text), text.startswith("#!")
+
+def outline_file(path, content):
+    """
+    Top-level symbols, imports and whether a file runs as a program
+    
+    Args:
+        path (str): Path of the file, for its extension
+        content (bytes): File contents
+    
+    Returns:
+        dict: symbols (list), imports (list) and runnable (bool)
+    """
+    outline = {"symbols": [], "imports": [], "runnable": False}
+    if content is None or len(content) > MAX_OUTLINE_BYTES or b"\0" in content[:8000]:
+        return outline
+    text = content.decode("utf-8", errors="replace")
+    symbols = imports = None
+    if path.endswith(".py"):
+        try:
+            symbols, imports, runnable = _outline_python(text)
+        except (SyntaxError, ValueError):
+            pass
+    if symbols is None:
+        symbols, imports, runnable = _outline_text(text)
+    outline.update(symbols=symbols, imports=sorted(set(imports)), runnable=runnable)
+    return outline
+
+def _is_source(path):
+    return posixpath.splitext(path)[1] in SOURCE_EXTENSIONS
+
+def _tracked_blobs(repo_path):
+    """Blob SHA of every tracked file, from the index (submodules left out)"""
+    blobs = {}
+    for record in _git(repo_path, "ls-files", "-s", "-z").split(b"\0"):
+        if not record:
+            continue
+        info, _, path = record.partition(b"\t")
+        mode, sha, _ = info.split(b" ", 2)
+        if mode != b"160000":
+            blobs[path.decode("utf-8", errors="replace")] = sha.decode()
+    return blobs
+
+def _is_partial_clone(repo_path):
+    """Reading every blob of a partial clone would download it, so those are read from the work tree"""
+    result = subprocess.run(
+        ["git", "config", "--get-regexp", r"^(extensions\.partialclone|remote\..*\.promisor)$"],
+        cwd=repo_path, capture_output=True, text=True
+    )
+    return bool(result.stdout.strip())
+
+def _read_worktree(repo_path, path):
+    try:
+        with open(os.path.join(repo_path, path), "rb") as f:
+            return f.read(MAX_OUTLINE_BYTES + 1)
+    except OSError:
+        return None
+
+def _build_files(repo_path, seed):
+    """Outline every tracked file, reusing seed entries whose blob is unchanged"""
+    by_blob = {entry["blob"]: entry for entry in seed.values() if entry.get("blob")}
+    files, missing = {}, []
+    for path, sha in _tracked_blobs(repo_path).items():
+        if sha in by_blob:
+            files[path] = by_blob[sha]
+        elif _is_source(path):
+            missing.append((path, sha))
+        else:
+            files[path] = {"blob": sha, "symbols": [], "imports": [], "runnable": False}
+    
+    partial = _is_partial_clone(repo_path)
+    reader = get_revision_reader(repo_path)
+    for start in range(0, len(missing), READ_BATCH_SIZE):
+        batch = missing[start:start + READ_BATCH_SIZE]
+        if partial:
+            contents = [_read_worktree(repo_path, path) for path, _ in batch]
+        else:
+            contents = reader.read_many([sha for _, sha in batch])
+        for (path, sha), content in zip(batch, contents):
+            files[path] = {"blob": sha, **outline_file(path, content)}
+    return files
+
+def _cache_dir(repo_path):
+    common_dir = _git(repo_path, "rev-parse", "--git-common-dir").decode().strip()
+    common_dir = os.path.normpath(os.path.join(repo_path, common_dir))
+    return os.path.join(REPO_MAP_CACHE_DIR, hashlib.sha1(common_dir.encode()).hexdigest()[:16])
+
+def _load_files(path):
+    try:
+        with open(path) as f:
+            data = json.load(f)
+        if data.get("version") == MAP_FORMAT_VERSION:
+            return data["files"]
+    except (OSError, ValueError, KeyError):
+        pass
+    return None
+
+def _save_files(path, head, files):
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write then rename, so a concurrent reader never sees half a map
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump({"version": MAP_FORMAT_VERSION, "head": head, "files": files}, f)
+        os.replace(temp_path, path)
+    except OSError as e:
+        print(f"Error saving repository map: {str(e)}")
+
+def _load_state(repo_path, head, previous):
+    """The map for a HEAD: from disk, or built incrementally from the previous map"""
+    files, cache_path = None, None
+    if head:
+        cache_dir = _cache_dir(repo_path)
+        cache_path = os.path.join(cache_dir, f"{head}.json")
+        files = _load_files(cache_path)
+    if files is None:
+        seed = previous["files"] if previous else None
+        if seed is None and cache_path:
+            # A new process on a new HEAD still reuses the most recent map of this repository
+            candidates = sorted(glob.glob(os.path.join(cache_dir, "*.json")), key=os.path.getmtime)
+            seed = _load_files(candidates[-1]) if candidates else None
+        files = _build_files(repo_path, seed or {})
+        if cache_path:
+            _save_files(cache_path, head, files)
+    
+    # Files edited in this session are read from the work tree again on top
+    edited = set(previous["edited"]) if previous else set()
+    return {"head": head, "files": files, "edited": set(), "dirty": edited, "version": 0, "rendered": (None, None)}
+
+def _apply_edits(repo_path, state):
+    for path in state["dirty"]:
+        content = _read_worktree(repo_path, path)
+        if content is None:
+            state["files"].pop(path, None)
+        else:
+            state["files"][path] = {"blob": None, **outline_file(path, content)}
+        state["edited"].add(path)
+    state["dirty"].clear()
+    state["version"] += 1
+
+def _stem(name):
+    name = name.replace("\\", "/").rstrip("/")
+    if "/" in name or name.endswith(".py"):
+        name = posixpath.splitext(posixpath.basename(name))[0]
+    else:
+        name = name.rsplit(".", 1)[-1]
+    return name
+
+def rank_files(files):
+    """
+    Order files by importance: entry points, files imported by many others,
+    and files with more top-level symbols come first; deep paths rank lower
+    
+    Args:
+        files (dict): Outline per path
+    
+    Returns:
+        list: (path, score) pairs, most important first
+    """
+    by_stem = {}
+    for path in files:
+        stem = posixpath.splitext(posixpath.basename(path))[0]
+        if stem == "__init__":
+            stem = posixpath.basename(posixpath.dirname(path))
+        by_stem.setdefault(stem, []).append(path)
+    
+    inbound = Counter()
+    for path, entry in files.items():
+        for name in entry["imports"]:
+            candidates = [candidate for candidate in by_stem.get(_stem(name), []) if candidate != path]
+            for candidate in candidates:
+                inbound[candidate] += 1 / len(candidates)
+    
+    scores = []
+    for path, entry in files.items():
+        is_entry = entry["runnable"] or posixpath.basename(path) in ENTRY_POINT_NAMES
+        if not entry["symbols"] and not is_entry:
+            continue
+        score = 2 * inbound[path] + (5 if is_entry else 0) + 0.3 * min(len(entry["symbols"]), 10) - 0.5 * path.count("/")
+        scores.append((path, score))
+    scores.sort(key=lambda item: (-item[1], item[0]))
+    return scores
+
+def _directory_summary(files, limit=10):
+    counts = Counter()
+    for path in files:
+        parts = path.split("/")[:-1]
+        for depth in range(1, min(len(parts), 2) + 1):
+            counts["/".join(parts[:depth]) + "/"] += 1
+    root_files = sum(1 for path in files if "/" not in path)
+    listed = [f"{directory} ({count})" for directory, count in counts.most_common(limit)]
+    if root_files:
+        listed.insert(0, f"./ ({root_files})")
+    if len(counts) > limit:
+        listed.append(f"... {len(counts) - limit} more")
+    return ", ".join(listed)
+
+def render_repo_map(files, budget):
+    """
+    Render the map as compact text within a token budget
+    
+    Args:
+        files (dict): Outline per path
+        budget (int): Maximum tokens
+    
+    Returns:
+        str: Directory summary, entry points and ranked files with their symbols
+    """
+    entry_points = sorted(
+        path for path, entry in files.items()
+        if entry["runnable"] or posixpath.basename(path) in ENTRY_POINT_NAMES
+    )
+    lines = [
+        f"Files: {len(files)}",
+        f"Directories: {_directory_summary(files)}",
+        f"Entry points: {', '.join(entry_points[:10]) or 'none found'}"
+        + (f" (+{len(entry_points) - 10} more)" if len(entry_points) > 10 else ""),
+        "Key files:",
+    ]
+    used = sum(count_tokens(line) + 1 for line in lines)
+    ranked = rank_files(files)
+    shown = 0
+    for path, _ in ranked:
+        symbols = files[path]["symbols"]
+        line = f"{path}: {', '.join(symbols[:10])}" + (", ..." if len(symbols) > 10 else "")
+        if len(line) > 200:
+            line = line[:197] + "..."
+        cost = count_tokens(line) + 1
+        if used + cost > budget:
+            break
+        lines.append(line)
+        used += cost
+        shown += 1
+    if shown < len(ranked):
+        lines.append(f"({len(ranked) - shown} more files with symbols not shown)")
+    return "\n".join(lines)
+
+def get_repo_map(repo_path, budget=None):
+    """
+    Return the repository map, building it once per HEAD
+    
+    The outline of each file is cached on disk per HEAD and keyed by blob, so
+    a new HEAD only re-reads changed files. Files edited through the tools
+    (see note_file_changed) are re-read from the work tree.
+    
+    Args:
+        repo_path (str): Path to the repository
+        budget (int): Maximum tokens (default: the "repo_map" share of the context window)
+    
+    Returns:
+        str: The rendered map
+    """
+    repo_path = os.path.abspath(repo_path)
+    budget = budget or tool_budget("repo_map")
+    with _maps_guard:
+        lock = _locks.setdefault(repo_path, threading.Lock())
+    with lock:
+        head = get_ref_snapshot(repo_path)["head"]
+        state = _maps.get(repo_path)
+        if state is None or state["head"] != head:
+            state = _load_state(repo_path, head, state)
+            _maps[repo_path] = state
+        if state["dirty"]:
+            _apply_edits(repo_path, state)
+        key = (state["version"], budget)
+        if state["rendered"][0] != key:
+            state["rendered"] = (key, render_repo_map(state["files"], budget))
+        return state["rendered"][1]
+
+def note_file_changed(repo_path, file_path):
+    """
+    Mark a file as edited so the next map re-reads it from the work tree
+    
+    Args:
+        repo_path (str): Path to the repository
+        file_path (str): Path of the file (relative to repo root, or absolute)
+    """
+    repo_path = os.path.abspath(repo_path)
+    file_path = str(file_path).strip().strip("\"'")
+    path = os.path.relpath(os.path.join(repo_path, file_path), repo_path).replace(os.sep, "/")
+    if path.startswith("../"):
+        return
+    with _maps_guard:
+        lock = _locks.setdefault(repo_path, threading.Lock())
+    with lock:
+        state = _maps.get(repo_path)
+        if state is not None:
+            state["dirty"].add(path)
+
+def repo_map_section(repo_path):
+    """The repository map as a prompt section, or "" when disabled or unavailable"""
+    if not REPO_MAP_ENABLED:
+        return ""
+    try:
+        return (
+            "Repository map (top-level symbols per file; read a file for details, "
+            "no need to list files to get oriented):\n"
+            f"{get_repo_map(repo_path)}\n\n"
+        )
+    except Exception as e:
+        print(f"Error building repository map: {str(e)}")
+        return ""
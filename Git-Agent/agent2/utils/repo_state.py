@@ -0,0 +1,200 @@
+import os
+import threading
+from collections import deque
+from git import Git, GitCommandError, Repo
+from utils.ref_snapshot import get_git_dir, get_ref_signature, get_ref_snapshot
+
+# Write counters per repository path. This module is imported as
+# ``utils.repo_state`` so every tool and cache sees the same versions.
+_write_counters = {}
+_write_counters_guard = threading.Lock()
+
+# Paths reported by the tools, per repository: pending until the next version
+# bump, then journaled as (write counter, paths), with None for a write that
+# named no paths. Views of the work tree use it to update just those paths.
+PATH_JOURNAL_SIZE = 256
+_pending_paths = {}
+_path_journal = {}
+
+# GitPython Repo objects per (thread, repository), since they are not safe to
+# share, each with the state version it was opened at. Kept in one registry
+# so those of finished threads and removed worktrees can be closed.
+_repo_sessions = {}
+_repo_sessions_guard = threading.Lock()
+
+def bump_repo_version(repo_path):
+    """
+    Record that a tool changed the repository (files, index, stash or refs)
+    
+    Args:
+        repo_path (str): Path to the repository
+    
+    Returns:
+        int: The new write counter
+    """
+    repo_path = os.path.abspath(repo_path)
+    with _write_counters_guard:
+        counter = _write_counters[repo_path] = _write_counters.get(repo_path, 0) + 1
+        journal = _path_journal.setdefault(repo_path, deque(maxlen=PATH_JOURNAL_SIZE))
+        journal.append((counter, _pending_paths.pop(repo_path, None)))
+        return counter
+
+def note_path_changed(repo_path, file_path):
+    """
+    Record a work tree path written by a tool; it is journaled with the next version bump
+    
+    Args:
+        repo_path (str): Path to the repository
+        file_path (str): Path of the file (relative to repo root, or absolute)
+    """
+    repo_path = os.path.abspath(repo_path)
+    file_path = str(file_path).strip().strip("\"'")
+    path = os.path.relpath(os.path.join(repo_path, file_path), repo_path).replace(os.sep, "/")
+    if path.startswith("../"):
+        return
+    with _write_counters_guard:
+        _pending_paths.setdefault(repo_path, set()).add(path)
+
+def get_repo_version(repo_path):
+    """
+    Return a hashable version of the repository state
+    
+    Combines the write counter bumped by mutating tools with the ref signature,
+    so commits, checkouts and fetches done outside the tools (background
+    fast-forward, the commit queue) also change the version. The index is left
+    out because ``git status`` rewrites it to refresh stat data; edits made
+    outside the tools are not seen either.
+    
+    Args:
+        repo_path (str): Path to the repository
+    
+    Returns:
+        tuple: (write counter, ref signature)
+    """
+    repo_path = os.path.abspath(repo_path)
+    with _write_counters_guard:
+        counter = _write_counters.get(repo_path, 0)
+    try:
+        _, ref_signature = get_ref_signature(repo_path)
+    except (GitCommandError, OSError, ValueError):
+        ref_signature = None
+    return (counter, ref_signature)
+
+def get_index_stat(repo_path):
+    """
+    Return (mtime_ns, size) of the repository's index, or None without one
+    
+    Git rewrites the index for add, rm, commit, checkout, reset and stash, so
+    this notices those commands even when they run outside the tools.
+    """
+    try:
+        stat = os.stat(os.path.join(get_git_dir(repo_path), "index"))
+        return (stat.st_mtime_ns, stat.st_size)
+    except (GitCommandError, OSError, ValueError):
+        return None
+
+def get_state_version(repo_path):
+    """
+    Return a hashable version of the repository for caching views of it
+    
+    Like get_repo_version, plus the index stat, so git commands run outside
+    the tools change it too. ``git status`` may refresh the index and change
+    the version without a real change, which only costs a recomputation.
+    
+    Args:
+        repo_path (str): Path to the repository
+    
+    Returns:
+        tuple: (write counter, ref signature, index stat)
+    """
+    return get_repo_version(repo_path) + (get_index_stat(repo_path),)
+
+def get_repo_session(repo_path):
+    """
+    Return a GitPython Repo for this thread, reused until the repository changes
+    
+    A Repo keeps its ``git cat-file`` processes between calls, so reading
+    commits and objects through a reused one skips a process start per call.
+    It is replaced (and its processes stopped) when get_state_version changes,
+    and closed once its thread has finished.
+    
+    Args:
+        repo_path (str): Path to the repository
+    
+    Returns:
+        git.Repo: The repository
+    """
+    repo_path = os.path.abspath(repo_path)
+    key = (threading.current_thread(), repo_path)
+    version = get_state_version(repo_path)
+    with _repo_sessions_guard:
+        # Streamlit runs each script run on a new thread; drop the finished ones
+        closing = [_repo_sessions.pop(stale)[1] for stale in
+                   [other for other in _repo_sessions if not other[0].is_alive()]]
+        cached = _repo_sessions.get(key)
+        repo = cached[1] if cached is not None and cached[0] == version else None
+        if cached is not None and repo is None:
+            closing.append(_repo_sessions.pop(key)[1])
+    for stale_repo in closing:
+        stale_repo.close()
+    if repo is None:
+        repo = Repo(repo_path)
+        with _repo_sessions_guard:
+            _repo_sessions[key] = (version, repo)
+    return repo
+
+def close_repo_session(repo_path):
+    """Close every thread's Repo for a repository, e.g. before its worktree is removed"""
+    repo_path = os.path.abspath(repo_path)
+    with _repo_sessions_guard:
+        closing = [_repo_sessions.pop(key)[1] for key in list(_repo_sessions) if key[1] == repo_path]
+    for repo in closing:
+        repo.close()
+
+def get_changed_paths(repo_path, since=None):
+    """
+    Work tree paths that may have changed since an earlier call
+    
+    Combines the paths the tools journaled since then with the files that
+    differ between the two HEAD commits, so commits, fast-forwards and
+    checkouts are covered too. An index that changed while HEAD did not
+    means git ran outside the tools (rm, restore, stash), which asks for a
+    rescan. Files edited outside the tools and git are not seen.
+    
+    Args:
+        repo_path (str): Path to the repository
+        since (tuple): Version returned by an earlier call (None: unknown)
+    
+    Returns:
+        tuple: (version, paths) where paths is a set of paths relative to the
+            repo root, or None when the changes cannot be named (a write that
+            reported no paths, an overflowed journal) and a full rescan is needed
+    """
+    repo_path = os.path.abspath(repo_path)
+    try:
+        head = get_ref_snapshot(repo_path)["head"]
+    except (GitCommandError, OSError, ValueError):
+        head = None
+    index = get_index_stat(repo_path)
+    with _write_counters_guard:
+        counter = _write_counters.get(repo_path, 0)
+        version = (counter, head, index)
+        if since is None:
+            return version, None
+        since_counter, since_head, since_index = since
+        entries = [paths for number, paths in _path_journal.get(repo_path, ()) if number > since_counter]
+    
+    if len(entries) != counter - since_counter or any(paths is None for paths in entries):
+        return version, None
+    changed = set().union(*entries)
+    if head == since_head and index != since_index:
+        return version, None
+    if head != since_head:
+        if head is None or since_head is None:
+            return version, None
+        try:
+            output = Git(repo_path).diff("--name-only", "-z", since_head, head)
+        except GitCommandError:
+            return version, None
+        changed.update(path for path in output.split("\0") if path)
+    return version, changed
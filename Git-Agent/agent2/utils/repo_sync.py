@@ -0,0 +1,161 @@
+import time
+import threading
+import importlib.util
+import pathlib
+from git import Repo, GitCommandError
+
+# Dynamic import for config
+config_path = pathlib.Path(__file__).parent.parent / "config.py"
+spec = importlib.util.spec_from_file_location("config", config_path)
+config = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(config)
+
+FETCH_TTL_SECONDS = config.FETCH_TTL_SECONDS
+
+# Dynamic import for git_operations
+git_ops_path = pathlib.Path(__file__).parent / "git_operations.py"
+git_ops_spec = importlib.util.spec_from_file_location("git_operations", git_ops_path)
+git_operations = importlib.util.module_from_spec(git_ops_spec)
+git_ops_spec.loader.exec_module(git_operations)
+
+credential_env = git_operations.credential_env
+
+# Fetch state per repository path. This module is imported as ``utils.repo_sync``
+# so the state survives Streamlit reruns.
+_fetch_state = {}
+_fetch_state_guard = threading.Lock()
+
+def fetch_origin(repo_path, repo_url=None):
+    """
+    Fetch origin without touching HEAD, the index or the working tree
+    
+    Only refs/remotes and the object store change, so this is safe to run on a
+    background thread while an agent turn edits or commits in the checkout.
+    
+    Args:
+        repo_path (str): Path to the repository
+        repo_url (str): Authenticated remote URL whose credentials are used
+            for the fetch (the remote itself keeps the plain URL)
+        
+    Returns:
+        str: Result message
+    """
+    repo = Repo(repo_path)
+    env = credential_env(repo_url)[1] if repo_url else {}
+    with repo.git.custom_environment(**env):
+        repo.git.fetch("--prune", "origin")
+    return "Fetched origin"
+
+def fast_forward(repo_path):
+    """
+    Fast-forward the current branch to its upstream if it is behind and clean
+    
+    Moves HEAD and the working tree, so it runs between agent turns (see
+    sync_for_turn), never alongside one.
+    
+    Args:
+        repo_path (str): Path to the repository
+        
+    Returns:
+        str: Result message
+    """
+    repo = Repo(repo_path)
+    if repo.head.is_detached:
+        return "Detached HEAD, nothing to fast-forward"
+    
+    branch = repo.active_branch
+    tracking = branch.tracking_branch()
+    if tracking is None or not tracking.is_valid():
+        return f"Branch {branch.name} has no upstream"
+    
+    head_commit = repo.head.commit
+    upstream_commit = tracking.commit
+    if head_commit == upstream_commit or not repo.is_ancestor(head_commit, upstream_commit):
+        return f"Branch {branch.name} is up to date with {tracking.name}"
+    
+    if repo.is_dirty(untracked_files=False):
+        return f"New commits on {tracking.name}; not fast-forwarding because the working tree has changes"
+    
+    repo.git.merge("--ff-only", tracking.name)
+    return f"Fast-forwarded {branch.name} to {upstream_commit.hexsha[:7]}"
+
+def _run_fetch(repo_path, repo_url):
+    state = _fetch_state[repo_path]
+    try:
+        message = fetch_origin(repo_path, repo_url)
+        state["last_fetch"] = time.time()
+        state["status"] = "done"
+    except GitCommandError as e:
+        message = f"Git error: {e}"
+        state["status"] = "failed"
+    except Exception as e:
+        message = f"Error fetching repository: {str(e)}"
+        state["status"] = "failed"
+    state["message"] = message
+    print(f"Background fetch for {repo_path}: {message}")
+
+def schedule_fetch(repo_path, ttl=FETCH_TTL_SECONDS, force=False, repo_url=None):
+    """
+    Fetch the repository on a background thread unless a recent fetch is still fresh
+    
+    Args:
+        repo_path (str): Path to the repository
+        ttl (int): Seconds a successful fetch stays fresh
+        force (bool): Fetch even if the last fetch is still fresh
+        repo_url (str): Authenticated remote URL to take credentials from
+        
+    Returns:
+        str: What was scheduled
+    """
+    with _fetch_state_guard:
+        state = _fetch_state.setdefault(
+            repo_path, {"status": "idle", "last_fetch": None, "message": "", "thread": None}
+        )
+        if state["status"] == "running":
+            return "Fetch already in progress"
+        age = time.time() - state["last_fetch"] if state["last_fetch"] else None
+        if not force and age is not None and age < ttl:
+            return f"Last fetch {int(age)}s ago, still fresh"
+        
+        state["status"] = "running"
+        state["thread"] = threading.Thread(target=_run_fetch, args=(repo_path, repo_url), daemon=True)
+        state["thread"].start()
+    return "Fetching latest changes in the background"
+
+def get_fetch_status(repo_path):
+    """Return the background fetch status for a repository"""
+    state = _fetch_state.get(repo_path)
+    if not state:
+        return {"status": "idle", "last_fetch": None, "message": ""}
+    return {key: state[key] for key in ("status", "last_fetch", "message")}
+
+def sync_for_turn(repo_path, repo_url=None, ttl=FETCH_TTL_SECONDS):
+    """
+    Bring a checkout up to date at the start of an agent turn
+    
+    Applies what the last background fetch brought in (fast-forward only,
+    while nothing else is working in the checkout) and schedules the next
+    fetch once the last one is older than ttl. Pooled agents live across many
+    turns, so this runs on every turn rather than when an agent is built.
+    
+    Args:
+        repo_path (str): Path to the repository
+        repo_url (str): Authenticated remote URL to take credentials from
+        ttl (int): Seconds a successful fetch stays fresh
+        
+    Returns:
+        str: What was done
+    """
+    state = _fetch_state.get(repo_path)
+    forward_status = ""
+    if state is not None and state["status"] == "done":
+        try:
+            forward_status = fast_forward(repo_path)
+        except GitCommandError as e:
+            forward_status = f"Git error: {e}"
+        except Exception as e:
+            forward_status = f"Error fast-forwarding repository: {str(e)}"
+        state["message"] = forward_status
+        print(f"Turn start for {repo_path}: {forward_status}")
+    fetch_status = schedule_fetch(repo_path, ttl, repo_url=repo_url)
+    return f"{forward_status}. {fetch_status}" if forward_status else fetch_status
@@ -0,0 +1,222 @@
+import os
+import atexit
+import subprocess
+import threading
+import importlib.util
+import pathlib
+from collections import OrderedDict
+
+# Dynamic import for config
+config_path = pathlib.Path(__file__).parent.parent / "config.py"
+spec = importlib.util.spec_from_file_location("config", config_path)
+config = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(config)
+
+MAX_FILE_SIZE = config.MAX_FILE_SIZE
+REVISION_CACHE_BYTES = config.REVISION_CACHE_BYTES
+
+class RevisionReader:
+    """
+    Reads blobs at any revision through long-lived ``git cat-file`` processes
+    
+    One ``--batch-check`` process resolves ``<rev>:<path>`` to blob SHAs and one
+    ``--batch`` process returns contents. Requests are pipelined: all of them
+    are written before the responses are read. Contents are cached by blob SHA,
+    so the same file on several branches is read once.
+    """
+    
+    def __init__(self, repo_path, cache_bytes=REVISION_CACHE_BYTES):
+        self.repo_path = repo_path
+        self.cache_bytes = cache_bytes
+        self._cache = OrderedDict()
+        self._cached_bytes = 0
+        self._lock = threading.Lock()
+        self._check = None
+        self._batch = None
+        self.hits = 0
+        self.misses = 0
+    
+    def _start(self, mode):
+        return subprocess.Popen(
+            ["git", "cat-file", mode],
+            cwd=self.repo_path,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL
+        )
+    
+    def _ensure_processes(self):
+        if self._check is None or self._check.poll() is not None:
+            self._check = self._start("--batch-check")
+        if self._batch is None or self._batch.poll() is not None:
+            self._batch = self._start("--batch")
+    
+    @staticmethod
+    def _pipeline(process, requests):
+        """Write all requests on a thread so large batches can't deadlock on full pipes"""
+        payload = b"".join(request.encode() + b"\n" for request in requests)
+        
+        def write():
+            process.stdin.write(payload)
+            process.stdin.flush()
+        
+        writer = threading.Thread(target=write, daemon=True)
+        writer.start()
+        return writer
+    
+    @staticmethod
+    def _parse_header(line):
+        """Parse "<sha> <type> <size>"; None for "<spec> missing" or "<spec> ambiguous" """
+        header = line.decode(errors="replace").rstrip("\n")
+        # Parsed from the right, since the echoed spec may contain spaces
+        if header.endswith((" missing", " ambiguous")):
+            return None
+        sha, object_type, size = header.rsplit(" ", 2)
+        return (sha, object_type, int(size))
+    
+    def resolve(self, specs):
+        """Resolve object names (e.g. ``main:app.py``) to (sha, type, size) or None"""
+        writer = self._pipeline(self._check, specs)
+        results = [self._parse_header(self._check.stdout.readline()) for _ in specs]
+        writer.join()
+        return results
+    
+    def _fetch_blobs(self, shas):
+        writer = self._pipeline(self._batch, shas)
+        blobs = {}
+        for _ in shas:
+            sha, _, size = self._parse_header(self._batch.stdout.readline())
+            content = self._batch.stdout.read(size)
+            self._batch.stdout.read(1)  # trailing newline
+            blobs[sha] = content
+        writer.join()
+        return blobs
+    
+    def _remember(self, sha, content):
+        if len(content) > self.cache_bytes:
+            return
+        self._cache[sha] = content
+        self._cached_bytes += len(content)
+        while self._cached_bytes > self.cache_bytes:
+            _, evicted = self._cache.popitem(last=False)
+            self._cached_bytes -= len(evicted)
+    
+    def read_many(self, specs):
+        """
+        Read several ``<rev>:<path>`` objects in one round trip
+        
+        Args:
+            specs (list): Object names such as ``feature:src/app.py``
+        
+        Returns:
+            list: Blob contents as bytes, or None where the object doesn't exist
+        """
+        with self._lock:
+            self._ensure_processes()
+            # One request per line: a newline in a spec would shift every later answer
+            valid = [spec for spec in specs if "\n" not in spec]
+            try:
+                resolved = dict(zip(valid, self.resolve(valid))) if valid else {}
+                infos = [resolved.get(spec) for spec in specs]
+                return self._read_blobs(infos)
+            except Exception:
+                # The pipes may be out of step with the requests; start over next time
+                self._kill()
+                raise
+    
+    def _read_blobs(self, infos):
+        """Blob contents for resolved infos, from the cache or the --batch process"""
+        missing = []
+        for info in infos:
+            if info and info[1] == "blob":
+                if info[0] in self._cache:
+                    self._cache.move_to_end(info[0])
+                    self.hits += 1
+                elif info[0] not in missing:
+                    missing.append(info[0])
+                    self.misses += 1
+        
+        fetched = self._fetch_blobs(missing) if missing else {}
+        for sha, content in fetched.items():
+            self._remember(sha, content)
+        
+        return [
+            fetched.get(info[0], self._cache.get(info[0])) if info and info[1] == "blob" else None
+            for info in infos
+        ]
+    
+    def _kill(self):
+        for process in (self._check, self._batch):
+            if process and process.poll() is None:
+                process.kill()
+                process.wait()
+        self._check = None
+        self._batch = None
+    
+    def close(self):
+        for process in (self._check, self._batch):
+            if process and process.poll() is None:
+                process.stdin.close()
+                process.wait()
+
+# Readers per repository path, closed when the process exits
+_readers = {}
+_readers_guard = threading.Lock()
+
+def get_revision_reader(repo_path):
+    """Return the session's cat-file reader for a repository"""
+    key = os.path.abspath(repo_path)
+    with _readers_guard:
+        if key not in _readers:
+            _readers[key] = RevisionReader(key)
+        return _readers[key]
+
+def discard_revision_reader(repo_path):
+    """Stop and drop a repository's reader (e.g. when its worktree is removed)"""
+    with _readers_guard:
+        reader = _readers.pop(os.path.abspath(repo_path), None)
+    if reader is not None:
+        reader.close()
+
+@atexit.register
+def _close_readers():
+    for reader in _readers.values():
+        reader.close()
+
+def read_file_at_revision(file_path, revisions, repo_path):
+    """
+    Read a file as of one or more revisions without checking them out
+    
+    Args:
+        file_path (str): Path of the file (relative to repo root)
+        revisions (list): Branches, tags or commits to read the file from
+        repo_path (str): Path to the repository
+    
+    Returns:
+        str: The file content for each revision
+    """
+    try:
+        file_path = file_path.strip()
+        if file_path.startswith("./"):
+            file_path = file_path[2:]
+        reader = get_revision_reader(repo_path)
+        contents = reader.read_many([f"{revision}:{file_path}" for revision in revisions])
+        
+        sections = []
+        for revision, content in zip(revisions, contents):
+            if content is None:
+                text = f"File {file_path} does not exist at {revision}."
+            elif b"\0" in content[:8000]:
+                text = f"File {file_path} is binary ({len(content)} bytes)."
+            elif len(content) > MAX_FILE_SIZE:
+                preview_size = min(5000, len(content) // 10)
+                text = (f"File {file_path} is too large ({len(content)} bytes) to process in full. "
+                        f"Here's a preview of the first {preview_size} characters:\n\n"
+                        f"{content[:preview_size].decode(errors='replace')}\n\n...")
+            else:
+                text = content.decode(errors="replace")
+            sections.append(text if len(revisions) == 1 else f"=== {revision}:{file_path} ===\n{text}")
+        
+        return "\n\n".join(sections)
+    except Exception as e:
+        return f"Error reading file at revision: {str(e)}"
@@ -0,0 +1,204 @@
+import os
+import json
+import time
+import threading
+from datetime import datetime, timezone
+from langchain_core.callbacks import BaseCallbackHandler
+from utils.ref_snapshot import get_ref_snapshot
+
+RECORDING_VERSION = 1
+
+def _jsonable(value):
+    """Tool inputs may be dicts with lazily decoded values; keep what JSON can hold"""
+    if isinstance(value, dict):
+        return {key: _jsonable(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(item) for item in value]
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
+
+def _reply_from_generation(generation):
+    """A reply in the format LocalFakeLLM / LocalFakeChatModel play back"""
+    message = getattr(generation, "message", None)
+    if message is None:
+        return generation.text
+    return {"content": message.content, "additional_kwargs": _jsonable(message.additional_kwargs)}
+
+class SessionRecorder(BaseCallbackHandler):
+    """
+    Records a chat session's LLM replies and tool calls, turn by turn
+    
+    Attach as a callback to every agent run of the session and save() after
+    each turn. benchmarks/bench_replay.py plays the replies back through the
+    local fake models while running the real tools against a fixture repo.
+    
+    Completion models answered from the LLM cache report no callbacks, so in
+    "react" mode a step without a recorded reply falls back to the agent's
+    action log, which is the model's full text.
+    """
+    def __init__(self, repo_path, mode="react", path=None):
+        self.repo_path = repo_path
+        self.mode = mode
+        self.path = path
+        self.turns = []
+        self.lock = threading.Lock()
+        self.started_at = datetime.now(timezone.utc).isoformat()
+        self.repo = self._repo_info(repo_path)
+        self._turn = None
+        self._turn_run_id = None
+        self._turn_start = None
+        self._tool_calls = {}
+        self._step_has_reply = False
+    
+    @staticmethod
+    def _repo_info(repo_path):
+        info = {"path": os.path.abspath(repo_path), "head": None, "branch": None}
+        try:
+            if os.path.exists(os.path.join(repo_path, ".git")):
+                snapshot = get_ref_snapshot(repo_path)
+                info["head"] = snapshot["head"]
+                info["branch"] = snapshot["current_branch"]
+        except Exception as e:
+            print(f"Error reading repository state for the recording: {str(e)}")
+        return info
+    
+    def _add_reply(self, reply):
+        with self.lock:
+            if self._turn is not None:
+                self._turn["llm"].append(reply)
+                self._step_has_reply = True
+    
+    def on_chain_start(self, serialized, inputs, run_id=None, parent_run_id=None, **kwargs):
+        if parent_run_id is not None or self._turn is not None:
+            return
+        with self.lock:
+            self._turn_run_id = run_id
+            self._turn_start = time.perf_counter()
+            self._step_has_reply = False
+            self._turn = {
+                "input": _jsonable(inputs.get("input") if isinstance(inputs, dict) else inputs),
+                "output": None,
+                "error": None,
+                "wall_ms": None,
+                "llm": [],
+                "tools": [],
+            }
+    
+    def _end_turn(self, output=None, error=None):
+        with self.lock:
+            turn, self._turn = self._turn, None
+            if turn is None:
+                return
+            turn["output"] = output
+            turn["error"] = error
+            turn["wall_ms"] = round((time.perf_counter() - self._turn_start) * 1000, 3)
+            self.turns.append(turn)
+            self._tool_calls.clear()
+    
+    def on_chain_end(self, outputs, run_id=None, **kwargs):
+        if run_id == self._turn_run_id:
+            self._end_turn(output=_jsonable(outputs.get("output") if isinstance(outputs, dict) else outputs))
+    
+    def on_chain_error(self, error, run_id=None, **kwargs):
+        if run_id == self._turn_run_id:
+            self._end_turn(error=str(error))
+    
+    def on_llm_end(self, response, run_id=None, **kwargs):
+        for generations in response.generations:
+            for generation in generations[:1]:
+                self._add_reply(_reply_from_generation(generation))
+    
+    def _on_agent_step(self, log):
+        if self.mode != "react":
+            return
+        with self.lock:
+            if self._turn is not None and not self._step_has_reply:
+                self._turn["llm"].append(log)
+            self._step_has_reply = False
+    
+    def on_agent_action(self, action, run_id=None, **kwargs):
+        self._on_agent_step(action.log)
+    
+    def on_agent_finish(self, finish, run_id=None, **kwargs):
+        self._on_agent_step(finish.log)
+    
+    def on_tool_start(self, serialized, input_str, run_id=None, parent_run_id=None, inputs=None, **kwargs):
+        call = {
+            "name": (serialized or {}).get("name", "tool"),
+            "input": _jsonable(inputs if inputs is not None else input_str),
+            "output": None,
+            "error": None,
+            "wall_ms": None,
+        }
+        with self.lock:
+            if self._turn is None:
+                return
+            self._turn["tools"].append(call)
+            self._tool_calls[run_id] = (call, time.perf_counter())
+    
+    def _end_tool(self, run_id, output=None, error=None):
+        with self.lock:
+            entry = self._tool_calls.pop(run_id, None)
+            if entry is None:
+                return
+            call, start = entry
+            call["output"] = output
+            call["error"] = error
+            call["wall_ms"] = round((time.perf_counter() - start) * 1000, 3)
+    
+    def on_tool_end(self, output, run_id=None, **kwargs):
+        self._end_tool(run_id, output=_jsonable(output))
+    
+    def on_tool_error(self, error, run_id=None, **kwargs):
+        self._end_tool(run_id, error=str(error))
+    
+    def to_dict(self):
+        with self.lock:
+            return {
+                "version": RECORDING_VERSION,
+                "mode": self.mode,
+                "started_at": self.started_at,
+                "repo": dict(self.repo),
+                "turns": list(self.turns),
+            }
+    
+    def save(self, path=None):
+        """
+        Write the recording as JSON
+        
+        Args:
+            path (str): Output file; defaults to the path given at construction
+        
+        Returns:
+            str: Path written, or an error message
+        """
+        path = path or self.path
+        try:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            # Write then rename, so a crash never leaves half a recording behind
+            temp_path = f"{path}.tmp"
+            with open(temp_path, "w") as f:
+                json.dump(self.to_dict(), f, indent=1)
+            os.replace(temp_path, path)
+            return path
+        except Exception as e:
+            return f"Error saving session recording: {str(e)}"
+
+def load_recording(path):
+    """
+    Load a recording written by SessionRecorder.save
+    
+    Args:
+        path (str): Recording file
+    
+    Returns:
+        dict: version, mode, started_at, repo (path, head, branch) and turns
+    """
+    with open(path) as f:
+        recording = json.load(f)
+    if recording.get("version") != RECORDING_VERSION:
+        raise ValueError(f"Unsupported recording version: {recording.get('version')}")
+    return recording
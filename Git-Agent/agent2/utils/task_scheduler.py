@@ -0,0 +1,152 @@
+import os
+import uuid
+import shutil
+import threading
+import importlib.util
+import pathlib
+from concurrent.futures import ThreadPoolExecutor, wait
+from git import Git, GitCommandError
+from utils.commit_queue import discard_commit_queue
+from utils.revision_reader import discard_revision_reader
+from utils.ref_snapshot import forget_repository
+from utils.repo_state import close_repo_session
+
+# Dynamic import for config
+config_path = pathlib.Path(__file__).parent.parent / "config.py"
+spec = importlib.util.spec_from_file_location("config", config_path)
+config = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(config)
+
+TASK_MAX_WORKERS = config.TASK_MAX_WORKERS
+TASK_WORKTREE_ROOT = config.TASK_WORKTREE_ROOT
+
+class WorktreeTaskScheduler:
+    """
+    Runs agent tasks concurrently on one repository, each in its own worktree
+    
+    Every task gets a fresh branch (``agent/task-<id>``) checked out in a git
+    worktree that shares the repository's object store, so tasks never touch
+    each other's working tree or index. Worktrees are removed when a task
+    finishes; its branch is kept only if the task committed something.
+    
+    Example:
+        scheduler = WorktreeTaskScheduler(repo_path)
+        task_id = scheduler.submit(lambda path, branch: run_agent_in(path))
+        scheduler.wait()
+        print(scheduler.status(task_id))
+    """
+    
+    def __init__(self, repo_path, max_workers=TASK_MAX_WORKERS, worktree_root=TASK_WORKTREE_ROOT):
+        self.repo_path = os.path.abspath(repo_path)
+        self.worktree_root = worktree_root or f"{self.repo_path}.worktrees"
+        self._git = Git(self.repo_path)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="agent-task")
+        # git worktree add/remove rewrite shared metadata; serialize them
+        self._worktree_lock = threading.Lock()
+        self._tasks = {}
+        self._futures = {}
+    
+    def submit(self, task_fn, base="HEAD", keep_worktree=False):
+        """
+        Create a worktree for a task and run it on the pool
+        
+        Args:
+            task_fn (callable): Called as task_fn(worktree_path, branch)
+            base (str): Revision the task branch starts from
+            keep_worktree (bool): Leave the worktree on disk after the task ends
+        
+        Returns:
+            str: Task id
+        """
+        task_id = uuid.uuid4().hex[:8]
+        branch = f"agent/task-{task_id}"
+        worktree_path = os.path.join(self.worktree_root, task_id)
+        
+        with self._worktree_lock:
+            base_sha = self._git.rev_parse(base)
+            os.makedirs(self.worktree_root, exist_ok=True)
+            self._git.worktree("add", "-b", branch, worktree_path, base_sha)
+        
+        self._tasks[task_id] = {
+            "status": "queued",
+            "branch": branch,
+            "worktree_path": worktree_path,
+            "base": base_sha,
+            "keep_worktree": keep_worktree,
+            "result": None,
+            "error": None
+        }
+        self._futures[task_id] = self._executor.submit(self._run, task_id, task_fn)
+        return task_id
+    
+    def _run(self, task_id, task_fn):
+        task = self._tasks[task_id]
+        task["status"] = "running"
+        try:
+            task["result"] = task_fn(task["worktree_path"], task["branch"])
+            task["status"] = "completed"
+        except Exception as e:
+            task["error"] = str(e)
+            task["status"] = "failed"
+        finally:
+            self._cleanup(task)
+        return task["result"]
+    
+    def _cleanup(self, task):
+        # Stop the worktree's commit queue, cat-file readers and cached state
+        # (this runs on the task's thread, which owns its Repo session)
+        worktree_path = task["worktree_path"]
+        if not task["keep_worktree"]:
+            discard_commit_queue(worktree_path)
+            discard_revision_reader(worktree_path)
+            close_repo_session(worktree_path)
+            forget_repository(worktree_path)
+        with self._worktree_lock:
+            try:
+                commits = int(self._git.rev_list("--count", f"{task['base']}..{task['branch']}"))
+                if not task["keep_worktree"]:
+                    self._git.worktree("remove", "--force", task["worktree_path"])
+                    # Nothing committed: the branch carries no work worth keeping
+                    if commits == 0:
+                        self._git.branch("-D", task["branch"])
+                task["commits"] = commits
+            except GitCommandError as e:
+                print(f"Error cleaning up task worktree {task['worktree_path']}: {e}")
+    
+    def wait(self, task_ids=None, timeout=None):
+        """Block until the given tasks (default: all) have finished"""
+        ids = task_ids or list(self._futures)
+        wait([self._futures[task_id] for task_id in ids], timeout=timeout)
+        return {task_id: self.status(task_id) for task_id in ids}
+    
+    def status(self, task_id):
+        """Return a copy of a task's status, branch, result and error"""
+        return dict(self._tasks[task_id])
+    
+    def gc(self):
+        """
+        Remove worktrees left behind by crashed or kept tasks that have finished
+        
+        Returns:
+            list: Paths that were removed
+        """
+        removed = []
+        with self._worktree_lock:
+            active = {t["worktree_path"] for t in self._tasks.values() if t["status"] in ("queued", "running")}
+            if os.path.isdir(self.worktree_root):
+                for name in os.listdir(self.worktree_root):
+                    path = os.path.join(self.worktree_root, name)
+                    if path in active:
+                        continue
+                    try:
+                        self._git.worktree("remove", "--force", path)
+                    except GitCommandError:
+                        shutil.rmtree(path, ignore_errors=True)
+                    removed.append(path)
+            self._git.worktree("prune")
+        return removed
+    
+    def shutdown(self, wait_for_tasks=True):
+        """Stop accepting tasks and garbage-collect finished worktrees"""
+        self._executor.shutdown(wait=wait_for_tasks)
+        self.gc()
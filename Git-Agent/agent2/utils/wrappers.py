@@ -1,7 +1,13 @@
-import re
 import importlib.util
 import pathlib
 from utils.dev_operations import *
+from utils.commit_queue import get_commit_queue, get_commit_queue_status
+from utils.revision_reader import read_file_at_revision
+from utils.input_parser import parse_tool_input, QuotedValue
+from utils.tracing import traced
+from utils.repo_map import note_file_changed
+from utils.repo_state import note_path_changed
+from utils.output_budget import page_lines, tool_budget
 
 
 # Dynamic import for config
@@ -29,100 +35,49 @@ create_file = file_operations.create_file
 delete_file = file_operations.delete_file
 list_files = file_operations.list_files
 read_file = file_operations.read_file
+read_file_lines = file_operations.read_file_lines
 commit_and_push = git_operations.commit_and_push
+update_sparse_checkout = git_operations.update_sparse_checkout
 
-def find_closing_quote(s, start_idx, quote_char):
-    """Helper to find the closing quote, handling escaped quotes"""
-    i = start_idx
-    while i < len(s):
-        if s[i] == quote_char and (i == start_idx or s[i-1] != '\\'):
-            return i
-        i += 1
-    return -1
+def preview_input(inputs):
+    """Short repr of a tool input for logging, without copying a large payload"""
+    if isinstance(inputs, str):
+        return repr(inputs[:MAX_CONTENT_DISPLAY])
+    return repr(inputs)[:MAX_CONTENT_DISPLAY]
 
+@traced
 def modify_code_wrapper(inputs, repo_path):
     """Wrapper for create_file - simplified and robust parsing"""
-    print(f"ModifyCode received: {repr(inputs)[:MAX_CONTENT_DISPLAY]}")
+    print(f"ModifyCode received: {preview_input(inputs)}")
     
-    file_path = None
-    new_content = None
-    
-    # Handle dictionary input
-    if not isinstance(inputs, str):
-        file_path = inputs.get('file_path')
-        new_content = inputs.get('new_content')
-    else:
-        # Extract file_path from inputs string
-        file_path_match = re.search(r'file_path\s*=\s*[\'\"]([^\'\"]+)[\'\"]', inputs)
-        if file_path_match:
-            file_path = file_path_match.group(1)
-            print(f"Extracted file_path: {file_path}")
-        
-        # Extract new_content using custom logic to handle quoted strings
-        if "new_content =" in inputs:
-            start_idx = inputs.find("new_content =") + len("new_content =")
-            content_part = inputs[start_idx:].strip()
-            
-            if content_part.startswith('"'):
-                # Find the closing double quote
-                end_idx = find_closing_quote(content_part, 1, '"')
-                if end_idx > 0:
-                    new_content = content_part[1:end_idx]
-            elif content_part.startswith("'"):
-                # Find the closing single quote
-                end_idx = find_closing_quote(content_part, 1, "'")
-                if end_idx > 0:
-                    new_content = content_part[1:end_idx]
-            
-            # If we found content, handle escape sequences
-            if new_content:
-                new_content = new_content.replace('\\n', '\n').replace('\\t', '\t')
-                print(f"Extracted new_content: {new_content[:50]}... (length: {len(new_content)})")
+    # new_content stays a span of the raw input and is unescaped while it is written
+    params = parse_tool_input(inputs, lazy=('new_content',))
+    file_path = params.get('file_path')
+    new_content = params.get('new_content')
+    if isinstance(new_content, QuotedValue) and new_content:
+        print(f"Extracted file_path: {file_path}")
+        print(f"Extracted new_content: {new_content.head(50)}... (raw length: {new_content.raw_length})")
     
     # Validate parameters
     if not file_path:
         return "Error: Missing file_path parameter."
     if not new_content:
-        # Try a last resort approach to capture content
-        if isinstance(inputs, str) and "new_content =" in inputs:
-            parts = inputs.split("new_content =")
-            if len(parts) == 2:
-                content_str = parts[1].strip()
-                if content_str:
-                    # Take everything as content
-                    new_content = content_str
-                    # Remove trailing quotes or commas if present
-                    while new_content and new_content[-1] in ['"', "'", ',']: 
-                        new_content = new_content[:-1]
-                    print(f"Last resort extracted content: {new_content[:50]}... (length: {len(new_content)})")
-        
-        # If still no content, return error
-        if not new_content:            
-            return "Error: Missing or invalid new_content parameter."
+        return "Error: Missing or invalid new_content parameter."
     
     # Call the function
-    return create_file(file_path, new_content, repo_path)
+    result = create_file(file_path, new_content, repo_path)
+    if not result.startswith("Error"):
+        note_file_changed(repo_path, file_path)
+        note_path_changed(repo_path, file_path)
+    return result
 
+@traced
 def delete_file_wrapper(inputs, repo_path):
     """Wrapper for delete_file - simplified parsing"""
-    print(f"DeleteFile received: {repr(inputs)[:MAX_CONTENT_DISPLAY]}")
+    print(f"DeleteFile received: {preview_input(inputs)}")
     
-    file_path = None
-    
-    # Handle dictionary input
-    if not isinstance(inputs, str):
-        file_path = inputs.get('file_path')
-    else:
-        # Try parameter format
-        file_path_match = re.search(r'file_path\s*=\s*[\'\"]([^\'\"]+)[\'\"]', inputs)
-        if file_path_match:
-            file_path = file_path_match.group(1)
-        else:
-            # Try direct format (just the path)
-            file_path = inputs.strip()
-            if (file_path.startswith('"') and file_path.endswith('"')) or \
-               (file_path.startswith("'") and file_path.endswith("'")):
-                file_path = file_path[1:-1]
+    params = parse_tool_input(inputs, positional='file_path')
+    file_path = params.get('file_path')
     
     # Validate parameters
     if not file_path:
@@ -131,100 +86,87 @@ def delete_file_wrapper(inputs, repo_path):
     print(f"Extracted file_path: {file_path}")
     
     # Call the function
-    return delete_file(file_path, repo_path)
+    result = delete_file(file_path, repo_path)
+    if not result.startswith("Error"):
+        note_file_changed(repo_path, file_path)
+        note_path_changed(repo_path, file_path)
+    return result
 
+@traced
 def list_files_wrapper(inputs, repo_path):
     """Wrapper for list_files - simplified parsing"""
-    print(f"ListFiles received: {repr(inputs)[:MAX_CONTENT_DISPLAY]}")
+    print(f"ListFiles received: {preview_input(inputs)}")
     
-    directory_path = ""
-    
-    # Handle dictionary or None input
-    if not isinstance(inputs, str):
-        directory_path = inputs.get('directory_path', "") if inputs else ""
-    else:
-        # Try parameter format
-        dir_path_match = re.search(r'directory_path\s*=\s*[\'\"]([^\'\"]+)[\'\"]', inputs)
-        if dir_path_match:
-            directory_path = dir_path_match.group(1)
-        elif inputs.strip():
-            # Try direct format (just the path)
-            directory_path = inputs.strip()
-            if (directory_path.startswith('"') and directory_path.endswith('"')) or \
-               (directory_path.startswith("'") and directory_path.endswith("'")):
-                directory_path = directory_path[1:-1]
+    params = parse_tool_input(inputs, positional='directory_path')
+    directory_path = params.get('directory_path', "")
     
     print(f"Extracted directory_path: {directory_path}")
     
     # Call the function
     return list_files(repo_path, directory_path)
 
+@traced
 def read_file_wrapper(inputs, repo_path):
     """Wrapper for read_file - simplified parsing"""
-    print(f"ReadFile received: {repr(inputs)[:MAX_CONTENT_DISPLAY]}")
+    print(f"ReadFile received: {preview_input(inputs)}")
     
-    file_path = None
+    params = parse_tool_input(inputs, positional='file_path', known=('offset', 'limit'))
+    file_path = params.get('file_path')
     
-    # Handle dictionary input
-    if not isinstance(inputs, str):
-        file_path = inputs.get('file_path')
-    else:
-        # Try parameter format
-        file_path_match = re.search(r'file_path\s*=\s*[\'\"]([^\'\"]+)[\'\"]', inputs)
-        if file_path_match:
-            file_path = file_path_match.group(1)
-        else:
-            # Try direct format (just the path)
-            file_path = inputs.strip()
-            if (file_path.startswith('"') and file_path.endswith('"')) or \
-               (file_path.startswith("'") and file_path.endswith("'")):
-                file_path = file_path[1:-1]
+    # Validate parameters
+    if not file_path:
+        return "Error: Missing file_path parameter."
+    try:
+        offset = int(params.get('offset') or 1)
+        limit = int(params['limit']) if params.get('limit') not in (None, "") else None
+    except (TypeError, ValueError):
+        return "Error: offset and limit must be line numbers."
+    
+    print(f"Extracted file_path: {file_path}, offset: {offset}, limit: {limit}")
+    
+    # Call the function; large files come back a page at a time, never with lines cut out
+    result = read_file_lines(file_path, repo_path, offset, limit)
+    if isinstance(result, str):
+        return result
+    lines, total_lines = result
+    return page_lines(lines, offset, total_lines, tool_budget("ReadFile"),
+                      f"call ReadFile with file_path={file_path}, offset=")
+
+@traced
+def read_file_at_revision_wrapper(inputs, repo_path):
+    """Wrapper for read_file_at_revision - simplified parsing"""
+    print(f"ReadFileAtRevision received: {preview_input(inputs)}")
+    
+    params = parse_tool_input(inputs, positional='spec', known=('file_path', 'revision'))
+    file_path = params.get('file_path')
+    revisions = params.get('revision', "")
+    
+    # Direct format ("<revision>:<path>")
+    if not file_path and ":" in params.get('spec', ""):
+        revisions, file_path = params['spec'].split(":", 1)
+    
+    if isinstance(revisions, str):
+        revisions = [r.strip() for r in revisions.split(",") if r.strip()]
     
     # Validate parameters
     if not file_path:
         return "Error: Missing file_path parameter."
+    if not revisions:
+        return "Error: Missing revision parameter."
     
-    print(f"Extracted file_path: {file_path}")
+    print(f"Extracted file_path: {file_path}, revisions: {revisions}")
     
     # Call the function
-    return read_file(file_path, repo_path)
+    return read_file_at_revision(file_path, revisions, repo_path)
 
+@traced
 def commit_and_push_wrapper(inputs, repo_path, github_token, github_repo, github_user):
-    """Wrapper for commit_and_push - simplified parsing"""
-    print(f"CommitAndPush received: {repr(inputs)[:MAX_CONTENT_DISPLAY]}")
-    
-    file_path = None
-    commit_message = "Update code"
+    """Wrapper for the commit queue (coalesced commit_and_push) - simplified parsing"""
+    print(f"CommitAndPush received: {preview_input(inputs)}")
     
-    # Handle dictionary input
-    if not isinstance(inputs, str):
-        file_path = inputs.get('file_path')
-        commit_message = inputs.get('commit_message', "Update code")
-    else:
-        # Try parameter format for file_path
-        file_path_match = re.search(r'file_path\s*=\s*[\'\"]([^\'\"]+)[\'\"]', inputs)
-        if file_path_match:
-            file_path = file_path_match.group(1)
-        
-        # Try parameter format for commit_message
-        commit_msg_match = re.search(r'commit_message\s*=\s*[\'\"]([^\'\"]+)[\'\"]', inputs)
-        if commit_msg_match:
-            commit_message = commit_msg_match.group(1)
-        
-        # If no parameter format for file_path, try direct format
-        if not file_path:
-            parts = inputs.split(maxsplit=1)
-            if len(parts) >= 1:
-                file_path = parts[0].strip()
-                if (file_path.startswith('"') and file_path.endswith('"')) or \
-                   (file_path.startswith("'") and file_path.endswith("'")):
-                    file_path = file_path[1:-1]
-                
-                if len(parts) > 1:
-                    commit_message = parts[1].strip()
-                    if (commit_message.startswith('"') and commit_message.endswith('"')) or \
-                       (commit_message.startswith("'") and commit_message.endswith("'")):
-                        commit_message = commit_message[1:-1]
+    params = parse_tool_input(inputs, positional=('file_path', 'commit_message'))
+    file_path = params.get('file_path')
+    commit_message = params.get('commit_message') or "Update code"
     
     # Validate parameters
     if not file_path:
@@ -233,30 +175,96 @@ def commit_and_push_wrapper(inputs, repo_path, github_token, github_repo, github
     print(f"Extracted file_path: {file_path}")
     print(f"Extracted commit_message: {commit_message}")
     
+    # Queue the change; it is committed with the rest of the turn and pushed in the background
+    return get_commit_queue(repo_path, github_token, github_repo, github_user).enqueue(file_path, commit_message)
+
+@traced
+def create_branch_wrapper(inputs, repo_path):
+    """Wrapper for create_branch"""
+    print(f"CreateBranch received: {preview_input(inputs)}")
+    
+    params = parse_tool_input(inputs, positional='branch_name')
+    branch_name = params.get('branch_name')
+    
+    # Validate parameters
+    if not branch_name:
+        return "Error: Missing branch_name parameter."
+    
+    print(f"Creating branch: {branch_name}")
+    
     # Call the function
-    return commit_and_push(file_path, commit_message, repo_path, github_token, github_repo, github_user)
+    return create_branch(branch_name, repo_path)
+
+@traced
+def run_command_wrapper(inputs, repo_path):
+    """Wrapper for run_command"""
+    print(f"RunCommand received: {preview_input(inputs)}")
+    
+    params = parse_tool_input(inputs, positional='command', known=('timeout',))
+    command = params.get('command')
+    
+    # Validate parameters
+    if not command:
+        return "Error: Missing command parameter."
+    timeout_note = ""
+    try:
+        timeout = int(params.get('timeout') or 60)
+        if timeout <= 0:
+            raise ValueError(timeout)
+    except (TypeError, ValueError):
+        timeout = 60
+        timeout_note = f"Ignored invalid timeout {params['timeout']!r}; used 60 seconds.\n"
+    
+    print(f"Running command: {command}")
+    
+    # Call the function
+    result = run_command(command, repo_path, timeout)
+    
+    # Format the result
+    formatted_result = timeout_note
+    formatted_result += f"Command {'succeeded' if result['success'] else 'failed'} (exit code {result['returncode']})\n"
+    if result["stdout"]:
+        formatted_result += f"\nOutput:\n{result['stdout']}"
+    if result["stderr"]:
+        formatted_result += f"\nErrors:\n{result['stderr']}"
+    
+    return formatted_result
 
+@traced
+def search_code_wrapper(inputs, repo_path):
+    """Wrapper for search_code"""
+    print(f"SearchCode received: {preview_input(inputs)}")
+    
+    params = parse_tool_input(inputs, positional='query', known=('file_pattern',))
+    query = params.get('query')
+    file_pattern = params.get('file_pattern') or "*"
+    
+    # Validate parameters
+    if not query:
+        return "Error: Missing query parameter."
+    
+    print(f"Searching for: {query} in {file_pattern}")
+    
+    # Call the function
+    result = search_code(query, repo_path, file_pattern)
+    
+    # Format the result
+    if isinstance(result, str):
+        return result
+    
+    formatted_result = f"Found {result['count']} matches for '{query}':\n"
+    for match in result["matches"]:
+        formatted_result += f"{match['file']}:{match['line']}: {match['text']}\n"
+    
+    return formatted_result
 
+@traced
 def run_tests_wrapper(inputs, repo_path):
     """Wrapper for run_tests"""
-    print(f"RunTests received: {repr(inputs)[:MAX_CONTENT_DISPLAY]}")
+    print(f"RunTests received: {preview_input(inputs)}")
     
-    test_path = ""
-    
-    # Handle dictionary input
-    if not isinstance(inputs, str):
-        test_path = inputs.get('test_path', "")
-    else:
-        # Try parameter format
-        path_match = re.search(r'test_path\s*=\s*[\'\"]([^\'\"]+)[\'\"]', inputs)
-        if path_match:
-            test_path = path_match.group(1)
-        else:
-            # Assume the input is the test path
-            test_path = inputs.strip()
-            if (test_path.startswith('"') and test_path.endswith('"')) or \
-               (test_path.startswith("'") and test_path.endswith("'")):
-                test_path = test_path[1:-1]
+    params = parse_tool_input(inputs, positional='test_path')
+    test_path = params.get('test_path', "")
     
     # test_path can be empty to run all tests
     print(f"Running tests in: {test_path or 'all tests'}")
@@ -264,55 +272,26 @@ def run_tests_wrapper(inputs, repo_path):
     # Call the function
     return run_tests(test_path, repo_path)
 
+@traced
 def install_dependencies_wrapper(inputs, repo_path):
     """Wrapper for install_dependencies"""
-    print(f"InstallDependencies received: {repr(inputs)[:MAX_CONTENT_DISPLAY]}")
+    print(f"InstallDependencies received: {preview_input(inputs)}")
     
-    requirements_file = "requirements.txt"
-    
-    # Handle dictionary input
-    if not isinstance(inputs, str):
-        requirements_file = inputs.get('requirements_file', "requirements.txt")
-    else:
-        # Try parameter format
-        file_match = re.search(r'requirements_file\s*=\s*[\'\"]([^\'\"]+)[\'\"]', inputs)
-        if file_match:
-            requirements_file = file_match.group(1)
-        else:
-            # Assume the input is the requirements file
-            input_str = inputs.strip()
-            if input_str:
-                if (input_str.startswith('"') and input_str.endswith('"')) or \
-                   (input_str.startswith("'") and input_str.endswith("'")):
-                    requirements_file = input_str[1:-1]
-                else:
-                    requirements_file = input_str
+    params = parse_tool_input(inputs, positional='requirements_file')
+    requirements_file = params.get('requirements_file') or "requirements.txt"
     
     print(f"Installing dependencies from: {requirements_file}")
     
     # Call the function
     return install_dependencies(requirements_file, repo_path)
 
+@traced
 def analyze_code_wrapper(inputs, repo_path):
     """Wrapper for analyze_code"""
-    print(f"AnalyzeCode received: {repr(inputs)[:MAX_CONTENT_DISPLAY]}")
+    print(f"AnalyzeCode received: {preview_input(inputs)}")
     
-    file_path = None
-    
-    # Handle dictionary input
-    if not isinstance(inputs, str):
-        file_path = inputs.get('file_path')
-    else:
-        # Try parameter format
-        file_match = re.search(r'file_path\s*=\s*[\'\"]([^\'\"]+)[\'\"]', inputs)
-        if file_match:
-            file_path = file_match.group(1)
-        else:
-            # Assume the input is the file path
-            file_path = inputs.strip()
-            if (file_path.startswith('"') and file_path.endswith('"')) or \
-               (file_path.startswith("'") and file_path.endswith("'")):
-                file_path = file_path[1:-1]
+    params = parse_tool_input(inputs, positional='file_path')
+    file_path = params.get('file_path')
     
     # Validate parameters
     if not file_path:
@@ -353,53 +332,15 @@ def analyze_code_wrapper(inputs, repo_path):
     
     return formatted_result
 
+@traced
 def create_pull_request_wrapper(inputs, repo_path, github_token, github_repo):
     """Wrapper for create_pull_request"""
-    print(f"CreatePullRequest received: {repr(inputs)[:MAX_CONTENT_DISPLAY]}")
+    print(f"CreatePullRequest received: {preview_input(inputs)}")
     
-    branch = None
-    title = "New Pull Request"
-    description = ""
-    
-    # Handle dictionary input
-    if not isinstance(inputs, str):
-        branch = inputs.get('branch')
-        title = inputs.get('title', "New Pull Request")
-        description = inputs.get('description', "")
-    else:
-        # Try to parse from the input
-        # Check for JSON-like format
-        try:
-            if inputs.strip().startswith('{') and inputs.strip().endswith('}'):
-                data = json.loads(inputs)
-                branch = data.get('branch')
-                title = data.get('title', "New Pull Request")
-                description = data.get('description', "")
-            else:
-                # Try parameter format
-                branch_match = re.search(r'branch\s*=\s*[\'\"]([^\'\"]+)[\'\"]', inputs)
-                if branch_match:
-                    branch = branch_match.group(1)
-                
-                title_match = re.search(r'title\s*=\s*[\'\"]([^\'\"]+)[\'\"]', inputs)
-                if title_match:
-                    title = title_match.group(1)
-                
-                desc_match = re.search(r'description\s*=\s*[\'\"]([^\'\"]+)[\'\"]', inputs)
-                if desc_match:
-                    description = desc_match.group(1)
-                
-                # If no parameter format for branch, try direct format
-                if not branch:
-                    # Try to extract branch from first word
-                    parts = inputs.split(maxsplit=1)
-                    if parts:
-                        branch = parts[0].strip()
-                        if (branch.startswith('"') and branch.endswith('"')) or \
-                           (branch.startswith("'") and branch.endswith("'")):
-                            branch = branch[1:-1]
-        except:
-            return "Error: Unable to parse input."
+    params = parse_tool_input(inputs, positional=('branch', 'title'), known=('description',))
+    branch = params.get('branch')
+    title = params.get('title') or "New Pull Request"
+    description = params.get('description', "")
     
     # Validate parameters
     if not branch:
@@ -411,27 +352,13 @@ def create_pull_request_wrapper(inputs, repo_path, github_token, github_repo):
     # Call the function
     return create_pull_request(branch, title, description, repo_path, github_token, github_repo)
 
+@traced
 def lint_code_wrapper(inputs, repo_path):
     """Wrapper for lint_code"""
-    print(f"LintCode received: {repr(inputs)[:MAX_CONTENT_DISPLAY]}")
+    print(f"LintCode received: {preview_input(inputs)}")
     
-    path = None
-    
-    # Handle dictionary input
-    if not isinstance(inputs, str):
-        path = inputs.get('path')
-    else:
-        # Try parameter format
-        path_match = re.search(r'path\s*=\s*[\'\"]([^\'\"]+)[\'\"]', inputs)
-        if path_match:
-            path = path_match.group(1)
-        else:
-            # Assume the input is the path (can be empty)
-            if inputs.strip():
-                path = inputs.strip()
-                if (path.startswith('"') and path.endswith('"')) or \
-                   (path.startswith("'") and path.endswith("'")):
-                    path = path[1:-1]
+    params = parse_tool_input(inputs, positional='path')
+    path = params.get('path') or None
     
     print(f"Linting code in: {path or 'entire repository'}")
     
@@ -463,36 +390,19 @@ def lint_code_wrapper(inputs, repo_path):
     
     return formatted_result
 
+@traced
 def stash_changes_wrapper(inputs, repo_path):
     """Wrapper for stash_changes"""
-    print(f"StashChanges received: {repr(inputs)[:MAX_CONTENT_DISPLAY]}")
-    
-    pop = False
-    message = None
+    print(f"StashChanges received: {preview_input(inputs)}")
     
-    # Handle dictionary input
-    if not isinstance(inputs, str):
-        pop = inputs.get('pop', False)
-        message = inputs.get('message')
+    if isinstance(inputs, str) and inputs.strip().lower() == "pop":
+        params = {'pop': True}
     else:
-        # Check for "pop" in the input
-        if inputs.strip().lower() == "pop":
-            pop = True
-        else:
-            # Try parameter format
-            pop_match = re.search(r'pop\s*=\s*(true|false)', inputs, re.IGNORECASE)
-            if pop_match:
-                pop = pop_match.group(1).lower() == "true"
-            
-            message_match = re.search(r'message\s*=\s*[\'\"]([^\'\"]+)[\'\"]', inputs)
-            if message_match:
-                message = message_match.group(1)
-            elif not pop:
-                # Assume the input is the stash message
-                message = inputs.strip()
-                if (message.startswith('"') and message.endswith('"')) or \
-                   (message.startswith("'") and message.endswith("'")):
-                    message = message[1:-1]
+        params = parse_tool_input(inputs, positional='message', known=('pop',))
+    pop = params.get('pop', False)
+    if isinstance(pop, str):
+        pop = pop.lower() == "true"
+    message = params.get('message')
     
     print(f"Stash operation: {'pop' if pop else 'push'}")
     if message and not pop:
@@ -501,9 +411,10 @@ def stash_changes_wrapper(inputs, repo_path):
     # Call the function
     return stash_changes(repo_path, pop, message)
 
+@traced
 def get_repo_status_wrapper(inputs, repo_path):
     """Wrapper for get_repo_status"""
-    print(f"GetRepoStatus received: {repr(inputs)[:MAX_CONTENT_DISPLAY]}")
+    print(f"GetRepoStatus received: {preview_input(inputs)}")
     
     # Call the function
     result = get_repo_status(repo_path)
@@ -525,6 +436,13 @@ def get_repo_status_wrapper(inputs, repo_path):
         formatted_result += f"  Date: {commit['date']}\n"
         formatted_result += f"  Message: {commit['message']}\n\n"
     
+    queue_status = get_commit_queue_status(repo_path)
+    if queue_status and queue_status['unpushed_branches']:
+        formatted_result += f"Commits waiting to be pushed on: {', '.join(queue_status['unpushed_branches'])}\n"
+        if queue_status['last_push_error']:
+            formatted_result += f"Last push error: {queue_status['last_push_error']}\n"
+        formatted_result += "\n"
+    
     if result['has_changes']:
         formatted_result += f"Changes ({len(result['status'])} files):\n"
         for change in result['status']:
@@ -534,26 +452,13 @@ def get_repo_status_wrapper(inputs, repo_path):
     
     return formatted_result
 
+@traced
 def generate_diff_wrapper(inputs, repo_path):
     """Wrapper for generate_diff"""
-    print(f"GenerateDiff received: {repr(inputs)[:MAX_CONTENT_DISPLAY]}")
+    print(f"GenerateDiff received: {preview_input(inputs)}")
     
-    file_path = None
-    
-    # Handle dictionary input
-    if not isinstance(inputs, str):
-        file_path = inputs.get('file_path')
-    else:
-        # Try parameter format
-        file_match = re.search(r'file_path\s*=\s*[\'\"]([^\'\"]+)[\'\"]', inputs)
-        if file_match:
-            file_path = file_match.group(1)
-        elif inputs.strip():
-            # Assume the input is the file path
-            file_path = inputs.strip()
-            if (file_path.startswith('"') and file_path.endswith('"')) or \
-               (file_path.startswith("'") and file_path.endswith("'")):
-                file_path = file_path[1:-1]
+    params = parse_tool_input(inputs, positional='file_path')
+    file_path = params.get('file_path') or None
     
     # file_path can be None to get diff for all changes
     if file_path:
@@ -562,4 +467,24 @@ def generate_diff_wrapper(inputs, repo_path):
         print("Generating diff for all changes")
     
     # Call the function
-    return generate_diff(repo_path, file_path)
\ No newline at end of file
+    return generate_diff(repo_path, file_path)
+
+@traced
+def expand_sparse_checkout_wrapper(inputs, repo_path):
+    """Wrapper for update_sparse_checkout"""
+    print(f"ExpandSparseCheckout received: {preview_input(inputs)}")
+    
+    params = parse_tool_input(inputs, positional='directories')
+    directories = params.get('directories', [])
+    if isinstance(directories, str):
+        directories = directories.split(',')
+    directories = [d.strip() for d in directories if d.strip()]
+    
+    # Validate parameters
+    if not directories:
+        return "Error: Missing directories parameter."
+    
+    print(f"Adding to sparse checkout: {directories}")
+    
+    # Call the function
+    return update_sparse_checkout(repo_path, directories, add=True)
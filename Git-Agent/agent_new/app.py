@@ -2,6 +2,8 @@ import os
 import re
 import subprocess
 import sys
+import importlib.util
+import pathlib
 from git import Repo, GitCommandError
 from github import Github
 from dotenv import load_dotenv
@@ -23,6 +25,16 @@ OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 MAX_CONTENT_DISPLAY = 1000  # Maximum characters to display in logs
 MAX_FILE_SIZE = 50000  # Maximum file size to process in tools
 
+# Provider calls go through agent2's rate limiter, shared by all sessions in this
+# process; kept in sys.modules since Streamlit re-executes this script on every rerun
+rate_limiter = sys.modules.get("agent2_rate_limiter")
+if rate_limiter is None:
+    rate_limiter_path = pathlib.Path(__file__).parent.parent / "agent2" / "utils" / "rate_limiter.py"
+    rate_limiter_spec = importlib.util.spec_from_file_location("agent2_rate_limiter", rate_limiter_path)
+    rate_limiter = importlib.util.module_from_spec(rate_limiter_spec)
+    rate_limiter_spec.loader.exec_module(rate_limiter)
+    sys.modules["agent2_rate_limiter"] = rate_limiter
+
 #######################################
 # Direct File Operations
 #######################################
@@ -477,6 +489,7 @@ def initialize_agent_tools():
         model="gpt-3.5-turbo-instruct", 
         temperature=0,
         max_tokens=1000,  # Limit output tokens
+        **rate_limiter.rate_limited_http_clients()
     )
     
     # Create an agent with a more efficient configuration
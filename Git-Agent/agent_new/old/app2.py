@@ -1,4 +1,7 @@
 import os
+import sys
+import importlib.util
+import pathlib
 import streamlit as st
 from langchain.agents import initialize_agent, AgentType, Tool
 from langchain_openai import OpenAI
@@ -15,6 +18,16 @@ GITHUB_REPO = os.getenv("GITHUB_REPO")
 GITHUB_USER = os.getenv("GITHUB_USER")
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 
+# Provider calls go through agent2's rate limiter, shared by all sessions in this
+# process; kept in sys.modules since Streamlit re-executes this script on every rerun
+rate_limiter = sys.modules.get("agent2_rate_limiter")
+if rate_limiter is None:
+    rate_limiter_path = pathlib.Path(__file__).parent.parent.parent / "agent2" / "utils" / "rate_limiter.py"
+    rate_limiter_spec = importlib.util.spec_from_file_location("agent2_rate_limiter", rate_limiter_path)
+    rate_limiter = importlib.util.module_from_spec(rate_limiter_spec)
+    rate_limiter_spec.loader.exec_module(rate_limiter)
+    sys.modules["agent2_rate_limiter"] = rate_limiter
+
 #######################################
 # Direct Functions (No Parsing)
 #######################################
@@ -258,7 +271,7 @@ def main():
         ]
         
         # Create agent
-        llm = OpenAI(temperature=0)
+        llm = OpenAI(temperature=0, **rate_limiter.rate_limited_http_clients())
         st.session_state.agent = initialize_agent(
             tools,
             llm,
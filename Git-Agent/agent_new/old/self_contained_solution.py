@@ -2,6 +2,8 @@ import os
 import re
 import sys
 import subprocess
+import importlib.util
+import pathlib
 from git import Repo, GitCommandError
 from github import Github
 from dotenv import load_dotenv
@@ -18,6 +20,16 @@ GITHUB_REPO = os.getenv("GITHUB_REPO")
 GITHUB_USER = os.getenv("GITHUB_USER")
 REPO_PATH = os.getenv("LOCAL_REPO_PATH", "local_repo")
 
+# Provider calls go through agent2's rate limiter, shared by all sessions in this
+# process; kept in sys.modules since Streamlit re-executes this script on every rerun
+rate_limiter = sys.modules.get("agent2_rate_limiter")
+if rate_limiter is None:
+    rate_limiter_path = pathlib.Path(__file__).parent.parent.parent / "agent2" / "utils" / "rate_limiter.py"
+    rate_limiter_spec = importlib.util.spec_from_file_location("agent2_rate_limiter", rate_limiter_path)
+    rate_limiter = importlib.util.module_from_spec(rate_limiter_spec)
+    rate_limiter_spec.loader.exec_module(rate_limiter)
+    sys.modules["agent2_rate_limiter"] = rate_limiter
+
 # Simple direct file operations
 def create_file(file_path, content):
     """Create a file with the given content"""
@@ -166,7 +178,8 @@ def main():
         ]
         
         # Initialize agent
-        llm = OpenAI(model="gpt-3.5-turbo-instruct", temperature=0)
+        llm = OpenAI(model="gpt-3.5-turbo-instruct", temperature=0,
+                     **rate_limiter.rate_limited_http_clients())
         st.session_state.agent = initialize_agent(
             tools=tools,
             llm=llm,
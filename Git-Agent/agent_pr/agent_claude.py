@@ -2,10 +2,32 @@ from typing import TypedDict
 from langgraph.graph import StateGraph, END, START
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_anthropic import ChatAnthropic
+from langchain.globals import set_llm_cache
 from pydantic import BaseModel, Field
 from git import Repo
 from github import Github
 import os
+import importlib.util
+import pathlib
+
+# Identical prompts (retries, reruns) are answered from agent2's shared LLM
+# cache: same database (LLM_CACHE_PATH), TTL, size cap and prompt normalization
+llm_cache_path = pathlib.Path(__file__).parent.parent / "agent2" / "utils" / "llm_cache.py"
+llm_cache_spec = importlib.util.spec_from_file_location("llm_cache", llm_cache_path)
+llm_cache = importlib.util.module_from_spec(llm_cache_spec)
+llm_cache_spec.loader.exec_module(llm_cache)
+if llm_cache.config.LLM_CACHE_ENABLED:
+    set_llm_cache(llm_cache.get_llm_cache())
+
+# Provider calls go through agent2's rate limiter; ChatAnthropic takes no custom
+# HTTP client, so calls are admitted from callbacks and 429 errors pause the queue
+rate_limiter_path = pathlib.Path(__file__).parent.parent / "agent2" / "utils" / "rate_limiter.py"
+rate_limiter_spec = importlib.util.spec_from_file_location("rate_limiter", rate_limiter_path)
+rate_limiter = importlib.util.module_from_spec(rate_limiter_spec)
+rate_limiter_spec.loader.exec_module(rate_limiter)
+llm_rate_limit = rate_limiter.RateLimitCallbackHandler(
+    rate_limiter.get_rate_limiter("anthropic"), priority=rate_limiter.PRIORITY_BACKGROUND
+)
 
 class CodeSolution(BaseModel):
     """Schema for code solutions."""
@@ -28,7 +50,7 @@ def clone_repository(github_token: str, repo_name: str) -> tuple[str, str]:
         repo_dir = os.path.join(script_dir, 'agent-task')
 
         if os.path.exists(repo_dir):
-        os.system(f'rm -rf {repo_dir}')
+            os.system(f'rm -rf {repo_dir}')
 
         g = Github(github_token)
         repo = g.get_repo(repo_name)
@@ -93,7 +115,7 @@ def generate_solution(state: GraphState):
     ])  
 
     try:
-        llm = ChatAnthropic(model="claude-3-sonnet-20240229", temperature=0)
+        llm = ChatAnthropic(model="claude-3-sonnet-20240229", temperature=0, callbacks=[llm_rate_limit])
         chain = prompt | llm.with_structured_output(CodeSolution)
 
         print(f"Generating solution - Attempt #{iterations + 1}")
@@ -102,11 +124,12 @@ def generate_solution(state: GraphState):
         return {
             "status": "generated",
             "task_content": task_content,
-            "repo_dir": statę["repo_dir"],
+            "repo_dir": state["repo_dir"],
             "generation": solution,
             "iterations": iterations + 1
         }
-    except Exception:
+    except Exception as e:
+        print(f"Error generating solution: {str(e)}")
         return { ** state, "status": "failed"}
     
 
@@ -145,7 +168,7 @@ def create_pr(state: GraphState):
 
         solution_path = os.path.join(state["repo_dir"], "array_products. py")
         with open(solution_path, "w") as f:
-        f.write(solution.code)
+            f.write(solution.code)
 
         repo. index.add(["array_products.py"])
         repo. index. commit ("feat: add array products calculator")
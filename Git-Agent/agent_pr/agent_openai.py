@@ -3,10 +3,13 @@ from langgraph.graph import StateGraph, END, START
 from langchain_core.prompts import ChatPromptTemplate
 #from langchain_anthropic import ChatAnthropic
 from langchain_openai import OpenAI
+from langchain.globals import set_llm_cache
 from pydantic import BaseModel, Field
 from git import Repo
 from github import Github
 import os
+import importlib.util
+import pathlib
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -14,6 +17,23 @@ openai_api_key = os.getenv("OPENAI_API_KEY")
 GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
 REPO_NAME = "rsalvagio92/Wild-Nomad"
 
+# Identical prompts (retries, reruns) are answered from agent2's shared LLM
+# cache: same database (LLM_CACHE_PATH), TTL, size cap and prompt normalization
+llm_cache_path = pathlib.Path(__file__).parent.parent / "agent2" / "utils" / "llm_cache.py"
+llm_cache_spec = importlib.util.spec_from_file_location("llm_cache", llm_cache_path)
+llm_cache = importlib.util.module_from_spec(llm_cache_spec)
+llm_cache_spec.loader.exec_module(llm_cache)
+if llm_cache.config.LLM_CACHE_ENABLED:
+    set_llm_cache(llm_cache.get_llm_cache())
+
+# Provider calls go through agent2's rate limiter: 429s are retried after the
+# provider's Retry-After, and the graph's calls queue behind interactive work
+rate_limiter_path = pathlib.Path(__file__).parent.parent / "agent2" / "utils" / "rate_limiter.py"
+rate_limiter_spec = importlib.util.spec_from_file_location("rate_limiter", rate_limiter_path)
+rate_limiter = importlib.util.module_from_spec(rate_limiter_spec)
+rate_limiter_spec.loader.exec_module(rate_limiter)
+llm_http_clients = rate_limiter.rate_limited_http_clients(priority=rate_limiter.PRIORITY_BACKGROUND)
+
 class CodeSolution(BaseModel):
     """Schema for code solutions."""
     description: str = Field(description="Description of the solution approach")
@@ -100,7 +120,7 @@ def generate_solution(state: GraphState):
     ])  
 
     try:
-        llm = OpenAI(openai_api_key=openai_api_key, model="gpt-3.5-turbo", temperature=0)
+        llm = OpenAI(openai_api_key=openai_api_key, model="gpt-3.5-turbo", temperature=0, **llm_http_clients)
         chain = prompt | llm.with_structured_output(CodeSolution)
 
         print(f"Generating solution - Attempt #{iterations + 1}")
@@ -109,11 +129,12 @@ def generate_solution(state: GraphState):
         return {
             "status": "generated",
             "task_content": task_content,
-            "repo_dir": statę["repo_dir"],
+            "repo_dir": state["repo_dir"],
             "generation": solution,
             "iterations": iterations + 1
         }
-    except Exception:
+    except Exception as e:
+        print(f"Error generating solution: {str(e)}")
         return { ** state, "status": "failed"}
     
 